@@ -1,10 +1,13 @@
 # -*- mode: python ; coding: utf-8 -*-
+import glob
 import os
 from PyInstaller.utils.hooks import collect_submodules
 
 # --- automatic recursive data collection ---
-def collect_all_subdirs(base_dir: str):
-    """Recursively include all non-hidden subdirectories for PyInstaller."""
+def collect_all_subdirs(base_dir: str, exclude_files=()):
+    """Recursively include all non-hidden subdirectories for PyInstaller.
+    Folders holding one of `exclude_files` are added file by file without them."""
+    exclude_files = {os.path.normcase(os.path.abspath(f)) for f in exclude_files}
     datas = []
     for root, dirs, files in os.walk(base_dir):
         # Skip hidden/system folders and __pycache__
@@ -13,19 +16,36 @@ def collect_all_subdirs(base_dir: str):
         rel_path = os.path.relpath(root, base_dir)
         if rel_path == '.':
             continue
-        datas.append((root, rel_path))
+        paths = [os.path.join(root, f) for f in files]
+        kept = [p for p in paths if os.path.normcase(os.path.abspath(p)) not in exclude_files]
+        if len(kept) == len(paths):
+            datas.append((root, rel_path))
+        else:
+            datas.extend((p, rel_path) for p in kept)
     return datas
 
 
 # Use current working directory instead of __file__
 project_root = os.getcwd()
 
+# Patch payloads: once packaging/build_payloads.py has written the shared
+# container (installer/embedded_payloads.py), the legacy per-game
+# installer/embedded_*_patch.py modules are left out of the build.
+installer_dir = os.path.join(project_root, 'installer')
+has_container = os.path.isfile(os.path.join(installer_dir, 'embedded_payloads.py'))
+legacy_payloads = sorted(glob.glob(os.path.join(installer_dir, 'embedded_*_patch.py')))
+legacy_payload_modules = ['installer.' + os.path.splitext(os.path.basename(p))[0] for p in legacy_payloads]
+
 # Collect all folders recursively (ui, installer, workers, core, services, etc.)
-all_datas = collect_all_subdirs(project_root)
+all_datas = collect_all_subdirs(project_root, exclude_files=legacy_payloads if has_container else ())
 
 # Automatically gather all PySide6 submodules
 hidden_pyside = collect_submodules('PySide6')
 
+# Payload modules are imported by name at runtime (installer.utils.load_embedded_payload,
+# installer.payload_store.load_container), so the analysis cannot see them
+hidden_payloads = ['installer.embedded_payloads'] if has_container else legacy_payload_modules
+
 # --- PyInstaller build specification ---
 block_cipher = None
 
@@ -36,11 +56,11 @@ a = Analysis(
     datas=all_datas + [
         ('INS2DOI Community Patcher.ico', '.'),
     ],
-    hiddenimports=hidden_pyside,
+    hiddenimports=hidden_pyside + hidden_payloads,
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=legacy_payload_modules if has_container else [],
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
@@ -1,14 +1,17 @@
 # app.py
 # -*- coding: utf-8 -*-
+import logging
 import sys
 import os
 from pathlib import Path
+from core import startup_profile
+startup_profile.start_if_enabled()  # before the heavy imports so they are timed
+
+from PySide6.QtCore import QEvent, QObject
 from PySide6.QtWidgets import QApplication
 from PySide6.QtGui import QIcon
 from ui.main_window import MainWindow
-
-from installer.utils import decode_embedded_zip, extract_zip
-from installer import embedded_ins_patch, embedded_doi_patch
+from core.logging_setup import setup_logging
 
 
 def _hide_console_window():
@@ -27,27 +30,49 @@ def apply_patches():
     Decode and extract the embedded patches to ~/Desktop/patch_output.
     This should be called manually from the GUI, not on startup.
     """
+    from installer.payload_store import load_container
+    from installer.utils import decode_embedded_zip, extract_zip, load_embedded_payload
+    from models.games import GAMES
+
     base_dir = os.path.expanduser("~/Desktop/patch_output")
     os.makedirs(base_dir, exist_ok=True)
 
-    ins_zip = decode_embedded_zip(
-        embedded_ins_patch.BASE64_DATA, embedded_ins_patch.SHA256, "Insurgency Patch"
-    )
-    doi_zip = decode_embedded_zip(
-        embedded_doi_patch.BASE64_DATA, embedded_doi_patch.SHA256, "Day of Infamy Patch"
-    )
+    container = load_container()
+    for record in GAMES:
+        out_dir = os.path.join(base_dir, Path(record.zip_name).stem)
+        if container is not None and container.has(record.payload):
+            container.extract(record.payload, Path(out_dir))
+            continue
+        data, sha = load_embedded_payload(record.payload)
+        zip_path = decode_embedded_zip(data, sha, record.patch_label)
+        extract_zip(zip_path, out_dir)
+        # Cleanup
+        os.unlink(zip_path)
+
 
-    extract_zip(ins_zip, os.path.join(base_dir, "ins_patch"))
-    extract_zip(doi_zip, os.path.join(base_dir, "doi_patch"))
+class _FirstPaintReporter(QObject):
+    """Ends the startup profile when the window is painted for the first time."""
 
-    # Cleanup
-    os.unlink(ins_zip)
-    os.unlink(doi_zip)
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            obj.removeEventFilter(self)
+            prof = startup_profile.get_profiler()
+            prof.mark("first paint")
+            try:
+                path = prof.write_report()
+                logging.getLogger("app").info("Startup profile written to %s", path)
+            except OSError:
+                logging.getLogger("app").exception("Could not write startup profile")
+        return False
 
 
 def main():
+    startup_profile.mark("imports")
+    setup_logging()
     _hide_console_window()
+    startup_profile.mark("logging setup")
     app = QApplication(sys.argv)
+    startup_profile.mark("QApplication")
 
     ICON_FILENAME = "INS2DOI Community Patcher.ico"
     base_dir = Path(sys._MEIPASS) if getattr(sys, "frozen", False) else Path(__file__).resolve().parent
@@ -55,9 +80,15 @@ def main():
     icon_path = base_dir / ICON_FILENAME
     if icon_path.exists():
         app.setWindowIcon(QIcon(str(icon_path)))
+    startup_profile.mark("window icon")
 
     w = MainWindow()
+    startup_profile.mark("MainWindow()")
+    if startup_profile.get_profiler() is not None:
+        reporter = _FirstPaintReporter(w)
+        w.installEventFilter(reporter)
     w.show()
+    startup_profile.mark("show()")
     sys.exit(app.exec())
 
 if __name__ == "__main__":
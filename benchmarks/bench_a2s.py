@@ -0,0 +1,190 @@
+# benchmarks/bench_a2s.py
+# -*- coding: utf-8 -*-
+"""
+Self-check and throughput run for services.a2s against local stand-in servers.
+
+    python benchmarks/bench_a2s.py [--servers 500]
+
+The check part starts asyncio UDP servers on 127.0.0.1 that speak the
+Source query protocol: one answers with a challenge first, one answers
+directly, one claims players but reports an empty roster, and one port is
+dead. It asserts what probe_servers() and find_suspicious() return and
+exits non-zero on a mismatch. The throughput part probes `--servers`
+stand-ins at once and reports probes per second.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import socket
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from services import a2s  # noqa: E402
+
+CHALLENGE = b"\x12\x34\x56\x78"
+APP_ID = 447820
+
+
+# -----------------------------------------------------
+# Stand-in server
+# -----------------------------------------------------
+def info_packet(name: str, players: int, bots: int = 0, max_players: int = 32) -> bytes:
+    return (a2s._HEADER + b"I" + bytes([17])
+            + b"\x00".join(s.encode() for s in (name, "bastogne", "doi", "Day of Infamy")) + b"\x00"
+            + struct.pack("<H", APP_ID & 0xFFFF)
+            + bytes([players, max_players, bots]) + b"dl" + bytes([0, 1])
+            + b"1.0.0\x00")
+
+def players_packet(roster: Sequence[str]) -> bytes:
+    body = b"".join(b"\x00" + n.encode() + b"\x00" + struct.pack("<l", 10) + struct.pack("<f", 60.0)
+                    for n in roster)
+    return a2s._HEADER + b"D" + bytes([len(roster)]) + body
+
+
+class StandIn(asyncio.DatagramProtocol):
+    """Answers A2S_INFO / A2S_PLAYER, optionally behind a challenge."""
+
+    def __init__(self, name: str, roster: Sequence[str], players: Optional[int] = None, challenge: bool = False):
+        self.info = info_packet(name, len(roster) if players is None else players)
+        self.players = players_packet(roster)
+        self.challenge = challenge
+        self.transport: Optional[asyncio.DatagramTransport] = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr):
+        if data.startswith(a2s.A2S_INFO):
+            token, reply = data[len(a2s.A2S_INFO):], self.info
+        elif data.startswith(a2s.A2S_PLAYER):
+            token, reply = data[len(a2s.A2S_PLAYER):], self.players
+        else:
+            return
+        if self.challenge and token != CHALLENGE:
+            reply = a2s._HEADER + b"A" + CHALLENGE
+        self.transport.sendto(reply, addr)
+
+
+class StandInFarm:
+    """Runs stand-in servers on a private event loop thread (probe_servers() blocks)."""
+
+    def __init__(self, protocols: List[StandIn]):
+        self.protocols = protocols
+        self.addresses: List[a2s.Address] = []
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        for proto in self.protocols:
+            transport, _ = self.loop.run_until_complete(
+                self.loop.create_datagram_endpoint(lambda p=proto: p, local_addr=("127.0.0.1", 0)))
+            self.addresses.append(transport.get_extra_info("sockname")[:2])
+        self._ready.set()
+        self.loop.run_forever()
+
+    def __enter__(self) -> "StandInFarm":
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def __exit__(self, *exc):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        for proto in self.protocols:
+            proto.transport.close()
+        self.loop.close()
+
+
+def dead_port() -> a2s.Address:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[:2]
+
+
+# -----------------------------------------------------
+# Check
+# -----------------------------------------------------
+def check() -> List[str]:
+    failures: List[str] = []
+
+    def expect(what: str, got, want):
+        if got != want:
+            failures.append(f"{what}: got {got!r}, want {want!r}")
+
+    servers = [
+        StandIn("challenged", ["Alice", "Bob"], challenge=True),
+        StandIn("plain", ["Alice", "Bob"]),
+        StandIn("empty roster", [], players=6),
+    ]
+    with StandInFarm(servers) as farm:
+        challenged, plain, empty = farm.addresses
+        dead = dead_port()
+        results = a2s.probe_servers([challenged, plain, empty, dead], timeout=0.5, retries=1)
+
+    by_addr: Dict[a2s.Address, a2s.ProbeResult] = {r.address: r for r in results}
+    expect("result count", len(results), 4)
+    for addr, name in ((challenged, "challenged"), (plain, "plain"), (empty, "empty roster")):
+        r = by_addr[addr]
+        expect(f"{name} ok", r.ok, True)
+        expect(f"{name} error", r.error, None)
+        if r.ok:
+            expect(f"{name} server name", r.info.name, name)
+            expect(f"{name} app id", r.info.app_id, APP_ID & 0xFFFF)
+            expect(f"{name} version", r.info.version, "1.0.0")
+    expect("challenged roster", [p.name for p in by_addr[challenged].players or []], ["Alice", "Bob"])
+    expect("plain roster", [p.name for p in by_addr[plain].players or []], ["Alice", "Bob"])
+    expect("empty roster players", by_addr[empty].info.players if by_addr[empty].ok else None, 6)
+    expect("dead port ok", by_addr[dead].ok, False)
+    expect("dead port error", by_addr[dead].error, "Timeout")
+
+    flagged = {s.address: s.reasons for s in a2s.find_suspicious(results)}
+    expect("suspicious", flagged, {
+        challenged: ["duplicate_roster"],
+        plain: ["duplicate_roster"],
+        empty: ["player_count_mismatch"],
+    })
+    farm_flags = {s.address: s.reasons for s in a2s.find_suspicious(results, max_servers_per_ip=2)}
+    expect("server farm", sorted(a for a, rs in farm_flags.items() if "server_farm" in rs),
+           sorted([challenged, plain, empty]))
+    expect("blocklist candidates", a2s.blocklist_candidates(a2s.find_suspicious(results)), ["127.0.0.1"])
+    return failures
+
+
+# -----------------------------------------------------
+# Throughput
+# -----------------------------------------------------
+def throughput(count: int) -> None:
+    servers = [StandIn(f"srv{i}", [f"p{i}a", f"p{i}b"], challenge=bool(i % 2)) for i in range(count)]
+    with StandInFarm(servers) as farm:
+        t0 = time.perf_counter()
+        results = a2s.probe_servers(farm.addresses, timeout=1.0, rate=0)
+        elapsed = time.perf_counter() - t0
+    ok = sum(r.ok for r in results)
+    print(f"{count} stand-ins: {ok} ok in {elapsed * 1000:.0f} ms ({count / elapsed:.0f} probes/s)")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--servers", type=int, default=500, help="stand-ins for the throughput run (0 = skip)")
+    args = ap.parse_args()
+
+    failures = check()
+    for f in failures:
+        print(f"FAIL {f}")
+    if failures:
+        sys.exit(1)
+    print("a2s check passed (challenge, plain, empty roster, dead port)")
+    if args.servers:
+        throughput(args.servers)
+
+
+if __name__ == "__main__":
+    main()
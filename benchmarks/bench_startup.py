@@ -0,0 +1,74 @@
+# benchmarks/bench_startup.py
+# -*- coding: utf-8 -*-
+"""
+Time from process start to the first painted MainWindow.
+
+    python benchmarks/bench_startup.py [runs]
+
+Each run starts a fresh interpreter (so imports are cold in-process but the
+OS file cache is warm), builds the window like app.main() does and reports
+the elapsed time when the first Paint event reaches the window. Uses the
+offscreen platform when no display is available.
+"""
+from __future__ import annotations
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+CHILD = r"""
+import os, sys, time
+t0 = float(os.environ["BENCH_T0"])
+sys.path.insert(0, os.environ["BENCH_ROOT"])
+sys.argv = ["app"]
+from PySide6.QtCore import QObject, QEvent, QTimer
+from PySide6.QtWidgets import QApplication
+from core.logging_setup import setup_logging
+from ui.main_window import MainWindow
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, ev):
+        if ev.type() == QEvent.Type.Paint:
+            print(f"{(time.time() - t0) * 1000:.1f}", flush=True)
+            os._exit(0)
+        return False
+
+setup_logging(console_level=None)
+app = QApplication(sys.argv)
+w = MainWindow()
+spy = FirstPaint()
+w.installEventFilter(spy)
+w.show()
+QTimer.singleShot(10000, lambda: os._exit(1))
+app.exec()
+"""
+
+
+def run_once() -> float:
+    env = dict(os.environ, BENCH_ROOT=str(ROOT))
+    env.setdefault("QT_QPA_PLATFORM", "offscreen" if not os.environ.get("DISPLAY") and os.name != "nt" else "")
+    if not env["QT_QPA_PLATFORM"]:
+        env.pop("QT_QPA_PLATFORM")
+    env["BENCH_T0"] = repr(time.time())
+    out = subprocess.run([sys.executable, "-c", CHILD], env=env, capture_output=True, text=True, timeout=60)
+    lines = [ln for ln in out.stdout.splitlines() if ln.strip()]
+    if out.returncode != 0 or not lines:
+        raise RuntimeError(out.stderr[-2000:])
+    return float(lines[-1])
+
+
+def main() -> int:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    run_once()  # warm the OS file cache / .pyc files
+    samples = [run_once() for _ in range(runs)]
+    print(f"first paint: median {statistics.median(samples):.0f} ms, "
+          f"min {min(samples):.0f} ms, max {max(samples):.0f} ms ({runs} runs)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
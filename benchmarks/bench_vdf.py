@@ -0,0 +1,64 @@
+# benchmarks/bench_vdf.py
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark for services.vdf on synthetic libraryfolders-style files.
+
+    python benchmarks/bench_vdf.py [--max-libs 20000]
+
+Each row doubles the input size; a linear parser keeps µs/KB roughly flat.
+"""
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from services import vdf  # noqa: E402
+
+
+def make_libraryfolders(libs: int, apps_per_lib: int = 20) -> str:
+    parts = ['// synthetic libraryfolders.vdf\n"libraryfolders"\n{\n']
+    for i in range(libs):
+        parts.append(
+            f'\t"{i}"\n\t{{\n'
+            f'\t\t"path"\t\t"D:\\\\SteamLibrary{i}\\\\with \\"quotes\\""\n'
+            f'\t\t"label"\t\t""\n'
+            f'\t\t"contentid"\t\t"{i * 7919}"\n'
+            f'\t\t"apps"\n\t\t{{\n'
+        )
+        for a in range(apps_per_lib):
+            parts.append(f'\t\t\t"{100000 + i * apps_per_lib + a}"\t\t"{a * 1024}"\n')
+        parts.append("\t\t}\n\t}\n")
+    parts.append("}\n")
+    return "".join(parts)
+
+
+def bench(text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        vdf.loads(text)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--max-libs", type=int, default=20000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'libraries':>10} {'size KB':>10} {'best ms':>10} {'µs/KB':>8}")
+    libs = 125
+    while libs <= args.max_libs:
+        text = make_libraryfolders(libs)
+        kb = len(text) / 1024
+        t = bench(text, args.repeat)
+        print(f"{libs:>10} {kb:>10.0f} {t * 1000:>10.1f} {t * 1e6 / kb:>8.1f}")
+        libs *= 2
+
+
+if __name__ == "__main__":
+    main()
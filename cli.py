@@ -0,0 +1,272 @@
+# cli.py
+# -*- coding: utf-8 -*-
+"""
+Headless command line entry point (never imports PySide6).
+
+    python -m cli scan   [--no-cache] [--no-deep | --full-deep]
+    python -m cli patch  [--game KEY ...] [--target DIR]
+    python -m cli disable [--game KEY ...] [--target DIR] [--link] [--force]
+    python -m cli block  [--url URL | --file FILE] [--rule-prefix PREFIX]
+    python -m cli batch  [DIR ...] [--manifest FILE] [--discover [--deep]]
+
+Results are printed as JSON on stdout, progress/log lines go to stderr.
+Exit codes: 0 ok, 1 failure, 2 nothing to do (no games found), 3 unsupported
+(not Windows / no admin rights), 64 usage error.
+Every command also leaves a metrics snapshot (core.metrics) in the cache
+dir's metrics folder, or in --metrics-dir.
+"""
+from __future__ import annotations
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+from core import metrics
+from core.logging_setup import setup_logging
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_NOTHING = 2
+EXIT_UNSUPPORTED = 3
+EXIT_USAGE = 64
+
+logger = logging.getLogger("cli")
+
+_DEDUP_HELP = "hardlink identical patch files from one store per volume"
+
+
+def _emit(payload: dict) -> None:
+    json.dump(payload, sys.stdout, indent=2, ensure_ascii=False)
+    sys.stdout.write("\n")
+
+
+def _log(quiet: bool):
+    def log(msg: str) -> None:
+        if not quiet:
+            sys.stderr.write(msg.rstrip("\n") + "\n")
+    return log
+
+
+# ---------------------------------------------------------
+# Shared helpers
+# ---------------------------------------------------------
+def _scan(args) -> dict:
+    from models.games import GAMES_META
+    from services.scan_cache import load_scan_cache, save_scan_cache
+    from services.scanner import GameScanner
+
+    if not args.no_cache:
+        cached = load_scan_cache(GAMES_META)
+        if cached is not None:
+            return cached
+    from services.drive_scan import FULL_BUDGET, QUICK_BUDGET
+    scanner = GameScanner(
+        GAMES_META, log_cb=_log(args.quiet), deep_scan=not args.no_deep,
+        deep_time_budget=FULL_BUDGET if args.full_deep else QUICK_BUDGET,
+    )
+    result = scanner.scan()
+    if result["libraries"] and not result["cancelled"]:
+        save_scan_cache(GAMES_META, result, scanner.steamapps_dirs)
+    return result
+
+
+def _select_targets(args) -> Dict[str, tuple]:
+    """{title: (record, game_dir)} from --target/--game or from a (cached) scan."""
+    from models.games import GAMES
+
+    records = []
+    for name in args.game or []:
+        rec = GAMES.resolve(name)
+        if rec is None:
+            raise SystemExit(f"Unknown game: {name}")
+        records.append(rec)
+
+    if args.target:
+        target = Path(args.target)
+        rec = records[0] if len(records) == 1 else GAMES.resolve(target.name, target)
+        if rec is None or len(records) > 1:
+            raise SystemExit("--target needs exactly one --game (or a default game folder name)")
+        return {rec.title: (rec, target)}
+
+    found = _scan(args).get("found_games") or {}
+    wanted = {r.title for r in records} or None
+    targets: Dict[str, tuple] = {}
+    for title, path in found.items():
+        rec = GAMES.resolve(title, path)
+        if rec is not None and (wanted is None or rec.title in wanted):
+            targets[rec.title] = (rec, Path(path))
+    return targets
+
+
+# ---------------------------------------------------------
+# Commands
+# ---------------------------------------------------------
+def cmd_scan(args) -> int:
+    result = _scan(args)
+    _emit(result)
+    return EXIT_OK if result.get("found_games") else EXIT_NOTHING
+
+
+def cmd_patch(args) -> int:
+    from services.patching import apply_patch
+
+    targets = _select_targets(args)
+    if not targets:
+        _emit({"results": [], "error": "No supported games detected."})
+        return EXIT_NOTHING
+    results: List[dict] = []
+    failed = False
+    for title, (rec, game_dir) in targets.items():
+        try:
+            results.append({"ok": True, **apply_patch(rec, game_dir, log_cb=_log(args.quiet), dedup=args.dedup)})
+        except Exception as e:
+            failed = True
+            results.append({"ok": False, "game": title, "target": str(game_dir), "error": str(e)})
+    _emit({"results": results})
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def cmd_disable(args) -> int:
+    from services.disabler import disable_many
+
+    targets = _select_targets(args)
+    if not targets:
+        _emit({"results": [], "error": "No supported games detected."})
+        return EXIT_NOTHING
+    results = disable_many(targets.values(), log_cb=_log(args.quiet), link=args.link, force=args.force)
+    _emit({"results": results})
+    return EXIT_OK if all(r["ok"] for r in results) else EXIT_FAILED
+
+
+def cmd_block(args) -> int:
+    from services.admin import is_admin
+    from services.blocklist import ROGUE_IPS_URL, fetch_blocklist, normalize_blocklist
+
+    if os.name != "nt":
+        _emit({"ok": False, "error": "Windows only."})
+        return EXIT_UNSUPPORTED
+    if not is_admin():
+        _emit({"ok": False, "error": "Administrator privileges required."})
+        return EXIT_UNSUPPORTED
+
+    from services.firewall import apply_blocklist
+
+    log = _log(args.quiet)
+    try:
+        if args.file:
+            with open(args.file, "r", encoding="utf-8", errors="ignore") as f:
+                ips = normalize_blocklist(f)
+        else:
+            log(f"🌐 Downloading {args.url or ROGUE_IPS_URL} …")
+            ips = fetch_blocklist(args.url or ROGUE_IPS_URL)
+        count = apply_blocklist(ips, rule_prefix=args.rule_prefix,
+                                progress_callback=lambda _p, msg: log(msg) if msg else None)
+    except Exception as e:
+        _emit({"ok": False, "error": str(e)})
+        return EXIT_FAILED
+    _emit({"ok": True, "blocked": count, "rule_prefix": args.rule_prefix})
+    return EXIT_OK
+
+
+def cmd_batch(args) -> int:
+    from services.batch import BatchPatcher, build_targets, discover_targets, load_manifest, write_report
+
+    log = _log(args.quiet)
+    entries = [{"path": p} for p in args.targets]
+    if args.manifest:
+        entries.extend(load_manifest(Path(args.manifest)))
+    if args.discover or not entries:
+        entries.extend(discover_targets(deep=args.deep, log_cb=log))
+    targets = build_targets(entries, log_cb=log)
+    if not targets:
+        _emit({"ok": False, "error": "No patch targets."})
+        return EXIT_NOTHING
+
+    batch = BatchPatcher(targets, per_volume=args.per_volume, max_workers=args.workers,
+                         retries=args.retries, log_cb=log, dedup=args.dedup)
+    report = batch.run()   # cancels itself on KeyboardInterrupt
+    report["report_path"] = str(write_report(report, Path(args.report) if args.report else None))
+    _emit(report)
+    return EXIT_OK if report["failed"] == 0 else EXIT_FAILED
+
+
+# ---------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="ins2doi", description="INS2DOI Community Patcher (headless)")
+    ap.add_argument("-q", "--quiet", action="store_true", help="no progress output on stderr")
+    ap.add_argument("-v", "--verbose", action="store_true", help="debug logging on stderr")
+    ap.add_argument("--metrics-dir", type=Path, help="where to write the run's metrics snapshot")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    def scan_opts(p):
+        p.add_argument("--no-cache", action="store_true", help="ignore the scan cache and rescan")
+        deep = p.add_mutually_exclusive_group()
+        deep.add_argument("--no-deep", action="store_true", help="skip the deep drive scan fallback")
+        deep.add_argument("--full-deep", action="store_true",
+                          help="give the deep drive scan its full per-drive time budget instead of a quick pass")
+
+    p = sub.add_parser("scan", help="locate supported games")
+    scan_opts(p)
+    p.set_defaults(func=cmd_scan)
+
+    for name, func, help_ in (("patch", cmd_patch, "apply the BattlEye patch"),
+                              ("disable", cmd_disable, "create the _BE exe from the x64 exe")):
+        p = sub.add_parser(name, help=help_)
+        p.add_argument("--game", action="append", help="game key, title or AppID (repeatable)")
+        p.add_argument("--target", help="explicit game install directory")
+        scan_opts(p)
+        p.set_defaults(func=func, dedup=False)
+    sub.choices["patch"].add_argument("--dedup", action="store_true", help=_DEDUP_HELP)
+    sub.choices["disable"].add_argument("--link", action="store_true",
+                                        help="hardlink the _BE exe to the x64 exe instead of copying")
+    sub.choices["disable"].add_argument("--force", action="store_true",
+                                        help="recreate the _BE exe even if it is already up to date")
+
+    p = sub.add_parser("block", help="install the Rogue IP firewall rules")
+    src = p.add_mutually_exclusive_group()
+    src.add_argument("--url", help="blocklist URL (default: Rogue IP list)")
+    src.add_argument("--file", help="local blocklist file")
+    p.add_argument("--rule-prefix", default="GameSpamFilter")
+    p.set_defaults(func=cmd_block)
+
+    p = sub.add_parser("batch", help="patch many install directories (fleet mode)")
+    p.add_argument("targets", nargs="*", help="game install directories")
+    p.add_argument("--manifest", help="JSON or text file listing install directories (JSON entries may set \"disk\" to group targets)")
+    p.add_argument("--discover", action="store_true", help="add every install found in the Steam libraries")
+    p.add_argument("--deep", action="store_true", help="with --discover: also walk all drives")
+    p.add_argument("--per-volume", type=int, default=1, help="parallel jobs per physical disk (default 1)")
+    p.add_argument("--workers", type=int, default=4, help="parallel jobs overall (default 4)")
+    p.add_argument("--retries", type=int, default=2, help="retries for transient I/O errors")
+    p.add_argument("--report", help="report file (default: cache dir/reports/batch_<time>.json)")
+    p.add_argument("--dedup", action="store_true", help=_DEDUP_HELP)
+    p.set_defaults(func=cmd_batch)
+    return ap
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return EXIT_OK if e.code == 0 else EXIT_USAGE
+    setup_logging("cli", console_level=logging.DEBUG if args.verbose else logging.WARNING)
+    try:
+        with metrics.MetricsRun(f"cli_{args.command}", directory=args.metrics_dir):
+            return args.func(args)
+    except SystemExit as e:
+        if isinstance(e.code, str):
+            _emit({"ok": False, "error": e.code})
+            return EXIT_USAGE
+        raise
+    except Exception as e:
+        logger.exception("Command failed")
+        _emit({"ok": False, "error": str(e)})
+        return EXIT_FAILED
+
+
+if __name__ == "__main__":
+    sys.exit(main())
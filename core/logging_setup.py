@@ -1,36 +1,99 @@
 # core/logging_setup.py
 # -*- coding: utf-8 -*-
-import tempfile
-from pathlib import Path
-from datetime import datetime
+"""
+Process-wide logging: every module logs through `logging.getLogger(...)`,
+and setup_logging() installs one QueueHandler on the root logger. A
+QueueListener thread owns the handlers (rotating log file + optional
+console), so logging calls on the GUI thread or in workers only enqueue a
+record and never wait on file I/O.
+"""
+from __future__ import annotations
+import atexit
 import logging
-from typing import Optional
-from PySide6.QtWidgets import QPlainTextEdit
-
-LOG_FILE = Path(tempfile.gettempdir()) / "game_tools_suite.log"
-
-def setup_logging(name: str = "game_tools") -> logging.Logger:
-    logger = logging.getLogger(name)
-    if not logger.handlers:
-        logging.basicConfig(
-            level=logging.DEBUG,
-            format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-            datefmt="%H:%M:%S",
-        )
-        logger.setLevel(logging.DEBUG)
-    return logger
-
-def write_log_line(msg: str, log_widget: Optional[QPlainTextEdit] = None) -> None:
-    ts = datetime.now().strftime("%H:%M:%S")
-    line = f"[{ts}] {msg}"
-    try:
-        LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(line + "\n")
-    except Exception:
-        pass
+import logging.handlers
+import queue
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+from services.resource_path import user_cache_dir
+
+if TYPE_CHECKING:  # keep this module importable without Qt (CLI)
+    from PySide6.QtWidgets import QPlainTextEdit
+
+LOG_DIR = user_cache_dir() / "logs"
+LOG_FILE = LOG_DIR / "ins2doi_patcher.log"
+LOG_MAX_BYTES = 2 * 1024 * 1024
+LOG_BACKUPS = 3
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(threadName)s %(name)s: %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_lock = threading.Lock()
+
+
+def setup_logging(
+    name: str = "game_tools",
+    level: int = logging.DEBUG,
+    console_level: Optional[int] = logging.INFO,
+) -> logging.Logger:
+    """
+    Start the logging pipeline once per process (later calls only return
+    the named logger). `console_level=None` disables the stderr handler.
+    """
+    global _listener
+    with _lock:
+        if _listener is None:
+            handlers = []
+            try:
+                LOG_DIR.mkdir(parents=True, exist_ok=True)
+                fh = logging.handlers.RotatingFileHandler(
+                    LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8", delay=True,
+                )
+                fh.setFormatter(logging.Formatter(LOG_FORMAT))
+                fh.setLevel(level)
+                handlers.append(fh)
+            except OSError:
+                pass  # read-only profile: console only
+            if console_level is not None:
+                ch = logging.StreamHandler(sys.stderr)
+                ch.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s", "%H:%M:%S"))
+                ch.setLevel(console_level)
+                handlers.append(ch)
+
+            q: queue.SimpleQueue = queue.SimpleQueue()
+            root = logging.getLogger()
+            for h in list(root.handlers):
+                root.removeHandler(h)
+            root.addHandler(logging.handlers.QueueHandler(q))
+            root.setLevel(level)
+            _listener = logging.handlers.QueueListener(q, *handlers, respect_handler_level=True)
+            _listener.start()
+            atexit.register(shutdown_logging)
+    return logging.getLogger(name)
+
+
+def shutdown_logging() -> None:
+    """Drain the queue and close the log file (idempotent)."""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for h in listener.handlers:
+            h.close()
+
+
+def log_file() -> Path:
+    return LOG_FILE
+
+
+def write_log_line(msg: str, log_widget: Optional["QPlainTextEdit"] = None) -> None:
+    """Log `msg` through the pipeline (no file I/O on the caller's thread) and echo it to a widget."""
+    logging.getLogger("game_tools").info(msg)
     if log_widget is not None:
+        ts = datetime.now().strftime("%H:%M:%S")
         try:
-            log_widget.appendPlainText(line)
+            log_widget.appendPlainText(f"[{ts}] {msg}")
         except Exception:
             pass
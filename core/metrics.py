@@ -0,0 +1,229 @@
+# core/metrics.py
+# -*- coding: utf-8 -*-
+"""
+Lightweight in-process metrics: counters, gauges and timers.
+
+Services record through the module-level helpers (stdlib only, no Qt):
+
+    metrics.incr("zip.bytes_written", n)
+    metrics.gauge("firewall.ips", len(ips))
+    with metrics.timer("powershell.run"):
+        ...
+
+Everything lands in the process-wide registry. A MetricsRun additionally
+collects what is recorded while it is open (from any thread; concurrent
+runs see each other's events) and writes it as one JSON snapshot to
+<cache>/metrics/<run>_<time>.json, so runs can be compared across
+machines and builds. Workers wrap their run() with @recorded("scan").
+"""
+from __future__ import annotations
+import functools
+import json
+import logging
+import os
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+from services.resource_path import user_cache_dir
+
+logger = logging.getLogger("core.metrics")
+
+SCHEMA = 1
+KEEP_SNAPSHOTS = 200
+
+
+class _Samples:
+    """Counters, gauges and timer aggregates of one collection scope."""
+
+    def __init__(self):
+        self.counters: Dict[str, int] = {}
+        self.gauges: Dict[str, float] = {}
+        self.timers: Dict[str, List[float]] = {}   # name -> [count, total, min, max]
+
+    def add(self, name: str, n) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def set(self, name: str, value) -> None:
+        self.gauges[name] = value
+
+    def observe(self, name: str, seconds: float) -> None:
+        t = self.timers.get(name)
+        if t is None:
+            self.timers[name] = [1, seconds, seconds, seconds]
+        else:
+            t[0] += 1
+            t[1] += seconds
+            t[2] = min(t[2], seconds)
+            t[3] = max(t[3], seconds)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "counters": dict(sorted(self.counters.items())),
+            "gauges": dict(sorted(self.gauges.items())),
+            "timers": {
+                name: {"count": c, "total_ms": round(tot * 1000, 3), "mean_ms": round(tot / c * 1000, 3),
+                       "min_ms": round(lo * 1000, 3), "max_ms": round(hi * 1000, 3)}
+                for name, (c, tot, lo, hi) in sorted(self.timers.items())
+            },
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe sink; every event goes to the process totals and all open runs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._total = _Samples()
+        self._active: List[_Samples] = []
+
+    def _scopes(self):
+        return (self._total, *self._active)
+
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            for s in self._scopes():
+                s.add(name, n)
+
+    def gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            for s in self._scopes():
+                s.set(name, value)
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            for s in self._scopes():
+                s.observe(name, seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0)
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return self._total.as_dict()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._total = _Samples()
+
+    def _open(self) -> _Samples:
+        s = _Samples()
+        with self._lock:
+            self._active.append(s)
+        return s
+
+    def _close(self, s: _Samples) -> Dict[str, object]:
+        with self._lock:
+            self._active.remove(s)
+            return s.as_dict()
+
+
+REGISTRY = MetricsRegistry()
+
+def incr(name: str, n: int = 1) -> None:
+    REGISTRY.incr(name, n)
+
+def gauge(name: str, value: float) -> None:
+    REGISTRY.gauge(name, value)
+
+def observe(name: str, seconds: float) -> None:
+    REGISTRY.observe(name, seconds)
+
+def timer(name: str):
+    return REGISTRY.timer(name)
+
+def snapshot() -> Dict[str, object]:
+    return REGISTRY.snapshot()
+
+
+# ---------------------------------------------------------
+# Per-run snapshots
+# ---------------------------------------------------------
+def metrics_dir() -> Path:
+    return user_cache_dir() / "metrics"
+
+def _build_info() -> Dict[str, object]:
+    return {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "frozen": bool(getattr(sys, "frozen", False)),
+    }
+
+
+class MetricsRun:
+    """
+    Context manager collecting the metrics of one operation. On exit the
+    snapshot is available as `.result` and, unless `write` is False,
+    written as JSON (`.path`).
+    """
+
+    def __init__(self, name: str, directory: Optional[Path] = None, write: bool = True):
+        self.name = name
+        self.directory = directory
+        self.write = write
+        self.result: Optional[Dict[str, object]] = None
+        self.path: Optional[Path] = None
+
+    def __enter__(self) -> "MetricsRun":
+        self._started = datetime.now()
+        self._t0 = time.perf_counter()
+        self._samples = REGISTRY._open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        data = REGISTRY._close(self._samples)
+        self.result = {
+            "schema": SCHEMA,
+            "run": self.name,
+            "started": self._started.isoformat(timespec="seconds"),
+            "seconds": round(time.perf_counter() - self._t0, 4),
+            "ok": exc_type is None,
+            "build": _build_info(),
+            **data,
+        }
+        if self.write:
+            try:
+                self.path = write_snapshot(self.result, self.directory)
+            except OSError:
+                logger.exception("Could not write metrics snapshot for %s", self.name)
+        return False
+
+
+def write_snapshot(data: Dict[str, object], directory: Optional[Path] = None) -> Path:
+    directory = metrics_dir() if directory is None else Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{data.get('run', 'run')}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.json"
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    _prune(directory)
+    logger.debug("Metrics snapshot -> %s", path)
+    return path
+
+def _prune(directory: Path) -> None:
+    snaps = sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+    for old in snaps[:-KEEP_SNAPSHOTS]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+
+
+def recorded(name: str) -> Callable:
+    """Decorate a worker's run() so every run ends in a metrics snapshot."""
+    def deco(run: Callable) -> Callable:
+        @functools.wraps(run)
+        def wrapper(self, *args, **kwargs):
+            with MetricsRun(name):
+                return run(self, *args, **kwargs)
+        return wrapper
+    return deco
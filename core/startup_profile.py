@@ -0,0 +1,228 @@
+# core/startup_profile.py
+# -*- coding: utf-8 -*-
+"""
+Opt-in startup profiler.
+
+Enable with INS2DOI_PROFILE_STARTUP=1 or the --profile-startup flag. It
+records the phases of app.main() (plus, for the onefile build, the time
+the PyInstaller bootloader spent unpacking _MEIPASS before this process
+started) and the in-process cost of every module imported after it was
+enabled, in the spirit of `python -X importtime`. The report is written
+next to the log file as startup_<time>.txt/.json when the window is first
+painted.
+
+This module must stay stdlib-only: it is imported before PySide6.
+"""
+from __future__ import annotations
+import importlib.abc
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ENV_VAR = "INS2DOI_PROFILE_STARTUP"
+FLAG = "--profile-startup"
+
+
+# ---------------------------------------------------------
+# Process start times (best effort)
+# ---------------------------------------------------------
+def _proc_start_linux(pid: int) -> Optional[float]:
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            stat = f.read()
+        ticks = int(stat.rsplit(")", 1)[1].split()[19])
+        with open("/proc/stat", "r") as f:
+            btime = next(int(ln.split()[1]) for ln in f if ln.startswith("btime"))
+        return btime + ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, StopIteration):
+        return None
+
+def _proc_start_windows(pid: int) -> Optional[float]:
+    try:
+        import ctypes
+        from ctypes import wintypes
+        k32 = ctypes.windll.kernel32
+        handle = k32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return None
+        try:
+            times = [wintypes.FILETIME() for _ in range(4)]
+            if not k32.GetProcessTimes(handle, *[ctypes.byref(t) for t in times]):
+                return None
+            ft = (times[0].dwHighDateTime << 32) | times[0].dwLowDateTime
+            return ft / 1e7 - 11644473600.0  # FILETIME epoch 1601 -> unix
+        finally:
+            k32.CloseHandle(handle)
+    except Exception:
+        return None
+
+def process_start_time(pid: Optional[int] = None) -> Optional[float]:
+    pid = os.getpid() if pid is None else pid
+    return _proc_start_windows(pid) if os.name == "nt" else _proc_start_linux(pid)
+
+
+# ---------------------------------------------------------
+# Import timing
+# ---------------------------------------------------------
+class _TimingLoader:
+    """Loader proxy timing module execution; everything else is delegated."""
+
+    def __init__(self, loader, name: str, profiler: "StartupProfiler"):
+        self._loader = loader
+        self._name = name
+        self._profiler = profiler
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        prof = self._profiler
+        t0 = time.perf_counter()
+        prof._stack.append(0.0)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            children = prof._stack.pop()
+            total = time.perf_counter() - t0
+            prof.imports.append((self._name, total - children, total, len(prof._stack)))
+            if prof._stack:
+                prof._stack[-1] += total
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        # Only the main thread is timed; re-entrance means we are inside our own lookup
+        if threading.current_thread() is not threading.main_thread() or getattr(self._local, "busy", False):
+            return None
+        self._local.busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimingLoader(spec.loader, fullname, self._profiler)
+                    return spec
+            return None
+        finally:
+            self._local.busy = False
+
+
+# ---------------------------------------------------------
+# Profiler
+# ---------------------------------------------------------
+class StartupProfiler:
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.wall0 = time.time()
+        self.phases: List[Tuple[str, float]] = []   # (name, seconds since previous mark)
+        self.imports: List[Tuple[str, float, float, int]] = []   # (module, self s, cumulative s, depth)
+        self._stack: List[float] = []
+        self._last = self.t0
+        self._finder = _TimingFinder(self)
+        self._pre_start = self._bootstrap_phases()
+        sys.meta_path.insert(0, self._finder)
+        self.reported: Optional[Path] = None
+
+    def _bootstrap_phases(self) -> List[Tuple[str, float]]:
+        """Time spent before this module ran: bootloader/unpack (onefile) and interpreter start."""
+        phases: List[Tuple[str, float]] = []
+        start = process_start_time()
+        if start is None:
+            return phases
+        if getattr(sys, "frozen", False) and getattr(sys, "_MEIPASS", None):
+            parent = process_start_time(os.getppid())
+            if parent is not None and parent <= start:
+                phases.append(("bootloader: unpack _MEIPASS", start - parent))
+        phases.append(("interpreter start", max(0.0, self.wall0 - start)))
+        return phases
+
+    def mark(self, name: str) -> None:
+        """End the current phase under `name`."""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+        # shiboken/PyInstaller insert their own finders at the front; stay first
+        if self.reported is None and sys.meta_path and sys.meta_path[0] is not self._finder:
+            self.stop_imports()
+            sys.meta_path.insert(0, self._finder)
+
+    def stop_imports(self) -> None:
+        try:
+            sys.meta_path.remove(self._finder)
+        except ValueError:
+            pass
+
+    # ---------- report ----------
+    def report(self, top: int = 40) -> Dict[str, object]:
+        phases = self._pre_start + self.phases
+        by_self = sorted(self.imports, key=lambda i: i[1], reverse=True)
+        return {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "frozen": bool(getattr(sys, "frozen", False)),
+            "python": sys.version.split()[0],
+            "total_seconds": round(sum(s for _n, s in phases), 4),
+            "phases": [{"phase": n, "ms": round(s * 1000, 1)} for n, s in phases],
+            "imports_total_ms": round(sum(i[1] for i in self.imports) * 1000, 1),
+            "imports": [
+                {"module": m, "self_ms": round(s * 1000, 2), "cumulative_ms": round(c * 1000, 2), "depth": d}
+                for m, s, c, d in by_self[:top]
+            ],
+            "import_count": len(self.imports),
+        }
+
+    def write_report(self, directory: Optional[Path] = None) -> Path:
+        self.stop_imports()
+        if directory is None:
+            from core.logging_setup import LOG_DIR
+            directory = LOG_DIR
+        directory.mkdir(parents=True, exist_ok=True)
+        data = self.report()
+        stem = directory / f"startup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        stem.with_suffix(".json").write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+        lines = [f"Startup profile {data['created']} (frozen={data['frozen']}, Python {data['python']})",
+                 f"Total {data['total_seconds'] * 1000:.1f} ms", "", "Phases:"]
+        lines += [f"  {p['ms']:>9.1f} ms  {p['phase']}" for p in data["phases"]]
+        lines += ["", f"Imports ({data['import_count']} modules, {data['imports_total_ms']:.1f} ms), by self time:",
+                  f"  {'self ms':>9} {'cumul ms':>9}  module"]
+        lines += [f"  {i['self_ms']:>9.2f} {i['cumulative_ms']:>9.2f}  {'  ' * i['depth']}{i['module']}"
+                  for i in data["imports"]]
+        stem.with_suffix(".txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        self.reported = stem.with_suffix(".txt")
+        return self.reported
+
+
+_profiler: Optional[StartupProfiler] = None
+
+def enabled() -> bool:
+    return os.environ.get(ENV_VAR, "").strip() not in ("", "0", "false", "no") or FLAG in sys.argv
+
+def start_if_enabled() -> Optional[StartupProfiler]:
+    """Call before any heavy import. Strips the --profile-startup flag from sys.argv."""
+    global _profiler
+    if _profiler is None and enabled():
+        if FLAG in sys.argv:
+            sys.argv.remove(FLAG)
+        _profiler = StartupProfiler()
+    return _profiler
+
+def get_profiler() -> Optional[StartupProfiler]:
+    return _profiler
+
+def mark(name: str) -> None:
+    if _profiler is not None:
+        _profiler.mark(name)
@@ -0,0 +1,192 @@
+# core/worker_profile.py
+# -*- coding: utf-8 -*-
+"""
+Opt-in profiling of worker run() methods.
+
+Enable with INS2DOI_PROFILE_WORKERS=1 (or set_enabled(True)). Each run of
+a decorated method is wrapped in tracemalloc and, if no other profiled run
+is active, in cProfile. Only one cProfile session can be active per process
+on Python >= 3.12 (it is built on sys.monitoring and then sees all
+threads), so runs that overlap it get memory data only. Per run it writes
+to <cache>/profiles/:
+
+    <worker>_<time>.pstats       load with pstats / snakeviz
+    <worker>_<time>.txt          top functions by cumulative time + top allocations
+
+and emits one summary line (wall time, peak memory) through the worker's
+log signal. When disabled the decorator only adds one flag check.
+"""
+from __future__ import annotations
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+from services.resource_path import user_cache_dir
+
+logger = logging.getLogger("core.worker_profile")
+
+ENV_VAR = "INS2DOI_PROFILE_WORKERS"
+TOP_N = 25
+
+_enabled = os.environ.get(ENV_VAR, "").strip() not in ("", "0", "false", "no")
+_tm_lock = threading.Lock()
+_tm_users = 0
+_prof_lock = threading.Lock()
+_prof_active = False
+
+
+def set_enabled(on: bool) -> None:
+    global _enabled
+    _enabled = bool(on)
+
+def is_enabled() -> bool:
+    return _enabled
+
+def profiles_dir() -> Path:
+    return user_cache_dir() / "profiles"
+
+
+def _tracemalloc_start() -> bool:
+    """Start (or join) tracing; True if this run has the peak to itself."""
+    global _tm_users
+    with _tm_lock:
+        if _tm_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+        _tm_users += 1
+        # Resetting while other runs are active would wipe their peaks
+        if _tm_users == 1:
+            tracemalloc.reset_peak()
+            return True
+        return False
+
+def _tracemalloc_stop() -> None:
+    global _tm_users
+    with _tm_lock:
+        _tm_users -= 1
+        if _tm_users == 0:
+            tracemalloc.stop()
+
+
+class RunProfile:
+    """Context manager profiling one worker run; `summary` is set on exit."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.summary: Optional[str] = None
+        self.report_path: Optional[Path] = None
+
+    def __enter__(self) -> "RunProfile":
+        self._exclusive = _tracemalloc_start()
+        try:
+            self._profile = self._claim_profiler()
+        except BaseException:
+            _tracemalloc_stop()
+            raise
+        self._t0 = time.perf_counter()
+        return self
+
+    @staticmethod
+    def _claim_profiler() -> Optional[cProfile.Profile]:
+        """An enabled cProfile session, or None if another run (or tool) holds the profiler."""
+        global _prof_active
+        with _prof_lock:
+            if _prof_active:
+                return None
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:   # "Another profiling tool is already active" (debugger, coverage)
+                return None
+            _prof_active = True
+            return profile
+
+    def _release_profiler(self) -> None:
+        global _prof_active
+        if self._profile is not None:
+            self._profile.disable()
+            with _prof_lock:
+                _prof_active = False
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        wall = time.perf_counter() - self._t0
+        try:
+            self._release_profiler()
+            _current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            _tracemalloc_stop()
+        try:
+            self.report_path = self._write(wall, peak, snapshot)
+            where = f" → {self.report_path.name}"
+        except OSError:
+            logger.exception("Could not write worker profile for %s", self.name)
+            where = ""
+        shared = "" if self._exclusive else " (shared with concurrent runs)"
+        cpu = "" if self._profile is not None else ", no cProfile (profiler busy)"
+        self.summary = (f"⏱ [profile] {self.name}: {wall:.2f}s wall, peak {peak / 1048576:.1f} MiB"
+                        f"{shared}{cpu}{where}")
+        logger.info(self.summary)
+        return False
+
+    def _write(self, wall: float, peak: int, snapshot) -> Path:
+        out = profiles_dir()
+        out.mkdir(parents=True, exist_ok=True)
+        stem = out / f"{self.name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        if self._profile is not None:
+            self._profile.dump_stats(str(stem.with_suffix(".pstats")))
+
+        buf = io.StringIO()
+        buf.write(f"{self.name}: wall {wall:.3f}s, peak traced memory {peak / 1048576:.2f} MiB\n")
+        if self._exclusive:
+            buf.write("(peak covers all threads while this run was active)\n\n")
+        else:
+            buf.write("(started while other profiled runs were active: the peak is shared with them\n"
+                      " and may predate this run)\n\n")
+        if self._profile is not None:
+            stats = pstats.Stats(self._profile, stream=buf)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_N)
+        else:
+            buf.write("No cProfile data: another profiled run held the profiler for this run's start.\n")
+        buf.write(f"\nTop {TOP_N} allocations (by line):\n")
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ])
+        for stat in snapshot.statistics("lineno")[:TOP_N]:
+            buf.write(f"  {stat}\n")
+        txt = stem.with_suffix(".txt")
+        txt.write_text(buf.getvalue(), encoding="utf-8")
+        return txt
+
+
+def profiled(log_signal: str = "log", name: Optional[str] = None) -> Callable:
+    """
+    Decorate a worker's run(): when profiling is enabled the run is profiled
+    and the summary line is emitted on `self.<log_signal>`.
+    """
+    def deco(run: Callable) -> Callable:
+        @functools.wraps(run)
+        def wrapper(self, *args, **kwargs):
+            if not _enabled:
+                return run(self, *args, **kwargs)
+            prof = RunProfile(name or type(self).__name__)
+            try:
+                with prof:
+                    return run(self, *args, **kwargs)
+            finally:
+                signal = getattr(self, log_signal, None)
+                if prof.summary and signal is not None:
+                    try:
+                        signal.emit(prof.summary)
+                    except RuntimeError:
+                        pass  # worker already deleted
+        return wrapper
+    return deco
@@ -0,0 +1,272 @@
+# installer/payload_store.py
+# -*- coding: utf-8 -*-
+"""
+Shared payload container for all game patches.
+
+The INS and DOI patch ZIPs carry mostly the same BattlEye files. The
+container stores every distinct file once (content-addressed, compressed)
+plus a per-payload index of 'path -> blob', so the binary carries shared
+files once and extraction decodes only the blobs one game needs.
+
+Layout (all offsets/lengths in bytes, big endian):
+
+    header  12   b"I2DP" | version u16 | index length u32 | 2 pad bytes
+    index   n    UTF-8 JSON, padded with spaces to a multiple of 3
+    blobs   ...  each compressed blob padded with zeros to a multiple of 3
+
+    index = {"blobs":    {sha256: [offset, stored_len, size, method]},
+             "payloads": {payload_name: {"label": ..., "files": {path: sha256}}}}
+
+Every section starts on a 3-byte boundary, so a blob can be base64-decoded
+straight out of the embedded string without decoding anything else.
+Blobs are verified against their SHA-256 (their key) after decompression.
+"""
+from __future__ import annotations
+import base64
+import hashlib
+import importlib
+import json
+import logging
+import lzma
+import struct
+import threading
+import zlib
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from core import metrics
+
+logger = logging.getLogger("ins2doi.payload_store")
+
+MAGIC = b"I2DP"
+VERSION = 1
+_HEADER = struct.Struct(">4sHI2x")   # 12 bytes
+CONTAINER_MODULE = "embedded_payloads"
+
+
+class PayloadError(ValueError):
+    """Malformed container or blob failing verification."""
+
+
+@dataclass(frozen=True)
+class PayloadMember:
+    path: str
+    digest: str
+    size: int
+
+
+def _pad3(n: int) -> int:
+    return -n % 3
+
+
+# ---------------------------------------------------------
+# Building
+# ---------------------------------------------------------
+def _compress(data: bytes) -> Tuple[bytes, str]:
+    packed = lzma.compress(data, preset=9 | lzma.PRESET_EXTREME)
+    if len(packed) < len(data):
+        return packed, "lzma"
+    return data, "store"
+
+def build_container(payloads: Dict[str, Tuple[str, Path]]) -> Tuple[bytes, dict]:
+    """
+    Build container bytes from {payload_name: (label, zip_path)}.
+    Returns (container, stats).
+    """
+    blobs: Dict[str, bytes] = {}
+    sizes: Dict[str, int] = {}
+    index_payloads: Dict[str, dict] = {}
+    raw_total = 0
+    for name, (label, zip_path) in payloads.items():
+        files: Dict[str, str] = {}
+        with zipfile.ZipFile(zip_path, "r") as zf:
+            for info in sorted(zf.infolist(), key=lambda i: i.filename):
+                if info.is_dir():
+                    continue
+                data = zf.read(info)
+                digest = hashlib.sha256(data).hexdigest()
+                raw_total += len(data)
+                if digest not in blobs:
+                    blobs[digest] = data
+                    sizes[digest] = len(data)
+                files[info.filename] = digest
+        index_payloads[name] = {"label": label, "files": files}
+
+    # Offsets depend on the index length, which depends on the offsets: lay
+    # the blobs out relative to 0 first, then shift once the index is sized.
+    packed: List[Tuple[str, bytes, str]] = []
+    rel = 0
+    rel_offsets: Dict[str, int] = {}
+    for digest in sorted(blobs):
+        data, method = _compress(blobs[digest])
+        packed.append((digest, data, method))
+        rel_offsets[digest] = rel
+        rel += len(data) + _pad3(len(data))
+
+    def make_index(base: int) -> bytes:
+        index = {
+            "blobs": {d: [base + rel_offsets[d], len(data), sizes[d], method] for d, data, method in packed},
+            "payloads": index_payloads,
+        }
+        raw = json.dumps(index, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        return raw + b" " * _pad3(len(raw))
+
+    index = make_index(0)
+    while True:
+        base = _HEADER.size + len(index)
+        sized = make_index(base)
+        if len(sized) == len(index):
+            index = sized
+            break
+        index = sized
+
+    out = bytearray(_HEADER.pack(MAGIC, VERSION, len(index)))
+    out += index
+    for _digest, data, _method in packed:
+        out += data + b"\0" * _pad3(len(data))
+
+    stats = {
+        "payloads": len(index_payloads),
+        "files": sum(len(p["files"]) for p in index_payloads.values()),
+        "unique_blobs": len(blobs),
+        "raw_bytes": raw_total,
+        "unique_bytes": sum(sizes.values()),
+        "container_bytes": len(out),
+    }
+    return bytes(out), stats
+
+def write_container_module(container: bytes, out_path: Path) -> str:
+    """Write the container as an importable module (DATA, INDEX_SHA256); returns the index SHA-256."""
+    magic, _version, index_len = _HEADER.unpack_from(container)
+    index_sha = hashlib.sha256(container[_HEADER.size:_HEADER.size + index_len]).hexdigest()
+    b64 = base64.b64encode(container).decode("ascii")
+    with open(out_path, "w", encoding="utf-8", newline="\n") as f:
+        f.write("# Generated by packaging/build_payloads.py - do not edit.\n")
+        f.write(f"INDEX_SHA256 = {index_sha!r}\n")
+        f.write("DATA = (\n")
+        for i in range(0, len(b64), 4096):
+            f.write(f"    {b64[i:i + 4096]!r}\n")
+        f.write(")\n")
+    return index_sha
+
+
+# ---------------------------------------------------------
+# Reading
+# ---------------------------------------------------------
+class PayloadContainer:
+    """Random-access reader over a base64 encoded container string."""
+
+    def __init__(self, b64_data: str, index_sha256: Optional[str] = None):
+        self._b64 = b64_data
+        header = self._slice(0, _HEADER.size)
+        magic, version, index_len = _HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise PayloadError(f"Not a payload container (magic={magic!r}, version={version})")
+        raw_index = self._slice(_HEADER.size, index_len)
+        if index_sha256 and hashlib.sha256(raw_index).hexdigest() != index_sha256:
+            raise PayloadError("Payload index SHA-256 mismatch")
+        index = json.loads(raw_index)
+        self._blobs: Dict[str, list] = index["blobs"]
+        self._payloads: Dict[str, dict] = index["payloads"]
+        self._cache: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_bytes(cls, container: bytes) -> "PayloadContainer":
+        return cls(base64.b64encode(container).decode("ascii"))
+
+    def _slice(self, offset: int, length: int) -> bytes:
+        """Decode only bytes [offset, offset+length) - offset is always 3-aligned."""
+        start = offset // 3 * 4
+        end = -(-(offset + length) // 3) * 4
+        return base64.b64decode(self._b64[start:end])[:length]
+
+    def payloads(self) -> List[str]:
+        return list(self._payloads)
+
+    def has(self, payload: str) -> bool:
+        return payload in self._payloads
+
+    def label(self, payload: str) -> str:
+        return self._payloads[payload].get("label", payload)
+
+    def members(self, payload: str) -> List[PayloadMember]:
+        files = self._payloads[payload]["files"]
+        return [PayloadMember(p, d, self._blobs[d][2]) for p, d in files.items()]
+
+    def read_blob(self, digest: str) -> bytes:
+        with self._lock:
+            cached = self._cache.get(digest)
+        if cached is not None:
+            metrics.incr("payload.blob_cache_hits")
+            return cached
+        try:
+            offset, stored, size, method = self._blobs[digest]
+        except KeyError:
+            raise PayloadError(f"Unknown blob {digest}") from None
+        data = self._slice(offset, stored)
+        if method == "lzma":
+            data = lzma.decompress(data)
+        elif method == "zlib":
+            data = zlib.decompress(data)
+        elif method != "store":
+            raise PayloadError(f"Unknown compression {method!r}")
+        if len(data) != size or hashlib.sha256(data).hexdigest() != digest:
+            raise PayloadError(f"Blob {digest[:12]} failed verification")
+        metrics.incr("payload.blobs_decoded")
+        metrics.incr("payload.bytes_decoded", size)
+        with self._lock:
+            # Shared blobs are reused by the next game; patches are a few MB at most
+            self._cache[digest] = data
+        return data
+
+    def read(self, payload: str, path: str) -> bytes:
+        return self.read_blob(self._payloads[payload]["files"][path])
+
+    def extract(
+        self,
+        payload: str,
+        target_dir: Path,
+        on_file: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, int]:
+        """Write all files of `payload` below `target_dir` (path traversal safe)."""
+        from services.zipops import is_within_directory
+        target_dir = Path(target_dir)
+        target_dir.mkdir(parents=True, exist_ok=True)
+        files = written = 0
+        for m in self.members(payload):
+            dest = target_dir / m.path
+            if not is_within_directory(target_dir, dest):
+                raise PayloadError(f"Unsafe path in payload: {m.path}")
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            data = self.read_blob(m.digest)
+            with open(dest, "wb") as f:
+                f.write(data)
+            files += 1
+            written += len(data)
+            if on_file:
+                on_file(m.path)
+        metrics.incr("payload.files_extracted", files)
+        metrics.incr("payload.bytes_extracted", written)
+        logger.info("Extracted %s (%d files) to %s", payload, files, target_dir)
+        return {"files": files, "bytes_written": written}
+
+
+_container: Optional[PayloadContainer] = None
+_container_loaded = False
+_container_lock = threading.Lock()
+
+def load_container() -> Optional[PayloadContainer]:
+    """The embedded shared container (installer/embedded_payloads.py), or None if not built in."""
+    global _container, _container_loaded
+    with _container_lock:
+        if not _container_loaded:
+            _container_loaded = True
+            try:
+                mod = importlib.import_module(f"installer.{CONTAINER_MODULE}")
+            except ImportError:
+                _container = None
+            else:
+                _container = PayloadContainer(mod.DATA, getattr(mod, "INDEX_SHA256", None))
+        return _container
@@ -1,23 +1,15 @@
 import base64
 import hashlib
+import importlib
 import zipfile
 import tempfile
 import os
 import logging
 from pathlib import Path
+from core import metrics
 
-# Setup a module-level logger that writes to a file in the user's temp directory.
-_log_dir = Path(tempfile.gettempdir()) / "ins2doi_patcher_logs"
-_log_dir.mkdir(parents=True, exist_ok=True)
-_log_file = _log_dir / "installer.log"
-
+# Handlers are configured once by core.logging_setup.setup_logging()
 logger = logging.getLogger("ins2doi.utils")
-if not logger.handlers:
-    fh = logging.FileHandler(_log_file, encoding="utf-8")
-    formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
-    fh.setFormatter(formatter)
-    logger.addHandler(fh)
-    logger.setLevel(logging.INFO)
 
 def decode_embedded_zip(b64_data: str, expected_sha256: str, label: str = "Patch"):
     """
@@ -27,12 +19,16 @@ def decode_embedded_zip(b64_data: str, expected_sha256: str, label: str = "Patch
     """
     logger.info("Decoding %s...", label)
     try:
-        raw = base64.b64decode(b64_data)
+        with metrics.timer("payload.legacy.decode"):
+            raw = base64.b64decode(b64_data)
     except Exception as e:
         logger.exception("Base64 decoding failed for %s", label)
         raise
+    metrics.incr("payload.legacy.decodes")
+    metrics.incr("payload.legacy.bytes_decoded", len(raw))
 
-    sha = hashlib.sha256(raw).hexdigest()
+    with metrics.timer("payload.legacy.verify"):
+        sha = hashlib.sha256(raw).hexdigest()
     if sha != expected_sha256:
         logger.error("SHA-256 mismatch for %s. Expected %s, got %s", label, expected_sha256, sha)
         raise ValueError(f"SHA-256 mismatch for {label}! Expected: {expected_sha256}, Got: {sha}")
@@ -48,6 +44,14 @@ def decode_embedded_zip(b64_data: str, expected_sha256: str, label: str = "Patch
     logger.info("%s verified (%d bytes) -> %s", label, len(raw), temp_zip.name)
     return temp_zip.name
 
+def load_embedded_payload(module_name: str):
+    """
+    Import an embedded payload module (installer/<module_name>.py) on demand.
+    Returns (BASE64_DATA, SHA256).
+    """
+    mod = importlib.import_module(f"installer.{module_name}")
+    return mod.BASE64_DATA, mod.SHA256
+
 def extract_zip(zip_path: str, target_dir: str):
     """
     Extract the given zip file to the target directory. Creates the target dir if missing.
@@ -56,8 +60,11 @@ def extract_zip(zip_path: str, target_dir: str):
     target.mkdir(parents=True, exist_ok=True)
     logger.info("Extracting %s to %s", os.path.basename(zip_path), str(target))
     try:
-        with zipfile.ZipFile(zip_path, "r") as z:
+        with metrics.timer("payload.legacy.extract"), zipfile.ZipFile(zip_path, "r") as z:
+            members = [i for i in z.infolist() if not i.is_dir()]
             z.extractall(str(target))
+        metrics.incr("payload.legacy.files_extracted", len(members))
+        metrics.incr("payload.legacy.bytes_extracted", sum(i.file_size for i in members))
     except Exception:
         logger.exception("Failed to extract %s", zip_path)
         raise
@@ -1,20 +1,91 @@
 # models/games.py
 # -*- coding: utf-8 -*-
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import PurePath
+from typing import Dict, Iterable, Iterator, Optional
 
+@dataclass(frozen=True, slots=True)
+class GameRecord:
+    """One supported Source/BattlEye title: scan, patch and disable data in one place."""
+    key: str                    # internal game key, e.g. "insurgency2"
+    title: str                  # human readable title (scan results are keyed by it)
+    appid: str                  # Steam AppID (appmanifest_<appid>.acf)
+    folder: str                 # default '<library>/steamapps/common/<folder>'
+    exe: str                    # 64-bit game executable
+    be_exe: str                 # BattlEye launcher executable the disabler replaces
+    payload: str                # embedded payload module under installer/
+    patch_label: str
+    zip_name: str
+    patch_subdir: str = "BattlEye"
+
+class GameRegistry:
+    """
+    Game records indexed by key, AppID, title, folder and exe name.
+    Every lookup is a dict hit (case-insensitive for title/folder/exe), so
+    scanning, patching and disabling need no substring matching.
+    """
+    __slots__ = ("_records", "_by_key", "_by_appid", "_by_title", "_by_folder", "_by_exe")
+
+    def __init__(self, records: Iterable[GameRecord]):
+        self._records = tuple(records)
+        self._by_key = {r.key: r for r in self._records}
+        self._by_appid = {r.appid: r for r in self._records}
+        self._by_title = {r.title.casefold(): r for r in self._records}
+        self._by_folder = {r.folder.casefold(): r for r in self._records}
+        self._by_exe = {r.exe.casefold(): r for r in self._records}
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        return iter(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get(self, key: str) -> Optional[GameRecord]:
+        return self._by_key.get(key)
+
+    def by_appid(self, appid) -> Optional[GameRecord]:
+        return self._by_appid.get(str(appid))
+
+    def by_title(self, title: str) -> Optional[GameRecord]:
+        return self._by_title.get(title.casefold())
+
+    def by_folder(self, folder: str) -> Optional[GameRecord]:
+        return self._by_folder.get(folder.casefold())
+
+    def by_exe(self, exe_name: str) -> Optional[GameRecord]:
+        return self._by_exe.get(exe_name.casefold())
+
+    def resolve(self, name: str, path=None) -> Optional[GameRecord]:
+        """Find a record from a key, title, AppID or folder name, else from the install dir name."""
+        rec = (self._by_key.get(name) or self._by_title.get(name.casefold())
+               or self._by_appid.get(name) or self._by_folder.get(name.casefold()))
+        if rec is None and path:
+            rec = self._by_folder.get(PurePath(str(path)).name.casefold())
+        return rec
+
+
+GAMES = GameRegistry([
+    GameRecord(
+        key="dayofinfamy", title="Day of Infamy", appid="447820", folder="dayofinfamy",
+        exe="dayofinfamy_x64.exe", be_exe="dayofinfamy_BE.exe",
+        payload="embedded_doi_patch", patch_label="Day of Infamy Patch", zip_name="doi_patch.zip",
+    ),
+    GameRecord(
+        key="insurgency2", title="Insurgency 2", appid="222880", folder="insurgency2",
+        exe="insurgency_x64.exe", be_exe="insurgency_BE.exe",
+        payload="embedded_ins_patch", patch_label="Insurgency 2 Patch", zip_name="ins_patch.zip",
+    ),
+])
+
+# Legacy views derived from the registry
 # Map: game key -> steam folder name
-GAME_FOLDERS = {
-    "dayofinfamy": "dayofinfamy",
-    "insurgency2": "insurgency2",
-}
+GAME_FOLDERS: Dict[str, str] = {r.key: r.folder for r in GAMES}
 
 # Mapping game-key -> Human Readable/Original Titel (für Scan/Prefill)
-GKEY_TO_TITLE = {
-    "dayofinfamy": "Day of Infamy",
-    "insurgency2": "Insurgency 2",
-}
+GKEY_TO_TITLE: Dict[str, str] = {r.key: r.title for r in GAMES}
 
-# (Optional) Detail-Metadaten für UI/Scan
-GAMES_META = {
-    "Day of Infamy": {"AppID": "447820", "exe": "dayofinfamy_x64.exe", "Folder": "dayofinfamy"},
-    "Insurgency 2": {"AppID": "222880", "exe": "insurgency_x64.exe", "Folder": "insurgency2"},
+# Detail-Metadaten für UI/Scan
+GAMES_META: Dict[str, Dict[str, str]] = {
+    r.title: {"AppID": r.appid, "exe": r.exe, "Folder": r.folder} for r in GAMES
 }
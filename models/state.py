@@ -1,7 +1,10 @@
 # models/state.py
 # -*- coding: utf-8 -*-
+import logging
 from dataclasses import dataclass, field
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger("models.state")
 
 @dataclass
 class ScanResult:
@@ -9,3 +12,89 @@ class ScanResult:
     missing: List[str] = field(default_factory=list)
     libraries: List[str] = field(default_factory=list)
     scan_log_text: str = ""
+
+@dataclass(frozen=True)
+class GameFound:
+    """Emitted by the scanner as soon as a game install is confirmed."""
+    name: str
+    path: str
+    source: str = "library"   # "manifest" | "library" | "drive" | "cache" | "watcher"
+    appid: Optional[str] = None
+
+# Subscriber: callback(kind, game) with kind in {"added", "removed", "reset"}
+StoreListener = Callable[[str, Optional[GameFound]], None]
+
+class ScanResultStore:
+    """
+    Live scan results shared by MainWindow and the pages.
+    Games are added while a scan is still running; pages subscribe to changes
+    instead of polling a finished dict. Not thread-safe: update it from the GUI thread.
+    """
+
+    def __init__(self):
+        self._games: Dict[str, GameFound] = {}
+        self.missing: List[str] = []
+        self.libraries: List[str] = []
+        self.extra: Dict[str, object] = {}
+        self._listeners: List[StoreListener] = []
+
+    # ---------- subscriptions ----------
+    def subscribe(self, listener: StoreListener) -> None:
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def unsubscribe(self, listener: StoreListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, kind: str, game: Optional[GameFound]) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(kind, game)
+            except Exception:
+                logger.exception("Store listener failed")
+
+    # ---------- updates ----------
+    def add_game(self, game: GameFound) -> None:
+        if self._games.get(game.name) == game:
+            return
+        self._games[game.name] = game
+        if game.name in self.missing:
+            self.missing.remove(game.name)
+        self._notify("added", game)
+
+    def remove_game(self, name: str) -> None:
+        game = self._games.pop(name, None)
+        if game is not None:
+            if name not in self.missing:
+                self.missing.append(name)
+            self._notify("removed", game)
+
+    def replace(self, results: Optional[dict]) -> None:
+        """Adopt a complete scan result dict (finished scan or cache)."""
+        results = results or {}
+        source = "cache" if results.get("from_cache") else "library"
+        found = results.get("found_games") or {}
+        self._games = {
+            name: self._games.get(name) if self._games.get(name) and self._games[name].path == str(path)
+            else GameFound(name, str(path), source)
+            for name, path in found.items()
+        }
+        self.missing = list(results.get("missing") or [])
+        self.libraries = list(results.get("libraries") or [])
+        self.extra = {k: v for k, v in results.items() if k not in ("found_games", "missing", "libraries")}
+        self._notify("reset", None)
+
+    # ---------- queries ----------
+    def games(self) -> Dict[str, GameFound]:
+        return dict(self._games)
+
+    def snapshot(self) -> dict:
+        """Legacy dict view: {"found_games": {name: path}, "missing": [...], "libraries": [...]}."""
+        snap = dict(self.extra)
+        snap.update({
+            "found_games": {name: g.path for name, g in self._games.items()},
+            "missing": list(self.missing),
+            "libraries": list(self.libraries),
+        })
+        return snap
@@ -0,0 +1,91 @@
+# packaging/build_payloads.py
+# -*- coding: utf-8 -*-
+"""
+Build the shared payload container (installer/embedded_payloads.py) from
+the per-game patch ZIPs.
+
+    python packaging/build_payloads.py --zip embedded_ins_patch=ins_patch.zip \\
+                                       --zip embedded_doi_patch=doi_patch.zip
+    python packaging/build_payloads.py --from-modules
+
+--from-modules reads the legacy installer/embedded_*_patch.py modules.
+The patcher prefers the container and only falls back to those modules
+when it is missing. While installer/embedded_payloads.py exists,
+INS2DOI_Community_Patcher.spec leaves the legacy modules out of the build
+(datas and imports); delete the container module to ship them again.
+"""
+from __future__ import annotations
+import argparse
+import base64
+import hashlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from installer.payload_store import CONTAINER_MODULE, PayloadContainer, build_container, write_container_module  # noqa: E402
+from installer.utils import load_embedded_payload  # noqa: E402
+from models.games import GAMES  # noqa: E402
+
+
+def _zips_from_modules(tmp_dir: Path) -> Dict[str, Tuple[str, Path]]:
+    payloads: Dict[str, Tuple[str, Path]] = {}
+    for rec in GAMES:
+        data, sha = load_embedded_payload(rec.payload)
+        raw = base64.b64decode(data)
+        if hashlib.sha256(raw).hexdigest() != sha:
+            raise SystemExit(f"SHA-256 mismatch in installer/{rec.payload}.py")
+        zp = tmp_dir / rec.zip_name
+        zp.write_bytes(raw)
+        payloads[rec.payload] = (rec.patch_label, zp)
+    return payloads
+
+
+def main(argv: List[str] = None) -> int:
+    ap = argparse.ArgumentParser(description="Build the shared patch payload container")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--zip", action="append", metavar="PAYLOAD=ZIP",
+                     help="payload module name (see models/games.py) and its patch ZIP; repeatable")
+    src.add_argument("--from-modules", action="store_true", help="read the embedded_*_patch.py modules")
+    ap.add_argument("-o", "--output", default=str(ROOT / "installer" / f"{CONTAINER_MODULE}.py"))
+    args = ap.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.from_modules:
+            payloads = _zips_from_modules(Path(tmp))
+        else:
+            labels = {r.payload: r.patch_label for r in GAMES}
+            payloads = {}
+            for spec in args.zip:
+                name, sep, path = spec.partition("=")
+                if not sep or name not in labels:
+                    ap.error(f"--zip expects PAYLOAD=ZIP with PAYLOAD in {sorted(labels)}")
+                payloads[name] = (labels[name], Path(path))
+        legacy_b64 = sum(-(-os.path.getsize(zp) // 3) * 4 for _label, zp in payloads.values())
+        container, stats = build_container(payloads)
+
+    # Round-trip check before writing anything
+    reader = PayloadContainer.from_bytes(container)
+    for name in payloads:
+        for m in reader.members(name):
+            reader.read_blob(m.digest)
+
+    out = Path(args.output)
+    index_sha = write_container_module(container, out)
+    embedded = -(-len(container) // 3) * 4
+    print(f"Wrote {out} (index sha256 {index_sha[:16]}…)")
+    print(f"  payloads {stats['payloads']}, files {stats['files']}, unique blobs {stats['unique_blobs']}")
+    print(f"  file data {stats['raw_bytes']:,} B -> unique {stats['unique_bytes']:,} B")
+    print(f"  embedded base64 {legacy_b64:,} B (separate ZIPs) -> {embedded:,} B (container)")
+    legacy = sorted(p.name for p in (ROOT / "installer").glob("embedded_*_patch.py"))
+    if legacy and out.resolve() == (ROOT / "installer" / f"{CONTAINER_MODULE}.py").resolve():
+        print(f"  the PyInstaller spec now leaves out {', '.join(legacy)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
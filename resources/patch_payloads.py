@@ -3,21 +3,11 @@ import base64
 import tempfile
 from pathlib import Path
 import sys
+from models.games import GAMES, GAME_FOLDERS, GKEY_TO_TITLE  # noqa: F401  (re-exported)
+from services.zipops import compute_sha256
 
 # -------------------- Embedded ZIP placeholders --------------------
 
-# Map: game key -> steam folder name
-GAME_FOLDERS = {
-    "dayofinfamy": "dayofinfamy",
-    "insurgency2": "insurgency2",
-}
-
-# Mapping between patcher keys and human titles (for shared scan results)
-GKEY_TO_TITLE = {
-    "dayofinfamy": "Day of Infamy",
-    "insurgency2": "Insurgency 2",
-}
-
 # Replace with your actual base64 strings and SHA-256 values (hex, lowercase)
 ZIP_DOI_B64 = ""  
 ZIP_DOI_SHA256 = ""  
@@ -26,8 +16,8 @@ ZIP_INS_B64 = ""
 ZIP_INS_SHA256 = ""
 
 EMBEDDED_ZIPS: Dict[str, Dict[str, str]] = {
-    "dayofinfamy": {"b64": ZIP_DOI_B64, "sha256": ZIP_DOI_SHA256, "name": "doi_patch.zip"},
-    "insurgency2": {"b64": ZIP_INS_B64, "sha256": ZIP_INS_SHA256, "name": "ins_patch.zip"},
+    "dayofinfamy": {"b64": ZIP_DOI_B64, "sha256": ZIP_DOI_SHA256, "name": GAMES.get("dayofinfamy").zip_name},
+    "insurgency2": {"b64": ZIP_INS_B64, "sha256": ZIP_INS_SHA256, "name": GAMES.get("insurgency2").zip_name},
 }
 
 def get_embedded_zip_path(game_key: str) -> Optional[Path]:
@@ -0,0 +1,298 @@
+# services/a2s.py
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import asyncio
+import logging
+import struct
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("services.a2s")
+
+Address = Tuple[str, int]
+
+DEFAULT_PORT = 27015
+
+# Source query protocol (https://developer.valvesoftware.com/wiki/Server_queries)
+_HEADER = b"\xFF\xFF\xFF\xFF"
+_SPLIT_HEADER = b"\xFE\xFF\xFF\xFF"
+A2S_INFO = _HEADER + b"TSource Engine Query\x00"
+A2S_PLAYER = _HEADER + b"U"
+S2C_CHALLENGE = 0x41  # 'A'
+S2A_INFO = 0x49       # 'I'
+S2A_PLAYER = 0x44     # 'D'
+_NO_CHALLENGE = b"\xFF\xFF\xFF\xFF"
+
+
+class A2SError(Exception):
+    pass
+
+
+@dataclass
+class ServerInfo:
+    name: str
+    map: str
+    folder: str
+    game: str
+    app_id: int
+    players: int
+    max_players: int
+    bots: int
+    server_type: str
+    environment: str
+    visibility: int
+    vac: int
+    version: str = ""
+
+
+@dataclass
+class Player:
+    name: str
+    score: int
+    duration: float
+
+
+@dataclass
+class ProbeResult:
+    address: Address
+    info: Optional[ServerInfo] = None
+    players: Optional[List[Player]] = None
+    rtt_ms: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.info is not None
+
+
+@dataclass
+class Suspicion:
+    address: Address
+    reasons: List[str] = field(default_factory=list)
+
+
+# -----------------------------------------------------
+# Packet parsing
+# -----------------------------------------------------
+class _Reader:
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data: bytes, pos: int = 0):
+        self.data = data
+        self.pos = pos
+
+    def byte(self) -> int:
+        if self.pos >= len(self.data):
+            raise A2SError("Truncated packet")
+        v = self.data[self.pos]
+        self.pos += 1
+        return v
+
+    def unpack(self, fmt: str):
+        size = struct.calcsize(fmt)
+        if self.pos + size > len(self.data):
+            raise A2SError("Truncated packet")
+        v = struct.unpack_from(fmt, self.data, self.pos)[0]
+        self.pos += size
+        return v
+
+    def string(self) -> str:
+        end = self.data.find(b"\x00", self.pos)
+        if end < 0:
+            raise A2SError("Unterminated string")
+        s = self.data[self.pos:end].decode("utf-8", errors="replace")
+        self.pos = end + 1
+        return s
+
+
+def parse_info(packet: bytes) -> ServerInfo:
+    r = _Reader(packet, 5)
+    r.byte()  # protocol
+    name, map_, folder, game = r.string(), r.string(), r.string(), r.string()
+    app_id = r.unpack("<h") & 0xFFFF
+    players, max_players, bots = r.byte(), r.byte(), r.byte()
+    server_type, environment = chr(r.byte()), chr(r.byte())
+    visibility, vac = r.byte(), r.byte()
+    try:
+        version = r.string()
+    except A2SError:
+        version = ""
+    return ServerInfo(name, map_, folder, game, app_id, players, max_players, bots,
+                      server_type, environment, visibility, vac, version)
+
+
+def parse_players(packet: bytes) -> List[Player]:
+    r = _Reader(packet, 5)
+    count = r.byte()
+    players: List[Player] = []
+    for _ in range(count):
+        r.byte()  # index (always 0 on most servers)
+        players.append(Player(r.string(), r.unpack("<l"), r.unpack("<f")))
+    return players
+
+
+# -----------------------------------------------------
+# Transport
+# -----------------------------------------------------
+class _QueryProtocol(asyncio.DatagramProtocol):
+    """One UDP socket for all probes; replies are routed to the waiting future by source address."""
+
+    def __init__(self):
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.waiters: Dict[Address, asyncio.Future] = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr):
+        fut = self.waiters.pop((addr[0], addr[1]), None)
+        if fut is not None and not fut.done():
+            fut.set_result(data)
+
+    def error_received(self, exc):
+        logger.debug("UDP error: %s", exc)
+
+
+class _RateLimiter:
+    """Spaces packet sends to at most `rate` per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+            self._next = max(now, self._next) + self.interval
+
+
+class A2SProber:
+    """
+    Concurrent A2S_INFO/A2S_PLAYER prober.
+    `concurrency` bounds servers in flight, `rate` bounds packets per second,
+    `timeout` applies per request and `retries` re-sends lost requests.
+    """
+
+    def __init__(self, concurrency: int = 256, rate: float = 500.0, timeout: float = 2.0,
+                 retries: int = 1, query_players: bool = True):
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.query_players = query_players
+
+    async def _request(self, proto: _QueryProtocol, limiter: _RateLimiter, addr: Address, payload: bytes) -> bytes:
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.retries + 1):
+            fut = loop.create_future()
+            proto.waiters[addr] = fut
+            await limiter.wait()
+            proto.transport.sendto(payload, addr)
+            try:
+                data = await asyncio.wait_for(fut, self.timeout)
+            except asyncio.TimeoutError:
+                continue
+            finally:
+                if proto.waiters.get(addr) is fut:
+                    del proto.waiters[addr]
+            if data.startswith(_SPLIT_HEADER):
+                raise A2SError("Split responses are not supported")
+            if not data.startswith(_HEADER) or len(data) < 5:
+                raise A2SError("Malformed response")
+            return data
+        raise A2SError("Timeout")
+
+    async def _query(self, proto, limiter, addr: Address, payload: bytes, expected: int, challenge_suffix: bool) -> bytes:
+        data = await self._request(proto, limiter, addr, payload)
+        if data[4] == S2C_CHALLENGE:
+            challenge = data[5:9]
+            base = payload[:-4] if challenge_suffix else payload
+            data = await self._request(proto, limiter, addr, base + challenge)
+        if data[4] != expected:
+            raise A2SError(f"Unexpected response type 0x{data[4]:02x}")
+        return data
+
+    async def _probe_one(self, proto, limiter, sem: asyncio.Semaphore, addr: Address) -> ProbeResult:
+        result = ProbeResult(address=addr)
+        async with sem:
+            try:
+                t0 = time.perf_counter()
+                data = await self._query(proto, limiter, addr, A2S_INFO, S2A_INFO, challenge_suffix=False)
+                result.rtt_ms = (time.perf_counter() - t0) * 1000.0
+                result.info = parse_info(data)
+                if self.query_players:
+                    data = await self._query(proto, limiter, addr, A2S_PLAYER + _NO_CHALLENGE, S2A_PLAYER,
+                                             challenge_suffix=True)
+                    result.players = parse_players(data)
+            except (A2SError, OSError) as e:
+                result.error = str(e)
+        return result
+
+    async def probe_many(self, addresses: Iterable[Address]) -> List[ProbeResult]:
+        loop = asyncio.get_running_loop()
+        transport, proto = await loop.create_datagram_endpoint(_QueryProtocol, local_addr=("0.0.0.0", 0))
+        try:
+            limiter = _RateLimiter(self.rate)
+            sem = asyncio.Semaphore(self.concurrency)
+            unique = list(dict.fromkeys((ip, int(port)) for ip, port in addresses))
+            return await asyncio.gather(*(self._probe_one(proto, limiter, sem, a) for a in unique))
+        finally:
+            transport.close()
+
+
+def probe_servers(addresses: Iterable[Address], **kwargs) -> List[ProbeResult]:
+    """Blocking wrapper around A2SProber.probe_many (for worker threads)."""
+    return asyncio.run(A2SProber(**kwargs).probe_many(addresses))
+
+
+# -----------------------------------------------------
+# Spam heuristics
+# -----------------------------------------------------
+def find_suspicious(results: Iterable[ProbeResult], min_roster: int = 2,
+                    max_servers_per_ip: int = 8) -> List[Suspicion]:
+    """
+    Flag fake-server patterns in probe results:
+      - duplicate_roster: the same set of player names (>= min_roster) is reported by
+        several servers; a real player can only be on one server at a time.
+      - player_count_mismatch: A2S_INFO claims human players but the roster is empty,
+        or the roster is larger than max_players.
+      - server_farm: more than `max_servers_per_ip` answering servers on one IP.
+    Faked in-game ping is not visible through A2S, so it is not scored here.
+    """
+    ok = [r for r in results if r.ok]
+    reasons: Dict[Address, List[str]] = defaultdict(list)
+
+    rosters: Dict[frozenset, List[Address]] = defaultdict(list)
+    per_ip: Dict[str, List[Address]] = defaultdict(list)
+    for r in ok:
+        per_ip[r.address[0]].append(r.address)
+        names = frozenset(p.name for p in (r.players or []) if p.name)
+        if len(names) >= min_roster:
+            rosters[names].append(r.address)
+        if r.players is not None:
+            humans = r.info.players - r.info.bots
+            if (humans > 0 and not r.players) or len(r.players) > max(r.info.max_players, 1):
+                reasons[r.address].append("player_count_mismatch")
+
+    for addrs in rosters.values():
+        if len(addrs) > 1:
+            for a in addrs:
+                reasons[a].append("duplicate_roster")
+    for addrs in per_ip.values():
+        if len(addrs) > max_servers_per_ip:
+            for a in addrs:
+                reasons[a].append("server_farm")
+
+    return [Suspicion(a, rs) for a, rs in sorted(reasons.items())]
+
+
+def blocklist_candidates(suspicions: Iterable[Suspicion]) -> List[str]:
+    """Unique IPs of suspicious servers, in a form `services.blocklist` accepts."""
+    return sorted({s.address[0] for s in suspicions})
@@ -0,0 +1,443 @@
+# services/batch.py
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+from core import metrics
+from models.games import GAMES, GameRecord
+from services.dedup import estimate_seconds_saved
+from services.patching import apply_patch, decode_payload
+from services.resource_path import user_cache_dir
+
+logger = logging.getLogger("services.batch")
+
+# Errors that will not go away by trying again
+_PERMANENT_OS_ERRORS = (FileNotFoundError, NotADirectoryError, IsADirectoryError)
+
+
+@dataclass
+class BatchTarget:
+    record: GameRecord
+    path: Path
+    volume: str = ""   # scheduling lane: physical disk id (disk_id) or the manifest's "disk"
+
+@dataclass
+class BatchJobResult:
+    game: str
+    target: str
+    volume: str
+    ok: bool = False
+    attempts: int = 0
+    files: int = 0
+    bytes_written: int = 0
+    bytes_saved: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+# ---------------------------------------------------------
+# Target collection
+# ---------------------------------------------------------
+def volume_id(path: Path) -> str:
+    """
+    Stable id of the filesystem holding `path` (st_dev of the nearest existing
+    parent). This identifies a partition, not a physical disk; disk_id()
+    falls back to it when the disk cannot be determined.
+    """
+    p = Path(path)
+    for candidate in (p, *p.parents):
+        try:
+            return f"dev{os.stat(candidate).st_dev}"
+        except OSError:
+            continue
+    return "unknown"
+
+def _nearest_existing(path: Path) -> Optional[Path]:
+    p = Path(path)
+    for candidate in (p, *p.parents):
+        if candidate.exists():
+            return candidate
+    return None
+
+def _mount_source(dev: int) -> Optional[str]:
+    """Source device of the mount with st_dev `dev` (btrfs, overlay etc. report anonymous devs)."""
+    want = f"{os.major(dev)}:{os.minor(dev)}"
+    try:
+        with open("/proc/self/mountinfo", encoding="utf-8") as f:
+            for ln in f:
+                fields = ln.split()
+                if len(fields) > 2 and fields[2] == want and " - " in ln:
+                    post = ln.split(" - ", 1)[1].split()
+                    return post[1] if len(post) > 1 else None
+    except OSError:
+        pass
+    return None
+
+@functools.lru_cache(maxsize=None)
+def _linux_disk(dev: int, depth: int = 0) -> Optional[str]:
+    """
+    Whole-disk name behind block device `dev`, via sysfs: partitions map to
+    their parent disk, loop devices (mounted images) to the disk holding the
+    backing file, device-mapper/md devices to the disks they are built on.
+    """
+    if depth > 8:
+        return None
+    if os.major(dev) == 0:
+        source = _mount_source(dev)
+        if not source or not source.startswith("/dev/"):
+            return None
+        try:
+            dev = os.stat(source).st_rdev
+        except OSError:
+            return None
+    try:
+        node = Path(f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}").resolve(strict=True)
+    except OSError:
+        return None
+    if (node / "partition").exists():
+        node = node.parent
+    try:
+        backing = (node / "loop" / "backing_file").read_text(encoding="utf-8").strip()
+    except OSError:
+        backing = ""
+    if backing:
+        try:
+            return _linux_disk(os.stat(backing).st_dev, depth + 1) or node.name
+        except OSError:
+            return node.name
+    slaves = sorted((node / "slaves").glob("*")) if (node / "slaves").is_dir() else []
+    if slaves:
+        disks = set()
+        for slave in slaves:
+            try:
+                major, minor = (slave / "dev").read_text(encoding="utf-8").strip().split(":")
+            except (OSError, ValueError):
+                continue
+            disks.add(_linux_disk(os.makedev(int(major), int(minor)), depth + 1) or slave.name)
+        if disks:
+            return "+".join(sorted(disks))
+    return node.name
+
+def _windows_disk(path: Path) -> Optional[str]:
+    """Physical disk number(s) of the volume holding `path` (IOCTL_VOLUME_GET_VOLUME_DISK_EXTENTS)."""
+    import ctypes
+    import struct
+    from ctypes import wintypes
+
+    k32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    k32.CreateFileW.restype = wintypes.HANDLE
+    k32.CreateFileW.argtypes = [wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+                                wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE]
+    k32.DeviceIoControl.argtypes = [wintypes.HANDLE, wintypes.DWORD, wintypes.LPVOID, wintypes.DWORD,
+                                    wintypes.LPVOID, wintypes.DWORD, ctypes.POINTER(wintypes.DWORD),
+                                    wintypes.LPVOID]
+    mount = ctypes.create_unicode_buffer(1024)
+    volume = ctypes.create_unicode_buffer(1024)
+    if not k32.GetVolumePathNameW(str(path), mount, len(mount)):
+        return None
+    if not k32.GetVolumeNameForVolumeMountPointW(mount.value, volume, len(volume)):
+        return None
+    # "\\?\Volume{guid}\" -> device path without the trailing backslash
+    handle = k32.CreateFileW(volume.value.rstrip("\\"), 0, 3, None, 3, 0, None)   # share r/w, OPEN_EXISTING
+    if handle in (None, wintypes.HANDLE(-1).value):
+        return None
+    try:
+        out = ctypes.create_string_buffer(8 + 24 * 16)   # VOLUME_DISK_EXTENTS, up to 16 extents
+        returned = wintypes.DWORD()
+        if not k32.DeviceIoControl(handle, 0x00560000, None, 0, out, len(out), ctypes.byref(returned), None):
+            return None
+    finally:
+        k32.CloseHandle(handle)
+    count = struct.unpack_from("<I", out, 0)[0]
+    disks = sorted({struct.unpack_from("<I", out, 8 + 24 * i)[0] for i in range(min(count, 16))})
+    return "+".join(f"PhysicalDrive{n}" for n in disks) or None
+
+def disk_id(path: Path) -> str:
+    """
+    Lane id of `path`: the physical disk holding it, so partitions of one
+    drive and (on Linux) loop-mounted images stored on it share a lane.
+    On Windows an attached VHD is a disk of its own; group it with its host
+    drive through the manifest's "disk" key. Falls back to volume_id().
+    """
+    existing = _nearest_existing(path)
+    disk = None
+    if existing is not None:
+        try:
+            if os.name == "nt":
+                disk = _windows_disk(existing)
+            elif Path("/sys/dev/block").is_dir():
+                disk = _linux_disk(os.stat(existing).st_dev)
+        except Exception:
+            logger.debug("Disk lookup failed for %s", path, exc_info=True)
+    return f"disk:{disk}" if disk else volume_id(path)
+
+def resolve_target(path: Path, game: Optional[str] = None) -> Optional[GameRecord]:
+    """Game of an install dir: explicit name, else folder name, else whichever exe is present."""
+    if game:
+        return GAMES.resolve(game)
+    rec = GAMES.resolve(path.name, path)
+    if rec is not None:
+        return rec
+    for rec in GAMES:
+        if (path / rec.exe).is_file():
+            return rec
+    return None
+
+def load_manifest(manifest: Path) -> List[Dict[str, str]]:
+    """
+    Read a batch manifest. Either JSON (a list of paths or of
+    {"path": ..., "game": ..., "disk": ...} objects) or plain text with one
+    install directory per line ('#' starts a comment). The optional "disk"
+    overrides the detected lane: targets with the same value run one after
+    the other (e.g. VHDs stored on one drive).
+    """
+    text = Path(manifest).read_text(encoding="utf-8-sig")
+    if text.lstrip().startswith(("[", "{")):
+        data = json.loads(text)
+        if isinstance(data, dict):
+            data = data.get("targets", [])
+        return [{"path": e} if isinstance(e, str) else dict(e) for e in data]
+    entries = []
+    for ln in text.splitlines():
+        ln = ln.split("#", 1)[0].strip()
+        if ln:
+            entries.append({"path": ln})
+    return entries
+
+def discover_targets(deep: bool = False, log_cb: Optional[Callable[[str], None]] = None) -> List[Dict[str, str]]:
+    """
+    Every install copy that can be found: each Steam library's common dir is
+    checked for every game, and with `deep` the drives are walked without
+    stopping at the first hit per game (cloned images, mounted VHDs).
+    """
+    from services.steam import get_discovery
+    log = log_cb or (lambda _m: None)
+    entries: List[Dict[str, str]] = []
+    for common in get_discovery().common_dirs():
+        for rec in GAMES:
+            game_dir = common / rec.folder
+            if (game_dir / rec.exe).is_file():
+                entries.append({"path": str(game_dir), "game": rec.key})
+    if deep:
+        from services.drive_scan import FULL_BUDGET, DeepDriveScanner
+        wanted: Dict[str, list] = {}
+        for rec in GAMES:
+            wanted.setdefault(rec.folder.casefold(), []).append((rec.key, rec.exe))
+        found = DeepDriveScanner(wanted, time_budget=FULL_BUDGET, stop_when_all_found=False).scan()
+        for key, paths in found.items():
+            entries.extend({"path": str(p), "game": key} for p in paths)
+    log(f"🔎 Discovered {len(entries)} install(s).")
+    return entries
+
+def build_targets(entries: Iterable[Dict[str, str]], log_cb: Optional[Callable[[str], None]] = None) -> List[BatchTarget]:
+    """Resolve manifest/discovery entries into de-duplicated BatchTargets tagged with their disk lane."""
+    log = log_cb or (lambda _m: None)
+    targets: List[BatchTarget] = []
+    seen = set()
+    for e in entries:
+        path = Path(e["path"])
+        try:
+            key = os.path.normcase(str(path.resolve()))
+        except OSError:
+            key = os.path.normcase(str(path))
+        if key in seen:
+            continue
+        seen.add(key)
+        rec = resolve_target(path, e.get("game"))
+        if rec is None:
+            log(f"⚠️ Skipping {path}: not a supported game install.")
+            continue
+        disk = e.get("disk")
+        targets.append(BatchTarget(rec, path, f"disk:{disk}" if disk else disk_id(path)))
+    return targets
+
+
+# ---------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------
+class BatchPatcher:
+    """
+    Patches many install directories with bounded parallelism.
+    Targets are queued per physical disk (BatchTarget.volume, see disk_id()
+    and the manifest's "disk" key) and each disk is served by at most
+    `per_volume` workers, so jobs on the same spindle run one after the
+    other while different disks proceed in parallel (`max_workers` overall).
+    Each payload is decoded once and reused for every target of that game
+    (container payloads need no decode; their blobs are cached instead).
+    Transient OS errors (locked files, sharing violations) are retried with
+    exponential backoff. With `dedup`, identical files are hardlinked from a
+    per-volume blob store (services.dedup) instead of written per target.
+    """
+
+    def __init__(
+        self,
+        targets: List[BatchTarget],
+        per_volume: int = 1,
+        max_workers: int = 4,
+        retries: int = 2,
+        backoff: float = 0.5,
+        log_cb: Optional[Callable[[str], None]] = None,
+        progress_cb: Optional[Callable[[int], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+        dedup: bool = False,
+    ):
+        self.targets = targets
+        self.dedup = dedup
+        self.per_volume = max(1, per_volume)
+        self.max_workers = max(1, max_workers)
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.log_cb = log_cb or (lambda _m: None)
+        self.progress_cb = progress_cb or (lambda _p: None)
+        self.cancel_event = cancel_event or threading.Event()
+        self._zips: Dict[str, str] = {}
+        self._zip_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._done = 0
+        self._write_seconds = 0.0
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+    def _zip_for(self, record: GameRecord) -> str:
+        with self._zip_lock:
+            if record.key not in self._zips:
+                self._zips[record.key] = decode_payload(record)
+            return self._zips[record.key]
+
+    @staticmethod
+    def _transient(exc: Exception) -> bool:
+        return isinstance(exc, OSError) and not isinstance(exc, _PERMANENT_OS_ERRORS)
+
+    def _run_job(self, target: BatchTarget) -> BatchJobResult:
+        res = BatchJobResult(target.record.title, str(target.path), target.volume)
+        t0 = time.perf_counter()
+        while not self.cancel_event.is_set():
+            res.attempts += 1
+            try:
+                stats = apply_patch(target.record, target.path, log_cb=self.log_cb,
+                                    zip_path=self._zip_for(target.record), dedup=self.dedup)
+                res.ok, res.error = True, None
+                res.files = int(stats["files"])
+                res.bytes_written = int(stats["bytes_written"])
+                res.bytes_saved = int(stats.get("bytes_saved", 0))
+                with self._lock:
+                    self._write_seconds += float(stats.get("write_seconds", 0.0))
+                break
+            except Exception as e:
+                res.error = str(e)
+                if not self._transient(e) or res.attempts > self.retries:
+                    logger.warning("Batch job %s failed: %s", target.path, e)
+                    break
+                delay = self.backoff * (2 ** (res.attempts - 1))
+                metrics.incr("batch.retries")
+                self.log_cb(f"🔁 {target.path}: {e} — retrying in {delay:.1f}s")
+                self.cancel_event.wait(delay)
+        else:
+            res.error = res.error or "cancelled"
+        res.seconds = round(time.perf_counter() - t0, 4)
+        self.log_cb(f"{'✅' if res.ok else '❌'} {res.game}: {res.target} ({res.seconds:.2f}s)")
+        return res
+
+    def _lane(self, queue: deque, results: List[BatchJobResult]) -> None:
+        total = max(1, len(self.targets))
+        while not self.cancel_event.is_set():
+            try:
+                target = queue.popleft()
+            except IndexError:
+                return
+            res = self._run_job(target)
+            with self._lock:
+                results.append(res)
+                self._done += 1
+                done = self._done
+            self.progress_cb(int(100 * done / total))
+
+    def run(self) -> Dict[str, object]:
+        """Run all targets; the report includes the metrics recorded meanwhile."""
+        with metrics.MetricsRun("batch", write=False) as m:
+            report = self._run()
+        report["metrics"] = {k: m.result[k] for k in ("counters", "gauges", "timers")}
+        return report
+
+    def _run(self) -> Dict[str, object]:
+        started = datetime.now().isoformat(timespec="seconds")
+        t0 = time.perf_counter()
+        queues: Dict[str, deque] = {}
+        for t in self.targets:
+            queues.setdefault(t.volume, deque()).append(t)
+        self.log_cb(f"🚚 Batch: {len(self.targets)} target(s) on {len(queues)} disk(s).")
+
+        results: List[BatchJobResult] = []
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch")
+        try:
+            # Round-robin lane submission so every volume starts before any gets a second lane
+            futures = [pool.submit(self._lane, q, results)
+                       for _ in range(self.per_volume) for q in queues.values()]
+            for f in futures:
+                f.result()
+        except BaseException:
+            # Ctrl-C / failure: stop lanes from taking new targets before waiting for them
+            self.cancel()
+            raise
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            for zp in self._zips.values():
+                if zp is None:
+                    continue
+                try:
+                    os.unlink(zp)
+                except OSError:
+                    pass
+            self._zips.clear()
+
+        # Anything left in the queues was cancelled before it started
+        for q in queues.values():
+            results.extend(BatchJobResult(t.record.title, str(t.path), t.volume, error="cancelled") for t in q)
+
+        volumes: Dict[str, Dict[str, object]] = {}
+        for r in results:
+            v = volumes.setdefault(r.volume, {"targets": 0, "ok": 0, "bytes_written": 0, "seconds": 0.0})
+            v["targets"] += 1
+            v["ok"] += int(r.ok)
+            v["bytes_written"] += r.bytes_written
+            v["seconds"] = round(v["seconds"] + r.seconds, 4)
+
+        ok = sum(1 for r in results if r.ok)
+        bytes_written = sum(r.bytes_written for r in results)
+        bytes_saved = sum(r.bytes_saved for r in results)
+        return {
+            "started": started,
+            "seconds": round(time.perf_counter() - t0, 4),
+            "cancelled": self.cancel_event.is_set(),
+            "targets": len(results),
+            "ok": ok,
+            "failed": len(results) - ok,
+            "bytes_written": bytes_written,
+            "dedup": self.dedup,
+            "bytes_saved": bytes_saved,
+            "seconds_saved": estimate_seconds_saved(bytes_saved, bytes_written, self._write_seconds),
+            "volumes": volumes,
+            "results": [asdict(r) for r in sorted(results, key=lambda r: r.target)],
+        }
+
+
+def write_report(report: Dict[str, object], path: Optional[Path] = None) -> Path:
+    """Write the consolidated batch report as JSON (default: <cache>/reports/batch_<time>.json)."""
+    if path is None:
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = user_cache_dir() / "reports" / f"batch_{stamp}.json"
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
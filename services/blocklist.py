@@ -0,0 +1,249 @@
+# services/blocklist.py
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import ipaddress
+import logging
+import re
+import socket
+import urllib.request
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("services.blocklist")
+
+ROGUE_IPS_URL = "https://content.hl2dm.org/spamfilter/RogueIPs.txt"
+
+# Server addresses anywhere in a line (steam://connect/..., CSV exports, ...):
+# "1.2.3.4[:27015]", "[2001:db8::1][:27015]" and bare "2001:db8::1" (no port:
+# a bare IPv6 address cannot carry one unambiguously). Candidates are
+# validated with ipaddress afterwards.
+_SERVER_RE = re.compile(r"(?<![\d.])(\d{1,3}(?:\.\d{1,3}){3})(?::(\d+))?(?![\d.])")
+_SERVER6_BRACKET_RE = re.compile(r"\[([0-9A-Fa-f:.]+)\](?::(\d+))?")
+_SERVER6_RE = re.compile(
+    r"(?<![\w:.])(?=[0-9A-Fa-f]*:[0-9A-Fa-f]*:)([0-9A-Fa-f:]{2,39}(?:\d{1,3}(?:\.\d{1,3}){3})?)(?![\w:.])"
+)
+
+
+def normalize_blocklist(lines: Iterable[str]) -> List[str]:
+    """
+    Clean a raw blocklist: strip comments/whitespace, drop invalid entries,
+    canonicalize single IPs and CIDRs and remove duplicates (order preserved).
+    """
+    out: List[str] = []
+    seen = set()
+    for ln in lines:
+        entry = ln.split("#", 1)[0].strip()
+        if not entry:
+            continue
+        try:
+            if "/" in entry:
+                net = ipaddress.ip_network(entry, strict=False)
+                norm = str(net.network_address) if net.num_addresses == 1 else str(net)
+            else:
+                norm = str(ipaddress.ip_address(entry))
+        except ValueError:
+            logger.debug("Skipping invalid blocklist entry: %r", entry)
+            continue
+        if norm not in seen:
+            seen.add(norm)
+            out.append(norm)
+    return out
+
+
+def fetch_blocklist(url: str = ROGUE_IPS_URL, timeout: int = 30) -> List[str]:
+    """Download the Rogue IP list and return it normalized."""
+    with urllib.request.urlopen(url, timeout=timeout) as r:
+        content = r.read().decode("utf-8", errors="ignore")
+    return normalize_blocklist(content.splitlines())
+
+
+def _merge(ranges: List[Tuple[int, int]]) -> Tuple[List[int], List[int]]:
+    ranges.sort()
+    starts: List[int] = []
+    ends: List[int] = []
+    for lo, hi in ranges:
+        if ends and lo <= ends[-1] + 1:
+            if hi > ends[-1]:
+                ends[-1] = hi
+        else:
+            starts.append(lo)
+            ends.append(hi)
+    return starts, ends
+
+
+class BlocklistIndex:
+    """
+    Membership index over a blocklist of single IPs and CIDRs.
+    Entries are merged into disjoint, sorted integer ranges; a lookup is one
+    bisect over the range starts. IPv4 and IPv6 are kept in separate tables.
+    For IPv4 a /16 bucket table answers most queries without bisecting
+    (0 = nothing blocked, 1 = whole bucket blocked, 2 = partial -> bisect).
+    """
+
+    __slots__ = ("_starts4", "_ends4", "_starts6", "_ends6", "_bucket4", "entries")
+
+    def __init__(self, entries: Iterable[str]):
+        self.entries = normalize_blocklist(entries)
+        v4: List[Tuple[int, int]] = []
+        v6: List[Tuple[int, int]] = []
+        for e in self.entries:
+            net = ipaddress.ip_network(e, strict=False)
+            lo = int(net.network_address)
+            rng = (lo, lo + net.num_addresses - 1)
+            (v4 if net.version == 4 else v6).append(rng)
+        self._starts4, self._ends4 = _merge(v4)
+        self._starts6, self._ends6 = _merge(v6)
+        self._bucket4 = bytearray(1 << 16)
+        for lo, hi in zip(self._starts4, self._ends4):
+            first, last = lo >> 16, hi >> 16
+            for b in range(first, last + 1):
+                full = (b > first or lo & 0xFFFF == 0) and (b < last or hi & 0xFFFF == 0xFFFF)
+                if full:
+                    self._bucket4[b] = 1
+                elif self._bucket4[b] != 1:
+                    self._bucket4[b] = 2
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "BlocklistIndex":
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return cls(f)
+
+    def __len__(self) -> int:
+        return len(self._starts4) + len(self._starts6)
+
+    def contains_int(self, n: int, version: int = 4) -> bool:
+        if version == 4:
+            b = self._bucket4[n >> 16]
+            if b != 2:
+                return b == 1
+            starts, ends = self._starts4, self._ends4
+        else:
+            starts, ends = self._starts6, self._ends6
+        i = bisect_right(starts, n) - 1
+        return i >= 0 and n <= ends[i]
+
+    def contains(self, ip: str) -> bool:
+        """True if `ip` (IPv4 or IPv6 string) is covered by the blocklist."""
+        try:
+            n = int.from_bytes(socket.inet_pton(socket.AF_INET, ip), "big")
+        except OSError:
+            try:
+                addr = ipaddress.ip_address(ip)
+            except ValueError:
+                return False
+            return self.contains_int(int(addr), addr.version)
+        return self.contains_int(n)
+
+    __contains__ = contains
+
+    def check_ints(self, ns: Iterable[int]) -> List[bool]:
+        """Bulk membership test for pre-parsed IPv4 integers."""
+        bucket, starts, ends = self._bucket4, self._starts4, self._ends4
+        out: List[bool] = []
+        append = out.append
+        for n in ns:
+            b = bucket[n >> 16]
+            if b != 2:
+                append(b == 1)
+            else:
+                i = bisect_right(starts, n) - 1
+                append(i >= 0 and n <= ends[i])
+        return out
+
+    def check_many(self, ips: Iterable[str]) -> List[bool]:
+        """Bulk membership test; IPv4 hot path is inlined, repeated IPs are looked up once."""
+        bucket, starts, ends = self._bucket4, self._starts4, self._ends4
+        pton, af, frombytes = socket.inet_pton, socket.AF_INET, int.from_bytes
+        memo = {}
+        out: List[bool] = []
+        append = out.append
+        for ip in ips:
+            hit = memo.get(ip)
+            if hit is None:
+                try:
+                    n = frombytes(pton(af, ip), "big")
+                except OSError:
+                    hit = self.contains(ip)
+                else:
+                    b = bucket[n >> 16]
+                    if b != 2:
+                        hit = b == 1
+                    else:
+                        i = bisect_right(starts, n) - 1
+                        hit = i >= 0 and n <= ends[i]
+                memo[ip] = hit
+            append(hit)
+        return out
+
+
+@dataclass
+class ServerCheckReport:
+    blocked: List[str] = field(default_factory=list)
+    clean: List[str] = field(default_factory=list)
+    invalid: int = 0
+
+    @property
+    def total(self) -> int:
+        return len(self.blocked) + len(self.clean)
+
+
+def _server(ip: str, port: Optional[str]) -> Optional[Tuple[str, Optional[int]]]:
+    """Validated (canonical ip, port) or None."""
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        return None
+    if addr.version == 6 and addr.ipv4_mapped is not None:
+        addr = addr.ipv4_mapped   # "::ffff:1.2.3.4" is checked against the IPv4 ranges
+    if port is not None and not 0 < int(port) <= 65535:
+        return None
+    return str(addr), int(port) if port is not None else None
+
+
+def parse_server_list(text: str) -> Tuple[List[Tuple[str, Optional[int]]], int]:
+    """
+    Extract (ip, port) pairs from a pasted/exported server list; IPv4 and
+    IPv6 ("[v6]:port" or a bare v6 address) are accepted.
+    Returns (servers, invalid_count): lines without an address and malformed
+    entries (octet > 255, port > 65535, ...) count as invalid.
+    """
+    servers: List[Tuple[str, Optional[int]]] = []
+    invalid = 0
+    for ln in text.splitlines():
+        ln = ln.strip()
+        if not ln or ln.startswith("#"):
+            continue
+        found = 0
+        # Bracketed and bare IPv6 first, blanked out so the IPv4 pattern
+        # does not pick up the dotted tail of "::ffff:1.2.3.4"
+        for rx, strict in ((_SERVER6_BRACKET_RE, True), (_SERVER6_RE, False), (_SERVER_RE, True)):
+            for m in rx.finditer(ln):
+                server = _server(m.group(1), m.group(2) if rx.groups > 1 else None)
+                if server is not None:
+                    servers.append(server)
+                    found += 1
+                elif strict:
+                    invalid += 1
+                    found += 1
+                else:
+                    continue  # e.g. a "12:34:56" timestamp, not an address
+                ln = ln[:m.start()] + " " * (m.end() - m.start()) + ln[m.end():]
+        if not found:
+            invalid += 1
+    return servers, invalid
+
+
+def check_server_list(index: BlocklistIndex, text: str) -> ServerCheckReport:
+    """Check a pasted or loaded server list against the blocklist index."""
+    servers, invalid = parse_server_list(text)
+    report = ServerCheckReport(invalid=invalid)
+    flags = index.check_many([ip for ip, _ in servers])
+    for (ip, port), hit in zip(servers, flags):
+        if port:
+            addr = f"[{ip}]:{port}" if ":" in ip else f"{ip}:{port}"
+        else:
+            addr = ip
+        (report.blocked if hit else report.clean).append(addr)
+    return report
@@ -0,0 +1,269 @@
+# services/dedup.py
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import errno
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+from core import metrics
+from services.zipops import is_within_directory
+
+logger = logging.getLogger("services.dedup")
+
+STORE_DIRNAME = ".ins2doi_store"
+_TMP_SUFFIX = ".ins2doi-tmp"
+
+
+def _volume(path: Path) -> int:
+    for candidate in (path, *path.parents):
+        try:
+            return os.stat(candidate).st_dev
+        except OSError:
+            continue
+    return -1
+
+def default_store_root(target_dir: Path) -> Path:
+    """
+    Store location for a game dir: '<library>/steamapps/.ins2doi_store' for
+    Steam installs (shared by every game in that library), else next to the
+    game folder. Always on the same volume as the game, so hardlinks work.
+    """
+    target_dir = Path(target_dir)
+    for parent in target_dir.parents:
+        if parent.name.casefold() == "steamapps":
+            return parent / STORE_DIRNAME
+    return target_dir.parent / STORE_DIRNAME
+
+
+class BlobStore:
+    """
+    Content-addressed store of patch files on one volume:
+    '<root>/objects/<sha[:2]>/<sha256>'. Game files are hardlinks to these
+    objects, so identical BattlEye files across games (and cloned installs)
+    take disk space once.
+
+    Links are never written through here: a target is always replaced by an
+    atomic rename of a fresh link/copy. Other programs may still rewrite a
+    linked file in place, which is why put() compares before reusing an object.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.device = _volume(self.root)
+        self._lock = threading.Lock()
+        self._active = 0
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest
+
+    def put(self, data: bytes, digest: Optional[str] = None) -> tuple:
+        """
+        Store `data` once; returns (object_path, newly_written). An existing
+        object is only reused if its bytes equal `data`: a game file rewritten
+        in place (BattlEye self-update, Steam "verify files") also rewrites
+        the object it is linked to, and that damaged inode must not be linked
+        into further games. It is replaced by a fresh object instead.
+        """
+        digest = digest or hashlib.sha256(data).hexdigest()
+        obj = self.object_path(digest)
+        with self._lock:
+            if obj.is_file() and obj.stat().st_size == len(data):
+                if obj.read_bytes() == data:
+                    return obj, False
+                metrics.incr("dedup.objects_repaired")
+                logger.warning("Store object %s was modified in place; rewriting it", obj)
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            tmp = obj.with_name(obj.name + _TMP_SUFFIX)
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, obj)
+        return obj, True
+
+    @contextmanager
+    def session(self) -> Iterator["BlobStore"]:
+        """Mark an install in progress; gc() does nothing until all sessions ended."""
+        with self._lock:
+            self._active += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def gc(self) -> int:
+        """
+        Remove objects no game links to any more (link count 1), e.g. after a
+        game moved to another payload version or its links were detached.
+        Skipped while an install may sit between put() and linking the object.
+        Returns bytes freed.
+        """
+        freed = 0
+        with self._lock:
+            if self._active or not self.objects.is_dir():
+                return 0
+            for sub in self.objects.iterdir():
+                if not sub.is_dir():
+                    continue
+                for obj in sub.iterdir():
+                    try:
+                        st = obj.stat()
+                        if st.st_nlink <= 1:
+                            obj.unlink()
+                            freed += st.st_size
+                    except OSError:
+                        logger.debug("gc skipped %s", obj)
+                try:
+                    sub.rmdir()   # only succeeds once empty
+                except OSError:
+                    pass
+        metrics.incr("dedup.gc_bytes_freed", freed)
+        return freed
+
+
+_stores: Dict[int, BlobStore] = {}
+_stores_lock = threading.Lock()
+
+def store_for(target_dir: Path) -> BlobStore:
+    """One BlobStore per volume: the first store root chosen on a volume is reused for all its games."""
+    target_dir = Path(target_dir)
+    dev = _volume(target_dir)
+    with _stores_lock:
+        store = _stores.get(dev)
+        if store is None:
+            store = _stores[dev] = BlobStore(default_store_root(target_dir))
+        return store
+
+
+def place_file(obj: Path, dest: Path) -> bool:
+    """
+    Make `dest` a hardlink to `obj` via temp link + atomic rename (never
+    writing into an existing, possibly shared inode). Falls back to a copy
+    when the volume does not support hardlinks. Returns True if linked.
+    """
+    if dest.exists() and dest.is_file():
+        try:
+            if os.path.samefile(obj, dest):
+                return True
+        except OSError:
+            pass
+    tmp = dest.with_name(dest.name + _TMP_SUFFIX)
+    try:
+        tmp.unlink()
+    except FileNotFoundError:
+        pass
+    linked = True
+    try:
+        os.link(obj, tmp)
+    except OSError as e:
+        # EXDEV: other volume, EPERM/ENOTSUP: FAT/exFAT, EMLINK: link limit
+        logger.debug("hardlink %s -> %s failed (%s), copying", obj, dest, errno.errorcode.get(e.errno, e))
+        shutil.copyfile(obj, tmp)
+        linked = False
+    os.replace(tmp, dest)
+    return linked
+
+def detach_links(dest_dir: Path, names) -> int:
+    """
+    Unlink hardlinked files among `names` (relative to `dest_dir`) that are
+    about to be overwritten in place, e.g. by a plain ZIP extraction, so the
+    write cannot reach the shared store object or another game.
+    """
+    dest_dir = Path(dest_dir)
+    detached = 0
+    for name in names:
+        p = dest_dir / name
+        try:
+            if p.is_file() and p.stat().st_nlink > 1:
+                p.unlink()
+                detached += 1
+        except OSError:
+            logger.debug("detach failed for %s", p)
+    if detached:
+        # The detached objects may now be referenced by the store only
+        store_for(dest_dir).gc()
+    return detached
+
+
+def install_files(
+    files: Iterable[Tuple[str, Optional[str], Callable[[], bytes]]],
+    dest_dir: Path,
+    store: Optional[BlobStore] = None,
+    log_cb: Optional[Callable[[str], None]] = None,
+) -> Dict[str, object]:
+    """
+    Install `files` - (relative path, sha256 or None, data loader) - into
+    `dest_dir` as hardlinks to the per-volume BlobStore. Files already
+    identical in the store are linked instead of written; files whose
+    content differs get their own object, so games needing a different
+    version simply point at a different blob.
+    """
+    log = log_cb or (lambda _m: None)
+    dest_dir = Path(dest_dir)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    store = store or store_for(dest_dir)
+    stats = {"files": 0, "linked": 0, "copied": 0, "bytes_written": 0, "bytes_saved": 0,
+             "write_seconds": 0.0, "store": str(store.root)}
+
+    with store.session():
+        for name, digest, load in files:
+            target = dest_dir / name
+            if not is_within_directory(dest_dir, target):
+                raise Exception(f"Unsafe path in payload: {name}")
+            target.parent.mkdir(parents=True, exist_ok=True)
+            data = load()
+            t0 = time.perf_counter()
+            obj, new = store.put(data, digest)
+            if new:
+                stats["bytes_written"] += len(data)
+                stats["write_seconds"] += time.perf_counter() - t0
+            else:
+                stats["bytes_saved"] += len(data)
+            if place_file(obj, target):
+                stats["linked"] += 1
+            else:
+                # No hardlink support: the copy costs a full write after all
+                stats["copied"] += 1
+                stats["bytes_written"] += len(data)
+                if not new:
+                    stats["bytes_saved"] -= len(data)
+            stats["files"] += 1
+    # Objects the replaced files pointed to (older payload versions)
+    freed = store.gc()
+
+    metrics.incr("dedup.files", stats["files"])
+    metrics.incr("dedup.files_linked", stats["linked"])
+    metrics.incr("dedup.bytes_written", stats["bytes_written"])
+    metrics.incr("dedup.bytes_saved", stats["bytes_saved"])
+    log(f"🔗 {stats['linked']} file(s) linked from {store.root}"
+        + (f", {stats['copied']} copied" if stats["copied"] else "")
+        + (f", {freed:,} B of unused objects removed" if freed else ""))
+    return stats
+
+def install_zip_deduplicated(
+    zip_path: str,
+    dest_dir: Path,
+    store: Optional[BlobStore] = None,
+    log_cb: Optional[Callable[[str], None]] = None,
+) -> Dict[str, object]:
+    """install_files() for every file member of a ZIP archive."""
+    with zipfile.ZipFile(zip_path, "r") as zf:
+        members = sorted((i for i in zf.infolist() if not i.is_dir()), key=lambda i: i.filename)
+        return install_files(
+            ((m.filename, None, lambda m=m: zf.read(m)) for m in members),
+            dest_dir, store=store, log_cb=log_cb,
+        )
+
+
+def estimate_seconds_saved(bytes_saved: int, bytes_written: int, write_seconds: float) -> Optional[float]:
+    """Write time avoided, extrapolated from the throughput measured while filling the store."""
+    if bytes_written <= 0 or write_seconds <= 0:
+        return None
+    return round(bytes_saved / (bytes_written / write_seconds), 4)
@@ -0,0 +1,268 @@
+# services/disabler.py
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import errno
+import json
+import logging
+import os
+import shutil
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from core import metrics
+from models.games import GameRecord
+from services.zipops import compute_sha256
+
+logger = logging.getLogger("services.disabler")
+
+MARKER_NAME = ".ins2doi_disabler.json"
+MARKER_VERSION = 1
+
+
+def be_exe_paths(record: GameRecord, game_dir: str | Path):
+    """(source_exe, dest_exe, disabled_exe) for a game install."""
+    game_dir = Path(game_dir)
+    dest_exe = game_dir / record.be_exe
+    return game_dir / record.exe, dest_exe, dest_exe.with_name(f"{dest_exe.stem}_disabled{dest_exe.suffix}")
+
+
+# ---------------------------------------------------------
+# Copy primitives
+# ---------------------------------------------------------
+FICLONE = 0x40049409   # linux/fs.h: _IOW(0x94, 9, int)
+
+# Errors meaning "this primitive is not available here", not "the copy failed"
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTTY,
+                getattr(errno, "ENOTSUP", errno.EOPNOTSUPP), errno.EPERM, errno.EBADF}
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    """Copy-on-write clone (btrfs, XFS, bcachefs): no data is copied at all."""
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+    with open(src, "rb") as fs, open(dst, "wb") as fd:
+        try:
+            fcntl.ioctl(fd.fileno(), FICLONE, fs.fileno())
+            return True
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED:
+                raise
+    dst.unlink()
+    return False
+
+
+def _copy_range(src: Path, dst: Path) -> bool:
+    """In-kernel copy (may itself reflink or do a server-side copy on NFS/SMB)."""
+    if not hasattr(os, "copy_file_range"):
+        return False
+    with open(src, "rb") as fs, open(dst, "wb") as fd:
+        size = os.fstat(fs.fileno()).st_size
+        done = 0
+        try:
+            while done < size:
+                n = os.copy_file_range(fs.fileno(), fd.fileno(), size - done, done, done)
+                if n == 0:
+                    break
+                done += n
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED or done:
+                raise
+        if done == size:
+            return True
+    dst.unlink()
+    return False
+
+
+def copy_exe(src: Path, dst: Path, link: bool = False) -> str:
+    """
+    Create `dst` with the content of `src` using the cheapest primitive the
+    platform/filesystem offers and return its name: "hardlink" (only with
+    `link`, same volume), "reflink", "copy_file_range" or "copy".
+    Timestamps are copied like shutil.copy2 except for hardlinks, which
+    share them with the source.
+    """
+    if link:
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError:
+            logger.debug("hardlink %s -> %s not possible, copying", src, dst)
+    for name, primitive in (("reflink", _reflink), ("copy_file_range", _copy_range)):
+        if primitive(src, dst):
+            shutil.copystat(src, dst)
+            return name
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+# ---------------------------------------------------------
+# Up-to-date check
+# ---------------------------------------------------------
+def _sig(st: os.stat_result) -> Dict[str, int]:
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def marker_path(game_dir: str | Path) -> Path:
+    return Path(game_dir) / MARKER_NAME
+
+
+def read_marker(game_dir: str | Path) -> Optional[Dict[str, object]]:
+    try:
+        data = json.loads(marker_path(game_dir).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) and data.get("version") == MARKER_VERSION else None
+
+
+def _write_marker(game_dir: Path, record: GameRecord, src: os.stat_result, dst: os.stat_result,
+                  digest: Optional[str], method: str) -> None:
+    data = {
+        "version": MARKER_VERSION,
+        "game": record.key,
+        "exe": record.exe,
+        "be_exe": record.be_exe,
+        "source": _sig(src),
+        "dest": _sig(dst),
+        "sha256": digest,
+        "method": method,
+        "updated": datetime.now().isoformat(timespec="seconds"),
+    }
+    try:
+        marker_path(game_dir).write_text(json.dumps(data, indent=2), encoding="utf-8")
+    except OSError:
+        logger.debug("Cannot write disabler marker in %s", game_dir)
+
+
+def is_current(
+    record: GameRecord,
+    game_dir: str | Path,
+    source_st: os.stat_result,
+    dest_st: os.stat_result,
+    link: bool = False,
+) -> Tuple[bool, Optional[str], str]:
+    """
+    Whether the _BE exe already has the content of the x64 exe, cheapest test
+    first: same inode, size mismatch, marker written for exactly these
+    size/mtime pairs, and only then a SHA-256 of both files. A hardlink only
+    counts as current when `link` is requested; otherwise it is replaced by a copy.
+    Returns (current, source sha256 if hashed else marker digest, reason).
+    """
+    if source_st.st_ino and (source_st.st_dev, source_st.st_ino) == (dest_st.st_dev, dest_st.st_ino):
+        return link, None, "hardlink"
+    if source_st.st_size != dest_st.st_size:
+        return False, None, "size"
+    marker = read_marker(game_dir)
+    if (marker and marker.get("exe") == record.exe
+            and marker.get("source") == _sig(source_st) and marker.get("dest") == _sig(dest_st)):
+        return True, marker.get("sha256"), "marker"
+    source_exe, dest_exe, _ = be_exe_paths(record, game_dir)
+    metrics.incr("disabler.hash_checks")
+    digest = compute_sha256(source_exe)
+    return digest == compute_sha256(dest_exe), digest, "sha256"
+
+
+# ---------------------------------------------------------
+# Disabling
+# ---------------------------------------------------------
+def disable_battleye(
+    record: GameRecord,
+    game_dir: str | Path,
+    log_cb: Optional[Callable[[str], None]] = None,
+    link: bool = False,
+    force: bool = False,
+) -> Dict[str, object]:
+    """
+    Replace '<game>_BE.exe' with a copy of '<game>_x64.exe' so the game starts
+    without the BattlEye launcher. An existing _BE exe is backed up once as
+    '<game>_BE_disabled.exe'. Raises FileNotFoundError if the game exe is missing.
+    The copy is made with copy_exe(); `link` allows a hardlink to the x64 exe.
+    Nothing is touched when the _BE exe is already current (see is_current());
+    `force` copies anyway. The state is kept in '<game_dir>/.ins2doi_disabler.json'.
+    """
+    log = log_cb or (lambda _m: None)
+    game_dir = Path(game_dir)
+    source_exe, dest_exe, disabled_exe = be_exe_paths(record, game_dir)
+    try:
+        source_st = source_exe.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Missing executable for {record.title}: {source_exe}") from None
+
+    result = {"game": record.title, "source": str(source_exe), "dest": str(dest_exe)}
+    if not force:
+        try:
+            dest_st = dest_exe.stat()
+        except FileNotFoundError:
+            dest_st = None
+        if dest_st is not None:
+            current, digest, reason = is_current(record, game_dir, source_st, dest_st, link=link)
+            if current:
+                metrics.incr("disabler.skipped")
+                if reason != "marker":
+                    _write_marker(game_dir, record, source_st, dest_st, digest, reason)
+                log(f"✔ {record.title}: {dest_exe.name} is already up to date ({reason} check)")
+                return {**result, "backed_up": False, "method": "unchanged", "skipped": True}
+
+    backed_up = False
+    # If BE version exists, back it up
+    if dest_exe.exists():
+        if not disabled_exe.exists():
+            dest_exe.rename(disabled_exe)
+            backed_up = True
+            log(f"Backed up {dest_exe.name} → {disabled_exe.name}")
+        else:
+            if dest_exe.is_file():
+                dest_exe.unlink()
+            log(f"Removed old {dest_exe.name}")
+
+    with metrics.timer("disabler.copy"):
+        method = copy_exe(source_exe, dest_exe, link=link)
+    metrics.incr(f"disabler.{method}")
+    if method in ("copy", "copy_file_range"):
+        metrics.incr("disabler.bytes_copied", dest_exe.stat().st_size)
+    _write_marker(game_dir, record, source_st, dest_exe.stat(), None, method)
+    log(f"✅ {record.title}: created {dest_exe.name} ({method})")
+    return {**result, "backed_up": backed_up, "method": method, "skipped": False}
+
+
+def disable_many(
+    targets: Iterable[Tuple[GameRecord, str | Path]],
+    log_cb: Optional[Callable[[str], None]] = None,
+    progress_cb: Optional[Callable[[int], None]] = None,
+    max_workers: int = 4,
+    link: bool = False,
+    cancel_event: Optional[threading.Event] = None,
+    force: bool = False,
+) -> List[Dict[str, object]]:
+    """
+    disable_battleye() for many installs in parallel. Never raises for a
+    single game: every entry carries "ok" and, on failure, "error".
+    Games not started when `cancel_event` is set are reported as cancelled.
+    """
+    log = log_cb or (lambda _m: None)
+    progress = progress_cb or (lambda _p: None)
+    cancel = cancel_event or threading.Event()
+    targets = list(targets)
+    total = max(1, len(targets))
+
+    def one(record: GameRecord, game_dir) -> Dict[str, object]:
+        if cancel.is_set():
+            return {"ok": False, "game": record.title, "target": str(game_dir), "error": "cancelled"}
+        try:
+            return {"ok": True, **disable_battleye(record, game_dir, log_cb=log, link=link, force=force)}
+        except Exception as e:
+            logger.exception("disable %s failed", record.title)
+            log(f"❌ Error while disabling {record.title}: {e}")
+            return {"ok": False, "game": record.title, "target": str(game_dir), "error": str(e)}
+
+    results: List[Dict[str, object]] = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(targets) or 1)),
+                            thread_name_prefix="disable") as pool:
+        futures = [pool.submit(one, rec, d) for rec, d in targets]
+        for done, fut in enumerate(as_completed(futures), 1):
+            results.append(fut.result())
+            progress(int(100 * done / total))
+    return sorted(results, key=lambda r: r["game"])
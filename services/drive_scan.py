@@ -0,0 +1,188 @@
+# services/drive_scan.py
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import logging
+import os
+import string
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from core import metrics
+
+logger = logging.getLogger("services.drive_scan")
+
+# Wanted: casefolded folder name -> [(game_name, exe_name)]
+Wanted = Dict[str, List[Tuple[str, str]]]
+
+# Directory names (casefolded) that never contain a Steam game install, at any depth
+PRUNE_ANYWHERE: FrozenSet[str] = frozenset({
+    "$recycle.bin", "system volume information", "$windows.~bt", "$windows.~ws", "$winreagent",
+    "lost+found", "node_modules", ".git", ".svn", ".hg", "__pycache__", ".cache", ".venv",
+})
+
+# OS tree names, pruned only directly below the system root ('/' or the Windows
+# system drive): 'D:\dev\SteamLibrary' or '/mnt/data/lib/...' are still walked
+PRUNE_OS_ROOT: FrozenSet[str] = frozenset({
+    "windows", "programdata", "recovery", "perflogs", "msocache", "intel", "amd",
+    "proc", "sys", "dev", "run", "boot", "snap", "usr", "var", "etc", "lib", "lib64",
+})
+
+# Linux/macOS pseudo or virtual filesystems that are never worth walking
+_PSEUDO_FS = frozenset({
+    "proc", "sysfs", "devtmpfs", "devpts", "tmpfs", "cgroup", "cgroup2", "securityfs", "pstore",
+    "debugfs", "tracefs", "configfs", "fusectl", "mqueue", "hugetlbfs", "bpf", "autofs",
+    "binfmt_misc", "efivarfs", "squashfs", "nsfs", "ramfs", "rpc_pipefs",
+})
+
+
+def list_drive_roots() -> List[Path]:
+    """
+    Windows: drive letters from GetLogicalDrives() (no per-letter exists() probing).
+    Elsewhere: real mount points from /proc/mounts, falling back to '/'.
+    """
+    if os.name == "nt":
+        try:
+            import ctypes
+            mask = ctypes.windll.kernel32.GetLogicalDrives()
+            return [Path(f"{letter}:\\") for i, letter in enumerate(string.ascii_uppercase)
+                    if mask & (1 << i) and letter not in "AB"]
+        except Exception:
+            logger.exception("GetLogicalDrives failed")
+            return []
+    roots: List[Path] = []
+    try:
+        with open("/proc/mounts", "r", encoding="utf-8", errors="ignore") as f:
+            for ln in f:
+                parts = ln.split()
+                if len(parts) >= 3 and parts[2] not in _PSEUDO_FS:
+                    # /proc/mounts escapes spaces as \040
+                    roots.append(Path(parts[1].replace("\\040", " ")))
+    except OSError:
+        pass
+    return list(dict.fromkeys(roots)) or [Path("/")]
+
+
+def is_system_root(root: Path) -> bool:
+    """'/' on Linux/macOS, the system drive (%SystemDrive%, usually C:) on Windows."""
+    if os.name == "nt":
+        system = os.environ.get("SystemDrive", "C:").rstrip("\\/").casefold()
+        return str(root).rstrip("\\/").casefold() == system
+    return str(root) == "/"
+
+
+# Per-drive time budgets (seconds): the automatic fallback after a normal
+# scan only takes a quick look; a full search runs when the user asks for it
+# (Force Rescan, `cli scan --full-deep`, `cli batch --discover --deep`).
+QUICK_BUDGET = 3.0
+FULL_BUDGET = 15.0
+
+
+class DeepDriveScanner:
+    """
+    Bounded-depth search for game folders across drives / mount points.
+    Each root is walked breadth-first with os.scandir on its own thread and
+    stops at `max_depth` or when its `time_budget` (seconds) is spent.
+    Matches are reported through `on_found(game_name, path)` as soon as the
+    folder and its exe are confirmed.
+    """
+
+    def __init__(
+        self,
+        wanted: Wanted,
+        on_found: Optional[Callable[[str, Path], None]] = None,
+        max_depth: int = 6,
+        time_budget: float = QUICK_BUDGET,
+        prune: Iterable[str] = PRUNE_ANYWHERE,
+        prune_os_root: Iterable[str] = PRUNE_OS_ROOT,
+        max_workers: int = 4,
+        cancel_event: Optional[threading.Event] = None,
+        stop_when_all_found: bool = True,
+    ):
+        self.wanted = wanted
+        self.on_found = on_found or (lambda _g, _p: None)
+        self.max_depth = max_depth
+        self.time_budget = time_budget
+        self.prune = frozenset(p.casefold() for p in prune)
+        self.prune_os_root = frozenset(p.casefold() for p in prune_os_root)
+        self.max_workers = max(1, max_workers)
+        self.cancel_event = cancel_event or threading.Event()
+        self.stop_when_all_found = stop_when_all_found
+        self.found: Dict[str, List[Path]] = {}
+        self.timed_out: List[Path] = []
+        self._all_games = {g for games in wanted.values() for g, _exe in games}
+        self._lock = threading.Lock()
+
+    def _done(self) -> bool:
+        if self.cancel_event.is_set():
+            return True
+        return self.stop_when_all_found and self._all_games.issubset(self.found.keys())
+
+    def _report(self, game_name: str, path: Path) -> None:
+        with self._lock:
+            paths = self.found.setdefault(game_name, [])
+            if path in paths:
+                return
+            paths.append(path)
+        self.on_found(game_name, path)
+
+    def _walk(self, root: Path, other_roots: Set[str]) -> None:
+        deadline = time.monotonic() + self.time_budget
+        os_root = is_system_root(root)
+        queue = deque([(str(root), 0)])
+        listed = 0
+        try:
+            while queue:
+                if self._done():
+                    return
+                if time.monotonic() > deadline:
+                    logger.debug("Time budget exhausted for %s", root)
+                    with self._lock:
+                        self.timed_out.append(root)
+                    return
+                path, depth = queue.popleft()
+                try:
+                    with os.scandir(path) as it:
+                        entries = list(it)
+                except OSError:
+                    continue
+                listed += 1
+                for entry in entries:
+                    folded = entry.name.casefold()
+                    if folded in self.prune or (os_root and depth == 0 and folded in self.prune_os_root):
+                        continue
+                    try:
+                        if not entry.is_dir(follow_symlinks=False):
+                            continue
+                    except OSError:
+                        continue
+                    games = self.wanted.get(folded)
+                    if games:
+                        try:
+                            with os.scandir(entry.path) as it:
+                                names = frozenset(e.name.casefold() for e in it)
+                        except OSError:
+                            names = frozenset()
+                        for game_name, exe_name in games:
+                            if exe_name and exe_name.casefold() in names:
+                                self._report(game_name, Path(entry.path))
+                    if depth + 1 < self.max_depth and entry.path not in other_roots:
+                        queue.append((entry.path, depth + 1))
+        finally:
+            metrics.incr("scan.deep_dirs_listed", listed)
+
+    def scan(self, roots: Optional[List[Path]] = None) -> Dict[str, List[Path]]:
+        roots = list_drive_roots() if roots is None else roots
+        root_strs = {str(r) for r in roots}
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="deepscan")
+        try:
+            futures = [pool.submit(self._walk, r, root_strs - {str(r)}) for r in roots]
+            # A walker blocked in scandir on a dead network share cannot be interrupted;
+            # give up on it after its budget and let the thread finish in the background.
+            waves = max(1, -(-len(roots) // self.max_workers))
+            wait(futures, timeout=self.time_budget * waves + 1.0)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return dict(self.found)
@@ -2,8 +2,10 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 import subprocess
+import tempfile
 from pathlib import Path
-from typing import Callable
+from typing import Callable, List
+from core import metrics
 
 # Windows flag to hide PowerShell console window
 CREATE_NO_WINDOW = 0x08000000
@@ -14,19 +16,24 @@ def _run_powershell(cmd: str) -> subprocess.CompletedProcess:
     startupinfo = subprocess.STARTUPINFO()
     startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
 
-    return subprocess.run(
-        [
-            "powershell.exe",
-            "-WindowStyle", "Hidden",
-            "-NoProfile",
-            "-ExecutionPolicy", "Bypass",
-            cmd
-        ],
-        capture_output=True,
-        text=True,
-        startupinfo=startupinfo,
-        creationflags=CREATE_NO_WINDOW
-    )
+    metrics.incr("powershell.spawns")
+    with metrics.timer("powershell.run"):
+        result = subprocess.run(
+            [
+                "powershell.exe",
+                "-WindowStyle", "Hidden",
+                "-NoProfile",
+                "-ExecutionPolicy", "Bypass",
+                cmd
+            ],
+            capture_output=True,
+            text=True,
+            startupinfo=startupinfo,
+            creationflags=CREATE_NO_WINDOW
+        )
+    if result.returncode != 0:
+        metrics.incr("powershell.failures")
+    return result
 
 
 
@@ -64,6 +71,7 @@ def add_block_rules_from_ip_file(
     chunk_size = 200  # Safe limit per rule
     total = len(ips)
     chunks = [ips[i:i + chunk_size] for i in range(0, total, chunk_size)]
+    metrics.gauge("firewall.ips", total)
 
     for i, chunk in enumerate(chunks, start=1):
         rule_name_out = f"{rule_prefix}_OUT_{i}"
@@ -81,6 +89,7 @@ def add_block_rules_from_ip_file(
                 if progress_callback:
                     progress_callback(int(i / len(chunks) * 100), f"⚠️ Error: {msg}")
                 raise RuntimeError(msg)
+            metrics.incr("firewall.rules_added")
 
         percent = int(i / len(chunks) * 100)
         if progress_callback:
@@ -96,3 +105,24 @@ def verify_rules_exist(rule_prefix: str) -> bool:
     ps = f"Get-NetFirewallRule | Where-Object {{ $_.DisplayName -like '{rule_prefix}*' }}"
     result = _run_powershell(ps)
     return bool(result.stdout.strip())
+
+
+def apply_blocklist(
+    ips: List[str],
+    rule_prefix: str = "GameSpamFilter",
+    progress_callback: Callable[[int, str], None] | None = None
+) -> int:
+    """
+    Replace all '<rule_prefix>*' rules with block rules for `ips` and verify them.
+    Returns the number of blocked entries; raises on failure.
+    """
+    if not ips:
+        raise ValueError("No valid IPs found in list")
+    tmp_list = Path(tempfile.gettempdir()) / "rogue_ips.txt"
+    tmp_list.write_text("\n".join(ips), encoding="utf-8")
+
+    remove_rules(rule_prefix)
+    add_block_rules_from_ip_file(tmp_list, rule_prefix=rule_prefix, progress_callback=progress_callback)
+    if not verify_rules_exist(rule_prefix):
+        raise RuntimeError("Rules not found after creation.")
+    return len(ips)
@@ -0,0 +1,111 @@
+# services/patching.py
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import logging
+import os
+import time
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from core import metrics
+from installer.payload_store import load_container
+from installer.utils import decode_embedded_zip, extract_zip, load_embedded_payload
+from models.games import GameRecord
+from services.dedup import detach_links, estimate_seconds_saved, install_files, install_zip_deduplicated
+
+logger = logging.getLogger("services.patching")
+
+
+def decode_payload(record: GameRecord) -> Optional[str]:
+    """
+    Decode and verify the embedded payload of `record`; returns a temp zip
+    path (caller unlinks). Returns None when the game is served from the
+    shared payload container, which needs no up-front decode.
+    """
+    container = load_container()
+    if container is not None and container.has(record.payload):
+        return None
+    data, sha = load_embedded_payload(record.payload)
+    return decode_embedded_zip(data, sha, record.patch_label)
+
+
+def _dedup_stats(ds: Dict[str, object]) -> Dict[str, object]:
+    return {
+        "files": ds["files"],
+        "bytes_written": ds["bytes_written"],
+        "bytes_saved": ds["bytes_saved"],
+        "write_seconds": round(ds["write_seconds"], 4),
+        "seconds_saved": estimate_seconds_saved(ds["bytes_saved"], ds["bytes_written"], ds["write_seconds"]),
+        "store": ds["store"],
+    }
+
+
+def _apply_from_container(container, record: GameRecord, dest: Path, log, dedup: bool) -> Dict[str, object]:
+    members = container.members(record.payload)
+    if dedup:
+        ds = install_files(
+            ((m.path, m.digest, lambda m=m: container.read_blob(m.digest)) for m in members),
+            dest, log_cb=log,
+        )
+        return _dedup_stats(ds)
+    detach_links(dest, [m.path for m in members])
+    return container.extract(record.payload, dest)
+
+
+def apply_patch(
+    record: GameRecord,
+    target_dir: str | Path,
+    log_cb: Optional[Callable[[str], None]] = None,
+    zip_path: Optional[str] = None,
+    dedup: bool = False,
+) -> Dict[str, object]:
+    """
+    Extract the embedded payload of `record` into
+    '<target_dir>/<record.patch_subdir>'. Returns a small stats dict.
+    Payloads in the shared container (installer.payload_store) are read
+    blob by blob; legacy per-game ZIP payloads are decoded first. Pass an
+    already decoded `zip_path` (see decode_payload) to patch many targets
+    from one decode; it is left in place for the caller.
+    With `dedup`, files are hardlinked from the per-volume blob store
+    (services.dedup) instead of written, and the stats include the space
+    and estimated write time saved.
+    """
+    log = log_cb or (lambda _m: None)
+    t0 = time.perf_counter()
+    dest = Path(target_dir) / record.patch_subdir
+
+    log(f"🔧 Applying {record.patch_label} to {target_dir} ...")
+    container = load_container() if zip_path is None else None
+    if container is not None and container.has(record.payload):
+        stats = _apply_from_container(container, record, dest, log, dedup)
+    else:
+        owned = zip_path is None
+        if owned:
+            data, sha = load_embedded_payload(record.payload)
+            zip_path = decode_embedded_zip(data, sha, record.patch_label)
+        try:
+            if dedup:
+                stats = _dedup_stats(install_zip_deduplicated(zip_path, dest, log_cb=log))
+            else:
+                with zipfile.ZipFile(zip_path, "r") as zf:
+                    members = [i for i in zf.infolist() if not i.is_dir()]
+                # A previous dedup install leaves hardlinks; never write through them
+                detach_links(dest, [i.filename for i in members])
+                extract_zip(zip_path, str(dest))
+                stats = {"files": len(members), "bytes_written": sum(i.file_size for i in members)}
+        finally:
+            if owned:
+                os.unlink(zip_path)
+
+    seconds = time.perf_counter() - t0
+    metrics.incr("patch.games")
+    metrics.incr("patch.files", stats.get("files", 0))
+    metrics.incr("patch.bytes_written", stats.get("bytes_written", 0))
+    metrics.incr("patch.bytes_saved", stats.get("bytes_saved", 0))
+    metrics.observe("patch.apply", seconds)
+    return {
+        "game": record.title,
+        "target": str(dest),
+        **stats,
+        "seconds": round(seconds, 4),
+    }
@@ -1,5 +1,6 @@
 # services/resource_path.py
 # -*- coding: utf-8 -*-
+import os
 from pathlib import Path
 import sys
 
@@ -22,3 +23,14 @@ def resource_path(*parts: str) -> Path:
     # In source: <root>/resources/...
     # In PyInstaller: we also bundle into resources/...
     return base.joinpath("resources", *parts)
+
+def user_cache_dir() -> Path:
+    """
+    Per-user persistent cache directory (scan cache etc.).
+    Windows: %LOCALAPPDATA%/INS2DOI Community Patcher, elsewhere: ~/.cache/ins2doi_patcher
+    """
+    local = os.environ.get("LOCALAPPDATA")
+    if os.name == "nt" and local:
+        return Path(local) / "INS2DOI Community Patcher"
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    return (Path(xdg) if xdg else Path.home() / ".cache") / "ins2doi_patcher"
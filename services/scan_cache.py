@@ -0,0 +1,109 @@
+# services/scan_cache.py
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from services.resource_path import user_cache_dir
+
+logger = logging.getLogger("services.scan_cache")
+
+CACHE_VERSION = 1
+CACHE_FILE = "scan_cache.json"
+
+
+def cache_path() -> Path:
+    return user_cache_dir() / CACHE_FILE
+
+
+def _mtime_ns(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _games_signature(games: Dict[str, Dict[str, str]]) -> List[List[str]]:
+    """Cache is only valid for the same game definitions."""
+    return sorted(
+        [title, str(info.get("AppID", "")), info.get("Folder", ""), info.get("exe", "")]
+        for title, info in games.items()
+    )
+
+
+def collect_stamps(steamapps_dirs: Iterable[Path], appids: Iterable[str], found_dirs: Iterable[str]) -> Dict[str, Optional[int]]:
+    """
+    mtimes that invalidate the cache when they change:
+      - each steamapps dir (manifests added/removed) and its libraryfolders.vdf,
+      - the appmanifest_<appid>.acf of every tracked app in every library,
+      - every found game directory (moved/uninstalled).
+    Missing files are recorded as None so their creation is noticed too.
+    """
+    appids = [str(a) for a in appids if a]
+    paths: List[str] = []
+    for sa in steamapps_dirs:
+        paths.append(str(sa))
+        paths.append(str(sa / "libraryfolders.vdf"))
+        paths.extend(str(sa / f"appmanifest_{a}.acf") for a in appids)
+    paths.extend(found_dirs)
+    return {p: _mtime_ns(p) for p in dict.fromkeys(paths)}
+
+
+def save_scan_cache(games: Dict[str, Dict[str, str]], result: dict, steamapps_dirs: Iterable[Path]) -> None:
+    appids = [info.get("AppID", "") for info in games.values()]
+    payload = {
+        "version": CACHE_VERSION,
+        "games": _games_signature(games),
+        "result": {k: result.get(k) for k in ("found_games", "missing", "libraries")},
+        "stamps": collect_stamps(steamapps_dirs, appids, result.get("found_games", {}).values()),
+    }
+    path = cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(payload, indent=1), encoding="utf-8")
+        os.replace(tmp, path)
+        logger.debug("Scan cache saved: %s (%d stamps)", path, len(payload["stamps"]))
+    except Exception:
+        logger.exception("Failed to write scan cache %s", path)
+
+
+def load_scan_cache(games: Dict[str, Dict[str, str]]) -> Optional[dict]:
+    """
+    Return the cached scan result if every recorded mtime still matches
+    (a handful of stat calls, no registry/VDF/directory work), else None.
+    """
+    path = cache_path()
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.warning("Ignoring unreadable scan cache %s", path)
+        return None
+
+    if payload.get("version") != CACHE_VERSION or payload.get("games") != _games_signature(games):
+        logger.debug("Scan cache outdated (version/game definitions changed)")
+        return None
+    for p, mtime in (payload.get("stamps") or {}).items():
+        if _mtime_ns(p) != mtime:
+            logger.debug("Scan cache invalid: %s changed", p)
+            return None
+
+    result = dict(payload.get("result") or {})
+    result.setdefault("found_games", {})
+    result.setdefault("missing", [])
+    result.setdefault("libraries", [])
+    result["from_cache"] = True
+    return result
+
+
+def clear_scan_cache() -> None:
+    try:
+        cache_path().unlink()
+    except FileNotFoundError:
+        pass
+    except Exception:
+        logger.exception("Failed to remove scan cache")
@@ -0,0 +1,302 @@
+# services/scanner.py
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+from core import metrics
+from services.steam import SteamDiscovery, get_discovery, find_game_dirs_by_appid
+from services.drive_scan import QUICK_BUDGET, DeepDriveScanner, list_drive_roots
+from models.state import GameFound
+
+logger = logging.getLogger("services.scanner")
+
+GameDefs = Dict[str, Dict[str, str]]
+
+
+class ScanCancelled(Exception):
+    pass
+
+
+class DirListingCache:
+    """Case-folded entry names per directory, listed at most once per scan (thread-safe)."""
+
+    def __init__(self):
+        self._cache: Dict[str, FrozenSet[str]] = {}
+        self._lock = threading.Lock()
+
+    def names(self, directory: Path) -> FrozenSet[str]:
+        key = str(directory)
+        with self._lock:
+            hit = self._cache.get(key)
+        if hit is not None:
+            metrics.incr("scan.listing_cache_hits")
+            return hit
+        metrics.incr("scan.dir_listings")
+        try:
+            with os.scandir(directory) as it:
+                names = frozenset(e.name.casefold() for e in it)
+        except OSError:
+            names = frozenset()
+        with self._lock:
+            self._cache[key] = names
+        return names
+
+    def has_file(self, directory: Path, name: str) -> bool:
+        return bool(name) and name.casefold() in self.names(directory)
+
+
+def match_library(
+    common: Path, wanted: Dict[str, List[Tuple[str, str]]], listings: DirListingCache
+) -> Dict[str, Path]:
+    """
+    One os.scandir over '<library>/steamapps/common' matched against all wanted
+    folders at once. wanted: casefolded folder name -> [(game_name, exe_name)].
+    Only matching folders are listed (once, via `listings`) for the exe check.
+    """
+    found: Dict[str, Path] = {}
+    try:
+        with os.scandir(common) as it:
+            for entry in it:
+                games = wanted.get(entry.name.casefold())
+                if not games:
+                    continue
+                try:
+                    if not entry.is_dir():
+                        continue
+                except OSError:
+                    continue
+                game_dir = Path(entry.path)
+                for game_name, exe_name in games:
+                    if listings.has_file(game_dir, exe_name):
+                        found[game_name] = game_dir
+    except OSError:
+        pass
+    return found
+
+
+class GameScanner:
+    """
+    Concurrent game scan engine (Qt-free; ScanWorker adapts it to signals).
+    Libraries and games are probed in parallel on a bounded thread pool,
+    cancel() stops the scan cooperatively and the result carries a per-phase
+    timing breakdown in result["timings"] (seconds). Games still missing after
+    the library phases are searched for with a bounded-depth deep drive scan
+    (a quick pass by default; pass deep_time_budget=FULL_BUDGET for a full one).
+    found_cb(GameFound) fires as soon as each game is confirmed, so callers can
+    act on early results while slower libraries/drives are still scanned.
+    """
+
+    def __init__(
+        self,
+        games: GameDefs,
+        log_cb: Optional[Callable[[str], None]] = None,
+        progress_cb: Optional[Callable[[int], None]] = None,
+        found_cb: Optional[Callable[[GameFound], None]] = None,
+        max_workers: int = 8,
+        deep_scan: bool = True,
+        deep_max_depth: int = 6,
+        deep_time_budget: float = QUICK_BUDGET,
+        discovery: Optional[SteamDiscovery] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ):
+        self.games = games
+        self.log_cb = log_cb or (lambda _m: None)
+        self.progress_cb = progress_cb or (lambda _p: None)
+        self.found_cb = found_cb or (lambda _g: None)
+        self.max_workers = max(1, max_workers)
+        self.deep_scan = deep_scan
+        self.deep_max_depth = deep_max_depth
+        self.deep_time_budget = deep_time_budget
+        self.discovery = discovery or get_discovery()
+        self.steamapps_dirs: List[Path] = []
+        self.listings = DirListingCache()
+        self._cancel = cancel_event if cancel_event is not None else threading.Event()
+        self._found_lock = threading.Lock()
+        self._finished = threading.Event()
+
+    # -----------------------------------------------------
+    # Cancellation
+    # -----------------------------------------------------
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def _check_cancel(self) -> None:
+        if self._cancel.is_set():
+            raise ScanCancelled()
+
+    def _confirm(self, result: dict, game_name: str, game_dir: Path, source: str) -> bool:
+        """Record a confirmed game once and stream it to found_cb."""
+        with self._found_lock:
+            # Late hits from abandoned deep-scan walkers after scan() returned are dropped
+            if self._finished.is_set() or game_name in result["found_games"]:
+                return False
+            result["found_games"][game_name] = str(game_dir)
+        metrics.incr(f"scan.found.{source}")
+        appid = self.games.get(game_name, {}).get("AppID")
+        self.found_cb(GameFound(game_name, str(game_dir), source, appid))
+        return True
+
+    # -----------------------------------------------------
+    # Phases
+    # -----------------------------------------------------
+    def _phase_libraries(self, result: dict) -> List[Path]:
+        self.log_cb("🧩 Detecting Steam libraries...\n")
+        # A full scan runs because something changed or the user forced it: rediscover
+        self.discovery.invalidate()
+        try:
+            self.steamapps_dirs = self.discovery.steamapps_dirs()
+        except Exception as e:
+            self.log_cb(f"❌ Steam library detection failed: {e}\n")
+            self.steamapps_dirs = []
+        libs = [sa / "common" for sa in self.steamapps_dirs]
+        if libs:
+            self.log_cb("✅ Detected Steam libraries:\n")
+            for lib in libs:
+                self.log_cb(f"  - {lib}\n")
+        else:
+            self.log_cb("⚠️ No Steam libraries found.\n")
+        result["libraries"] = [str(l) for l in libs]
+        return libs
+
+    def _phase_manifests(self, pool: ThreadPoolExecutor, result: dict) -> None:
+        appids = {info["AppID"]: name for name, info in self.games.items() if info.get("AppID")}
+        if not appids or not self.steamapps_dirs:
+            return
+        # One task per library, consumed in discovery order: first library wins
+        # and each hit is streamed as soon as its library is done.
+        futures = [pool.submit(find_game_dirs_by_appid, appids.keys(), [sa]) for sa in self.steamapps_dirs]
+        for fut in futures:
+            self._check_cancel()
+            try:
+                hits = fut.result()
+            except Exception as e:
+                self.log_cb(f"❌ App manifest lookup failed: {e}\n")
+                continue
+            for appid, game_dir in hits.items():
+                game_name = appids[appid]
+                if self._confirm(result, game_name, game_dir, "manifest"):
+                    self.log_cb(f"✅ '{game_name}' found via appmanifest_{appid}.acf in {game_dir}\n")
+
+    def _phase_probe(self, pool: ThreadPoolExecutor, libs: List[Path], result: dict) -> None:
+        # Fallback for games the manifests did not resolve (no AppID, no
+        # appmanifest in any library, or one naming a missing folder): look
+        # for the game's default folder name in each library.
+        pending = [n for n in self.games if n not in result["found_games"]]
+        if not pending or not libs:
+            return
+        wanted: Dict[str, List[Tuple[str, str]]] = {}
+        for game_name in pending:
+            info = self.games[game_name]
+            folder = info.get("Folder", "")
+            if folder:
+                wanted.setdefault(folder.casefold(), []).append((game_name, info.get("exe", "")))
+        self.log_cb(f"🔵 Checking {len(pending)} games in {len(libs)} libraries...\n")
+
+        # One traversal per library, consumed in discovery order (first library wins)
+        futures = [pool.submit(match_library, lib, wanted, self.listings) for lib in libs]
+        for fut in futures:
+            self._check_cancel()
+            try:
+                matches = fut.result()
+            except Exception:
+                matches = {}
+            for game_name, game_dir in matches.items():
+                if self._confirm(result, game_name, game_dir, "library"):
+                    self.log_cb(f"✅ Found '{game_name}' in {game_dir}\n")
+
+    def _phase_fallback(self, result: dict) -> None:
+        self.log_cb("🪄 Running deep drive scan for missing games...\n")
+        wanted: Dict[str, List[Tuple[str, str]]] = {}
+        for game_name in result["missing"]:
+            info = self.games[game_name]
+            if info.get("Folder"):
+                wanted.setdefault(info["Folder"].casefold(), []).append((game_name, info.get("exe", "")))
+        if not wanted:
+            return
+        def on_found(game_name: str, path: Path) -> None:
+            if self._confirm(result, game_name, path, "drive"):
+                self.log_cb(f"✅ Found '{game_name}' in {path}\n")
+
+        roots = list_drive_roots()
+        for root in roots:
+            self.log_cb(f"→ Scanning {root}\n")
+        deep = DeepDriveScanner(
+            wanted,
+            on_found=on_found,
+            max_depth=self.deep_max_depth,
+            time_budget=self.deep_time_budget,
+            max_workers=self.max_workers,
+            cancel_event=self._cancel,
+        )
+        deep.scan(roots)
+        for root in deep.timed_out:
+            self.log_cb(f"⌛ Time budget reached on {root}\n")
+        # result["missing"] is settled in scan() once late walker hits are shut out
+
+    # -----------------------------------------------------
+    # Main routine
+    # -----------------------------------------------------
+    def scan(self) -> dict:
+        result = {"found_games": {}, "missing": [], "libraries": [], "timings": {}, "cancelled": False}
+        timings = result["timings"]
+        t_start = time.perf_counter()
+
+        def timed(name: str, fn, *args):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                timings[name] = time.perf_counter() - t0
+                metrics.observe(f"scan.phase.{name}", timings[name])
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scan")
+        try:
+            self.log_cb("🔵 Starting scan...\n")
+            libs = timed("libraries", self._phase_libraries, result)
+            self._check_cancel()
+            self.progress_cb(20)
+
+            timed("manifests", self._phase_manifests, pool, result)
+            self._check_cancel()
+            self.progress_cb(40)
+
+            timed("probe", self._phase_probe, pool, libs, result)
+            self._check_cancel()
+            self.progress_cb(70)
+
+            result["missing"] = [g for g in self.games if g not in result["found_games"]]
+            for game_name in result["missing"]:
+                self.log_cb(f"❌ {game_name} not found in Steam libraries.\n")
+            if result["missing"] and self.deep_scan:
+                timed("fallback", self._phase_fallback, result)
+                self._check_cancel()
+            self.progress_cb(100)
+        except ScanCancelled:
+            result["cancelled"] = True
+            self.log_cb("⏹ Scan cancelled.\n")
+        finally:
+            # Never block on a hanging probe (e.g. dead network drive)
+            pool.shutdown(wait=False, cancel_futures=True)
+            # Deep-scan walkers may still be running: stop accepting their hits
+            # before deciding what is missing, so a game is never both found and missing
+            with self._found_lock:
+                self._finished.set()
+                result["missing"] = [g for g in self.games if g not in result["found_games"]]
+            timings["total"] = time.perf_counter() - t_start
+            metrics.observe("scan.total", timings["total"])
+            metrics.gauge("scan.games_missing", len(result["missing"]))
+
+        self.log_cb(
+            "⏱ Timings: " + ", ".join(f"{k} {v * 1000:.0f} ms" for k, v in timings.items()) + "\n"
+        )
+        logger.debug("scan() -> %s", result)
+        return result
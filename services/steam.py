@@ -2,10 +2,12 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 import os
-import re
 import logging
+import threading
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional
+from core import metrics
+from services import vdf
 
 logger = logging.getLogger("services.steam")
 
@@ -70,76 +72,247 @@ def find_steam_base_paths() -> List[Path]:
     logger.debug("find_steam_base_paths() -> %d", len(uniq))
     return uniq
 
+def read_libraryfolders(vdf_path: Path) -> List[Dict[str, object]]:
+    """
+    Parse libraryfolders.vdf into [{"path": Path, "apps": {appid: size}}, ...].
+    Handles the current format ("N" { "path" ... "apps" { ... } }) and the
+    legacy one ("N" "X:\\SteamLibrary").
+    """
+    logger.debug("read_libraryfolders(%s)", vdf_path)
+    entries: List[Dict[str, object]] = []
+    metrics.incr("steam.vdf_reads")
+    try:
+        data = vdf.load(vdf_path, lower_keys=True)
+    except vdf.VDFError:
+        logger.exception("Malformed VDF: %s", vdf_path)
+        return entries
+    except Exception:
+        logger.exception("Failed to parse %s", vdf_path)
+        return entries
+    root = data.get("libraryfolders") or {}
+    for key, value in root.items():
+        if not key.isdigit():
+            continue
+        if isinstance(value, dict):
+            path = value.get("path")
+            apps = value.get("apps") if isinstance(value.get("apps"), dict) else {}
+        else:
+            path, apps = value, {}
+        if path:
+            entries.append({"path": Path(path), "apps": dict(apps)})
+    return entries
+
 def parse_libraryfolders_vdf(vdf_path: Path) -> List[Path]:
     """
-    Very small parser: extracts library 'path' entries from libraryfolders.vdf.
+    Extracts existing library 'path' entries from libraryfolders.vdf.
     """
     logger.debug("parse_libraryfolders_vdf(%s)", vdf_path)
     libs: List[Path] = []
+    for entry in read_libraryfolders(vdf_path):
+        p = entry["path"]
+        try:
+            if p.exists():
+                libs.append(p)
+                logger.debug("VDF library path: %s", p)
+        except Exception:
+            pass
+    return libs
+
+def read_login_users(steam_base: Path) -> Dict[str, Dict[str, str]]:
+    """
+    Parse '<steam>/config/loginusers.vdf' -> {steamid64: {accountname, personaname, mostrecent, ...}}.
+    """
+    path = steam_base / "config" / "loginusers.vdf"
     try:
-        text = vdf_path.read_text(encoding="utf-8", errors="ignore")
-        # Matches: "N" { ... "path" "X:\SteamLibrary" ... }
-        pattern = r'"\d+"\s*{\s*[^}]*?"path"\s*"([^"]+)"'
-        matches = list(re.finditer(pattern, text, re.IGNORECASE | re.DOTALL))
-        for m in matches:
-            path = m.group(1).replace("\\\\", "\\")
-            p = Path(path)
-            try:
-                if p.exists():
-                    libs.append(p)
-                    logger.debug("VDF library path: %s", p)
-            except Exception:
-                pass
-    except re.error:
-        logger.exception("Regex error while parsing %s", vdf_path)
+        data = vdf.load(path, lower_keys=True)
+    except FileNotFoundError:
+        return {}
     except Exception:
-        logger.exception("Failed to parse %s", vdf_path)
-    return libs
+        logger.exception("Failed to parse %s", path)
+        return {}
+    users = data.get("users") or {}
+    return {sid: info for sid, info in users.items() if isinstance(info, dict)}
 
-def find_steam_common_dirs() -> List[Path]:
+def find_steam_steamapps_dirs() -> List[Path]:
     """
-    Returns candidate '<library>/steamapps/common' directories from all known libraries.
+    Returns unique '<library>/steamapps' directories from all known libraries.
     """
-    commons: List[Path] = []
+    dirs: List[Path] = []
     try:
         bases = find_steam_base_paths()
         for base in bases:
             sa = base / "steamapps"
             if sa.exists():
-                commons.append(sa / "common")
+                dirs.append(sa)
             vdf = sa / "libraryfolders.vdf"
             if vdf.exists():
                 for lib in parse_libraryfolders_vdf(vdf):
                     sa2 = lib / "steamapps"
                     if sa2.exists():
-                        commons.append(sa2 / "common")
+                        dirs.append(sa2)
     except Exception:
-        logger.exception("find_steam_common_dirs() unexpected error")
+        logger.exception("find_steam_steamapps_dirs() unexpected error")
 
-    # unique + existing
     uniq: List[Path] = []
     seen = set()
-    for c in commons:
+    for d in dirs:
         try:
-            if c.exists():
-                key = str(c.resolve())
-            else:
-                continue
+            key = str(d.resolve())
         except Exception:
-            key = str(c)
+            key = str(d)
         if key not in seen:
-            uniq.append(c)
+            uniq.append(d)
             seen.add(key)
-    logger.debug("find_steam_common_dirs() -> %d", len(uniq))
+    logger.debug("find_steam_steamapps_dirs() -> %d", len(uniq))
     return uniq
 
+def find_steam_common_dirs() -> List[Path]:
+    """
+    Returns candidate '<library>/steamapps/common' directories from all known libraries.
+    """
+    commons: List[Path] = []
+    for sa in find_steam_steamapps_dirs():
+        c = sa / "common"
+        try:
+            if c.exists():
+                commons.append(c)
+        except Exception:
+            pass
+    logger.debug("find_steam_common_dirs() -> %d", len(commons))
+    return commons
+
+def read_appmanifest(steamapps: Path, appid: str) -> Optional[Dict[str, object]]:
+    """
+    Read the 'AppState' block of '<steamapps>/appmanifest_<appid>.acf' (keys lower-cased).
+    Returns None if the app is not installed in this library.
+    """
+    acf = steamapps / f"appmanifest_{appid}.acf"
+    metrics.incr("steam.manifest_probes")
+    try:
+        data = vdf.load(acf, lower_keys=True)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        logger.exception("Failed to read %s", acf)
+        return None
+    state = data.get("appstate")
+    return state if isinstance(state, dict) else None
+
+def find_game_dirs_by_appid(
+    appids: Iterable[str], steamapps_dirs: Optional[List[Path]] = None
+) -> Dict[str, Path]:
+    """
+    Locate installed games via 'appmanifest_<appid>.acf' -> 'installdir'.
+    One manifest read per library and app plus one stat of the install folder
+    it names, so installs in non-default folders are found too; a manifest
+    whose folder is gone (stale after a move or an aborted uninstall) does not
+    count. Returns {appid: '<library>/steamapps/common/<installdir>'}.
+    """
+    wanted = [str(a) for a in appids if a]
+    if steamapps_dirs is None:
+        steamapps_dirs = find_steam_steamapps_dirs()
+    found: Dict[str, Path] = {}
+    for sa in steamapps_dirs:
+        for appid in wanted:
+            if appid in found:
+                continue
+            manifest = read_appmanifest(sa, appid) or {}
+            installdir = manifest.get("installdir")
+            if not (isinstance(installdir, str) and installdir):
+                continue
+            game_dir = sa / "common" / installdir
+            try:
+                exists = game_dir.is_dir()
+            except OSError:
+                exists = False
+            if not exists:
+                logger.debug("appmanifest %s names missing folder %s", appid, game_dir)
+                continue
+            found[appid] = game_dir
+            logger.debug("appmanifest %s -> %s", appid, game_dir)
+    return found
+
+class SteamDiscovery:
+    """
+    Memoized Steam library discovery shared across lookups.
+    The registry read, heuristic checks, VDF parsing and resolve() calls run
+    once; call invalidate() when libraries may have changed (forced rescan,
+    libraryfolders.vdf modified).
+    """
+
+    def __init__(self):
+        self._steamapps: Optional[List[Path]] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._steamapps = None
+
+    def steamapps_dirs(self) -> List[Path]:
+        with self._lock:
+            if self._steamapps is None:
+                with metrics.timer("steam.discover_libraries"):
+                    self._steamapps = find_steam_steamapps_dirs()
+                metrics.gauge("steam.libraries", len(self._steamapps))
+            return list(self._steamapps)
+
+    def common_dirs(self) -> List[Path]:
+        commons: List[Path] = []
+        for sa in self.steamapps_dirs():
+            c = sa / "common"
+            try:
+                if c.is_dir():
+                    commons.append(c)
+            except OSError:
+                pass
+        return commons
+
+    def auto_detect_game_dirs(self, folder_names: Iterable[str]) -> Dict[str, Optional[Path]]:
+        """
+        Resolve many '<library>/steamapps/common/<folder>' at once: one directory
+        listing per library, case-insensitive match, first library wins.
+        """
+        names = list(dict.fromkeys(folder_names))
+        wanted = {n.casefold(): n for n in names}
+        found: Dict[str, Optional[Path]] = {n: None for n in names}
+        remaining = set(wanted)
+        for common in self.common_dirs():
+            if not remaining:
+                break
+            metrics.incr("steam.library_listings")
+            try:
+                with os.scandir(common) as it:
+                    for entry in it:
+                        key = entry.name.casefold()
+                        if key in remaining and entry.is_dir():
+                            found[wanted[key]] = Path(entry.path)
+                            remaining.discard(key)
+            except OSError:
+                logger.debug("Cannot list %s", common)
+        return found
+
+    def auto_detect_game_dir(self, game_folder_name: str) -> Optional[Path]:
+        return self.auto_detect_game_dirs([game_folder_name])[game_folder_name]
+
+
+_discovery = SteamDiscovery()
+
+def get_discovery() -> SteamDiscovery:
+    """Process-wide discovery context."""
+    return _discovery
+
+def auto_detect_game_dirs(folder_names: Iterable[str]) -> Dict[str, Optional[Path]]:
+    """Batched lookup of '<library>/steamapps/common/<folder>' for many games."""
+    try:
+        return _discovery.auto_detect_game_dirs(folder_names)
+    except Exception:
+        logger.exception("auto_detect_game_dirs() failed")
+        return {n: None for n in folder_names}
+
 def auto_detect_game_dir(game_folder_name: str) -> Optional[Path]:
     """Try to locate '<library>/steamapps/common/<game_folder_name>'."""
     try:
-        for common in find_steam_common_dirs():
-            candidate = common / game_folder_name
-            if candidate.exists() and candidate.is_dir():
-                return candidate
+        return _discovery.auto_detect_game_dir(game_folder_name)
     except Exception:
         logger.exception("auto_detect_game_dir(%r) failed", game_folder_name)
     return None
@@ -0,0 +1,105 @@
+# services/vdf.py
+# -*- coding: utf-8 -*-
+"""
+Streaming parser for Valve's KeyValues text format (VDF/ACF).
+
+Used for libraryfolders.vdf, appmanifest_<appid>.acf and loginusers.vdf.
+One linear pass: a single compiled token regex is matched at the current
+position and nested dicts are built with an explicit stack.
+"""
+from __future__ import annotations
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+VdfDict = Dict[str, Any]
+
+
+class VDFError(ValueError):
+    pass
+
+
+# Leading whitespace, then one of: comment | "quoted" | brace | [$conditional] | bare token
+_TOKEN_RE = re.compile(
+    r'\s*(?:'
+    r'(//[^\n]*)'
+    r'|"((?:[^"\\]|\\.)*)"'
+    r'|([{}])'
+    r'|(\[[^\]\n]*\])'
+    r'|([^\s{}"]+)'
+    r')',
+    re.DOTALL,
+)
+_WS_RE = re.compile(r"\s*")
+_ESCAPE_RE = re.compile(r"\\(.)", re.DOTALL)
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "\\": "\\", '"': '"'}
+
+
+def _unescape(s: str) -> str:
+    if "\\" not in s:
+        return s
+    return _ESCAPE_RE.sub(lambda m: _ESCAPES.get(m.group(1), "\\" + m.group(1)), s)
+
+
+def loads(text: str, lower_keys: bool = False) -> VdfDict:
+    """
+    Parse VDF text into nested dicts. Duplicate keys: the last one wins.
+    With lower_keys=True all keys are lower-cased (Steam treats keys case-insensitively).
+    Raises VDFError on malformed input instead of silently dropping blocks.
+    """
+    root: VdfDict = {}
+    stack: List[VdfDict] = [root]
+    cur = root
+    key: Optional[str] = None
+    pos = 0
+    end = len(text)
+    match = _TOKEN_RE.match
+
+    if text.startswith("\ufeff"):
+        pos = 1
+    while True:
+        m = match(text, pos)
+        if m is None or m.end() == pos:
+            # Only trailing whitespace may remain
+            if _WS_RE.match(text, pos).end() != end:
+                raise VDFError(f"Unexpected character at offset {pos}")
+            break
+        pos = m.end()
+        comment, quoted, brace, _cond, bare = m.groups()
+        if comment is not None or _cond is not None:
+            continue
+        if brace == "{":
+            if key is None:
+                raise VDFError(f"Block without key at offset {m.start()}")
+            new: VdfDict = {}
+            cur[key] = new
+            stack.append(new)
+            cur = new
+            key = None
+            continue
+        if brace == "}":
+            if key is not None:
+                raise VDFError(f"Key {key!r} without value at offset {m.start()}")
+            if len(stack) == 1:
+                raise VDFError(f"Unbalanced '}}' at offset {m.start()}")
+            stack.pop()
+            cur = stack[-1]
+            continue
+        token = _unescape(quoted) if quoted is not None else bare
+        if key is None:
+            key = token.lower() if lower_keys else token
+        else:
+            cur[key] = token
+            key = None
+
+    if key is not None:
+        raise VDFError(f"Key {key!r} without value at end of input")
+    if len(stack) != 1:
+        raise VDFError("Unterminated block at end of input")
+    return root
+
+
+def load(path: str | Path, lower_keys: bool = False) -> VdfDict:
+    """Read and parse a VDF/ACF file (UTF-8, undecodable bytes ignored)."""
+    text = Path(path).read_text(encoding="utf-8", errors="ignore")
+    return loads(text, lower_keys=lower_keys)
@@ -7,6 +7,7 @@ import time
 import zipfile
 from pathlib import Path
 from typing import Callable
+from core import metrics
 
 def is_within_directory(base_dir: Path, target: Path) -> bool:
     try:
@@ -19,9 +20,12 @@ def is_within_directory(base_dir: Path, target: Path) -> bool:
 
 def compute_sha256(p: Path) -> str:
     h = hashlib.sha256()
-    with open(p, "rb") as f:
+    n = 0
+    with metrics.timer("hash.sha256"), open(p, "rb") as f:
         for chunk in iter(lambda: f.read(1 << 20), b""):
             h.update(chunk)
+            n += len(chunk)
+    metrics.incr("hash.bytes", n)
     return h.hexdigest()
 
 def safe_extract_zip(
@@ -34,7 +38,7 @@ def safe_extract_zip(
     """
     Safe ZIP extraction with directory traversal protection and automatic backups.
     """
-    with zipfile.ZipFile(zip_path, "r") as zf:
+    with metrics.timer("zip.extract"), zipfile.ZipFile(zip_path, "r") as zf:
         members = sorted(zf.infolist(), key=lambda i: i.filename)
         total = max(1, len(members))
         done = 0
@@ -55,9 +59,12 @@ def safe_extract_zip(
                     backup_path = backup_dir / rel
                     backup_path.parent.mkdir(parents=True, exist_ok=True)
                     shutil.copy2(target_file, backup_path)
+                    metrics.incr("zip.backups")
                     log_cb(f"[BACKUP] {rel}")
                 with zf.open(m, "r") as src, open(target_file, "wb") as dst:
                     shutil.copyfileobj(src, dst)
+                metrics.incr("zip.files_written")
+                metrics.incr("zip.bytes_written", m.file_size)
                 log_cb(f"[WRITE] {m.filename}")
             done += 1
             progress_cb(int(100 * done / total))
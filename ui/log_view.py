@@ -0,0 +1,131 @@
+# ui/log_view.py
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+from typing import List, Optional
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import QFileDialog, QMessageBox, QPlainTextEdit
+
+DEFAULT_MAX_LINES = 5000
+DEFAULT_FLUSH_MS = 50
+
+
+class LogBuffer:
+    """
+    Qt-free log model shared by the page log views.
+    New messages are queued until the next flush, then split into text
+    lines and spooled to a temporary file, so the full history can be saved
+    without keeping it in memory. Display capping is left to the view.
+    append() is thread-safe.
+    """
+
+    def __init__(self):
+        self._pending: List[str] = []
+        self._lock = threading.Lock()
+        self._history = tempfile.TemporaryFile("w+", encoding="utf-8")
+        self.total = 0
+
+    def append(self, text: str) -> None:
+        with self._lock:
+            self._pending.append(text)
+
+    def take(self) -> List[str]:
+        """Move pending messages into the history; returns them as text lines (oldest first)."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return []
+        lines = "\n".join(pending).split("\n")
+        self._history.write("\n".join(lines) + "\n")
+        self.total += len(lines)
+        return lines
+
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def save(self, path: str) -> int:
+        """Write the full history to `path`; returns the number of lines."""
+        self.take()
+        self._history.flush()
+        self._history.seek(0)
+        try:
+            with open(path, "w", encoding="utf-8") as out:
+                shutil.copyfileobj(self._history, out)
+        finally:
+            self._history.seek(0, 2)
+        return self.total
+
+    def close(self) -> None:
+        self._history.close()
+
+
+class LogView(QPlainTextEdit):
+    """
+    Read-only log widget used by every page.
+    append_line() only queues text; a QTimer tick renders all queued lines
+    with one appendPlainText, so a worker emitting a line per file costs one
+    repaint per tick instead of one per line. The document keeps at most
+    `max_lines` text lines (its block count, the only display cap), and
+    "Save log…" writes the complete history.
+    """
+
+    def __init__(self, parent=None, max_lines: int = DEFAULT_MAX_LINES, flush_ms: int = DEFAULT_FLUSH_MS,
+                 name: str = "log"):
+        super().__init__(parent)
+        self.name = name
+        self.buffer = LogBuffer()
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.setMaximumBlockCount(max_lines)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(flush_ms)
+        self._timer.timeout.connect(self.flush)
+        self.destroyed.connect(self.buffer.close)
+
+    def append_line(self, text: str) -> None:
+        """Queue one message (may contain newlines). Call from the GUI thread."""
+        self.buffer.append(text.rstrip("\n"))
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self) -> None:
+        lines = self.buffer.take()
+        if not lines:
+            return
+        bar = self.verticalScrollBar()
+        follow = bar.value() >= bar.maximum() - 2
+        # Lines beyond the cap would be trimmed right away; don't lay them out
+        self.appendPlainText("\n".join(lines[-self.maximumBlockCount():]))
+        if follow:
+            bar.setValue(bar.maximum())
+
+    def clear(self) -> None:
+        self.buffer.take()   # queued lines go to the history, not the view
+        super().clear()
+
+    # ---------- save ----------
+    def save_to_file(self, path: str) -> int:
+        return self.buffer.save(path)
+
+    def save_dialog(self) -> Optional[str]:
+        default = f"{self.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+        path, _ = QFileDialog.getSaveFileName(self, "Save log", default, "Log files (*.log *.txt);;All files (*)")
+        if not path:
+            return None
+        try:
+            count = self.save_to_file(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Save log", f"Could not save log:\n{e}")
+            return None
+        self.append_line(f"💾 Saved {count} log lines to {path}")
+        return path
+
+    def contextMenuEvent(self, event):
+        menu = self.createStandardContextMenu()
+        menu.addSeparator()
+        menu.addAction("Save log…", self.save_dialog)
+        menu.exec(event.globalPos())
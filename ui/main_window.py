@@ -1,42 +1,104 @@
-from PySide6.QtWidgets import QMainWindow, QStackedWidget
+import logging
+from typing import Callable, Dict
+from PySide6.QtWidgets import QMainWindow, QStackedWidget, QWidget
+from PySide6.QtCore import QTimer
 from ui.pages.main_page import MainPage
-from ui.pages.patcher_page import PatcherPage
-from ui.pages.disabler_page import DisablerPage
-from ui.pages.blocker_page import BlockerPage
+from models.games import GAMES_META
+from models.state import GameFound, ScanResultStore
+
+
+logger = logging.getLogger("ui.main_window")
 
 
 class MainWindow(QMainWindow):
+    """
+    Only the home page is built before the first paint. The patcher,
+    disabler and blocker pages (and their workers, urllib, asyncio,
+    services.firewall, ...) are imported and constructed on first navigation.
+    """
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("INS2DOI Community Patcher")
         self.resize(900, 680)
 
-        # Store scan results
-        self.scan_results = {}
+        # Live scan results; pages subscribe to changes
+        self.store = ScanResultStore()
+        self._pages: Dict[str, QWidget] = {}
+        self._page_factories: Dict[str, Callable[[], QWidget]] = {
+            "patcher": self._build_patcher_page,
+            "disabler": self._build_disabler_page,
+            "blocker": self._build_blocker_page,
+        }
+        self.library_watcher = None
 
-        # Initialize all pages
         self.main_page = MainPage(
             go_patcher=self.open_patcher,
             go_disabler=self.open_disabler,
             go_blocker=self.open_blocker,
             go_home=self.go_home,
-            set_scan_results=self.set_scan_results
+            set_scan_results=self.set_scan_results,
+            add_found_game=self.add_found_game,
         )
-        
-        self.patcher_page = PatcherPage(back_cb=self.go_home)
-        self.disabler_page = DisablerPage(back_cb=self.go_home, get_scan_results=self.get_scan_results)
-        self.blocker_page = BlockerPage(back_cb=self.go_home)
 
         # Central stack
         self.stack = QStackedWidget()
         self.stack.addWidget(self.main_page)
-        self.stack.addWidget(self.patcher_page)
-        self.stack.addWidget(self.disabler_page)
-        self.stack.addWidget(self.blocker_page)
         self.setCentralWidget(self.stack)
-
         self.stack.setCurrentWidget(self.main_page)
 
+        # Cache restore and library watching run right after the first paint
+        QTimer.singleShot(0, self._after_first_paint)
+
+    def _after_first_paint(self):
+        from services.scan_cache import load_scan_cache
+        from workers.library_watcher import LibraryWatcher
+
+        # Restore last scan if install locations are unchanged (a few stat calls)
+        cached = load_scan_cache(GAMES_META)
+        if cached:
+            self.set_scan_results(cached)
+            self.main_page.show_cached_results(cached)
+
+        # Live library watching (installs/moves/uninstalls update the store incrementally)
+        self.library_watcher = LibraryWatcher(self.store, GAMES_META, parent=self)
+        self.library_watcher.log.connect(self.main_page.append_log)
+        QTimer.singleShot(0, self.library_watcher.start)
+
+    # ---------- lazy pages ----------
+    def _build_patcher_page(self) -> QWidget:
+        from ui.pages.patcher_page import PatcherPage
+        return PatcherPage(back_cb=self.go_home, get_scan_results=self.get_scan_results, store=self.store)
+
+    def _build_disabler_page(self) -> QWidget:
+        from ui.pages.disabler_page import DisablerPage
+        return DisablerPage(back_cb=self.go_home, get_scan_results=self.get_scan_results, store=self.store)
+
+    def _build_blocker_page(self) -> QWidget:
+        from ui.pages.blocker_page import BlockerPage
+        return BlockerPage(back_cb=self.go_home)
+
+    def page(self, name: str) -> QWidget:
+        """Return the named page, importing and building it on first use."""
+        page = self._pages.get(name)
+        if page is None:
+            page = self._pages[name] = self._page_factories[name]()
+            self.stack.addWidget(page)
+            logger.debug("Built %s page", name)
+        return page
+
+    @property
+    def patcher_page(self):
+        return self.page("patcher")
+
+    @property
+    def disabler_page(self):
+        return self.page("disabler")
+
+    @property
+    def blocker_page(self):
+        return self.page("blocker")
+
     # Navigation
     def go_home(self):
         self.stack.setCurrentWidget(self.main_page)
@@ -45,17 +107,25 @@ class MainWindow(QMainWindow):
         self.stack.setCurrentWidget(self.patcher_page)
 
     def open_disabler(self):
-        self.stack.setCurrentWidget(self.disabler_page)
-        self.disabler_page._refresh_from_scan()  # ensure latest data is displayed
+        page = self.disabler_page
+        self.stack.setCurrentWidget(page)
+        page._refresh_from_scan()  # ensure latest data is displayed
 
     def open_blocker(self):
         self.stack.setCurrentWidget(self.blocker_page)
 
     # Scan data handling
+    @property
+    def scan_results(self) -> dict:
+        return self.store.snapshot()
+
     def set_scan_results(self, results: dict):
-        self.scan_results = results or {}
-        print(f"[debug] Stored scan results in MainWindow: {self.scan_results}")
+        self.store.replace(results)
+        logger.debug("Stored scan results in MainWindow: %s", results)
+
+    def add_found_game(self, game: GameFound):
+        """Streamed scan hit: pages see it before the scan finishes."""
+        self.store.add_game(game)
 
     def get_scan_results(self):
-        print(f"[debug] Returning scan results: {self.scan_results}")
-        return self.scan_results
+        return self.store.snapshot()
@@ -1,31 +1,40 @@
 import os
 import urllib.request
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QTextEdit, QProgressBar
-from PySide6.QtCore import Qt, QThread, Signal
-from PySide6.QtGui import QTextCursor
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTextEdit, QProgressBar, QInputDialog, QFileDialog
+)
+from PySide6.QtCore import Qt, Signal
+from core.metrics import recorded
+from core.worker_profile import profiled
+from ui.log_view import LogView
+from workers.jobs import Priority, Worker, get_job_manager
 from resources.texts import BLOCKER_TEXT
 from services.firewall import _run_powershell  # ✅ use your silent runner
+from services.blocklist import BlocklistIndex, fetch_blocklist, check_server_list, parse_server_list
+from services.a2s import DEFAULT_PORT, probe_servers, find_suspicious, blocklist_candidates
 
 
-class BlockerWorker(QThread):
-    progress = Signal(str)
+class BlockerWorker(Worker):
+    kind = "blocker"
     finished = Signal(bool)
 
+    @recorded("blocker")
+    @profiled(name="BlockerPageWorker")
     def run(self):
         try:
-            self.progress.emit("[blocker] Starting operation...")
+            self.log.emit("[blocker] Starting operation...")
             url = "https://content.hl2dm.org/spamfilter/RogueIPs.txt"
 
             with urllib.request.urlopen(url) as response:
                 ips = [line.strip().decode("utf-8") for line in response if line.strip()]
 
             if not ips:
-                self.progress.emit("[blocker] No IPs found in remote list.")
+                self.log.emit("[blocker] No IPs found in remote list.")
                 self.finished.emit(False)
                 return
 
             ip_list = ",".join(ips)
-            self.progress.emit(f"[blocker] Loaded {len(ips)} IPs.")
+            self.log.emit(f"[blocker] Loaded {len(ips)} IPs.")
 
             inbound_name = "INS2DOI_Block_All_IN"
             outbound_name = "INS2DOI_Block_All_OUT"
@@ -46,19 +55,75 @@ class BlockerWorker(QThread):
                 -RemoteAddress {ip_list} -Profile Any -Protocol Any
             """)
 
-            self.progress.emit("[blocker] Operation completed successfully with unified rules.")
+            self.log.emit("[blocker] Operation completed successfully with unified rules.")
             self.finished.emit(True)
 
         except Exception as e:
-            self.progress.emit(f"[blocker] Error: {str(e)}")
+            self.log.emit(f"[blocker] Error: {str(e)}")
             self.finished.emit(False)
 
 
+class ServerCheckWorker(Worker):
+    """Check a server list against the Rogue IP index (downloads the list once)."""
+    kind = "server_check"
+    finished = Signal(object)
+
+    def __init__(self, text: str, index: BlocklistIndex = None):
+        super().__init__()
+        self.text = text
+        self.index = index
+
+    @recorded("server_check")
+    @profiled()
+    def run(self):
+        try:
+            if self.index is None:
+                self.log.emit("[check] Downloading Rogue IP list...")
+                self.index = BlocklistIndex(fetch_blocklist())
+                self.log.emit(f"[check] Indexed {len(self.index.entries)} entries ({len(self.index)} ranges).")
+            report = check_server_list(self.index, self.text)
+            self.finished.emit(report)
+        except Exception as e:
+            self.log.emit(f"[check] Error: {str(e)}")
+            self.finished.emit(None)
+
+
+class ServerProbeWorker(Worker):
+    """Probe servers via A2S and report fake/spam server candidates."""
+    kind = "server_probe"
+    finished = Signal(object)
+
+    def __init__(self, text: str):
+        super().__init__()
+        self.text = text
+
+    @recorded("server_probe")
+    @profiled()
+    def run(self):
+        try:
+            servers, _ = parse_server_list(self.text)
+            # The A2S prober uses an IPv4 socket
+            addrs = [(ip, port or DEFAULT_PORT) for ip, port in servers if ":" not in ip]
+            if len(addrs) < len(servers):
+                self.log.emit(f"[probe] Skipping {len(servers) - len(addrs)} IPv6 servers.")
+            self.log.emit(f"[probe] Querying {len(addrs)} servers (A2S_INFO/A2S_PLAYER)...")
+            results = probe_servers(addrs)
+            answered = sum(1 for r in results if r.ok)
+            self.log.emit(f"[probe] {answered}/{len(results)} servers answered.")
+            self.finished.emit(find_suspicious(results))
+        except Exception as e:
+            self.log.emit(f"[probe] Error: {str(e)}")
+            self.finished.emit(None)
+
+
 class BlockerPage(QWidget):
     def __init__(self, back_cb=None):
         super().__init__()
         self.back_cb = back_cb
         self.worker = None
+        self.check_worker = None
+        self.probe_worker = None
+        self.index = None
         self.init_ui()
 
     def init_ui(self):
@@ -83,8 +148,7 @@ class BlockerPage(QWidget):
 
         layout.setContentsMargins(10, 10, 10, 10)
 
-        self.textbox = QTextEdit()
-        self.textbox.setReadOnly(True)
+        self.textbox = LogView(name="blocker")
         self.textbox.setStyleSheet(
             "background-color: black; color: #00FFAA; font-family: Consolas; font-size: 11pt;"
         )
@@ -99,6 +163,28 @@ class BlockerPage(QWidget):
         self.enable_btn.setStyleSheet("background-color: #2c2c2c; color: #ffcc00; height: 26px;")
         layout.addWidget(self.enable_btn)
 
+        check_row = QHBoxLayout()
+        self.check_paste_btn = QPushButton("Check Server List (paste)")
+        self.check_paste_btn.clicked.connect(self.handle_check_paste)
+        self.check_paste_btn.setStyleSheet("background-color: #2c2c2c; color: #00FFAA; height: 26px;")
+        check_row.addWidget(self.check_paste_btn)
+
+        self.check_file_btn = QPushButton("Check Server List (file)")
+        self.check_file_btn.clicked.connect(self.handle_check_file)
+        self.check_file_btn.setStyleSheet("background-color: #2c2c2c; color: #00FFAA; height: 26px;")
+        check_row.addWidget(self.check_file_btn)
+
+        self.probe_btn = QPushButton("Probe Servers for Spam")
+        self.probe_btn.clicked.connect(self.handle_probe)
+        self.probe_btn.setStyleSheet("background-color: #2c2c2c; color: #00FFAA; height: 26px;")
+        check_row.addWidget(self.probe_btn)
+
+        self.save_log_btn = QPushButton("💾 Save Log")
+        self.save_log_btn.clicked.connect(self.textbox.save_dialog)
+        self.save_log_btn.setStyleSheet("background-color: #2c2c2c; color: white; height: 26px;")
+        check_row.addWidget(self.save_log_btn)
+        layout.addLayout(check_row)
+
         self.back_btn = QPushButton("Back")
         self.back_btn.clicked.connect(self.back_cb)
         self.back_btn.setStyleSheet("background-color: #2c2c2c; color: white; height: 26px;")
@@ -107,21 +193,91 @@ class BlockerPage(QWidget):
         self.setLayout(layout)
 
     def handle_enable(self):
+        jobs = get_job_manager()
+        if jobs.is_active(BlockerWorker.kind):
+            self.append("[blocker] Operation already running. Please wait...")
+            return
         self.textbox.clear()
         self.append("[blocker] Starting...")
         self.progress.setValue(10)
 
         self.worker = BlockerWorker()
-        self.worker.progress.connect(self.append)
         self.worker.finished.connect(self.on_finished)
-        self.worker.start()
+        jobs.submit(self.worker, log=self.append)
+
+    # ---------- Server list check ----------
+    def handle_check_paste(self):
+        text, ok = QInputDialog.getMultiLineText(
+            self, "Check Server List", "Paste servers (ip or ip:port, one per line):"
+        )
+        if ok and text.strip():
+            self._start_check(text)
+
+    def handle_check_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Load Server List", "", "Text files (*.txt *.csv);;All files (*)")
+        if not path:
+            return
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                text = f.read()
+        except Exception as e:
+            self.append(f"[check] Could not read {path}: {e}")
+            return
+        self._start_check(text)
+
+    def _start_check(self, text: str):
+        jobs = get_job_manager()
+        if jobs.is_active(ServerCheckWorker.kind):
+            self.append("[check] Check already running. Please wait...")
+            return
+        self.append("[check] Checking server list...")
+        self.check_worker = ServerCheckWorker(text, self.index)
+        self.check_worker.finished.connect(self.on_check_finished)
+        jobs.submit(self.check_worker, priority=Priority.HIGH, log=self.append)
+
+    def on_check_finished(self, report):
+        if self.check_worker is not None and self.check_worker.index is not None:
+            self.index = self.check_worker.index  # keep index for later checks
+        if report is None:
+            self.append("[check] Failed.")
+            return
+        self.append(
+            f"[check] {report.total} servers checked: {len(report.blocked)} blocked, "
+            f"{len(report.clean)} clean, {report.invalid} invalid entries."
+        )
+        for addr in report.blocked:
+            self.append(f"  ⛔ {addr}")
+
+    # ---------- A2S probing ----------
+    def handle_probe(self):
+        jobs = get_job_manager()
+        if jobs.is_active(ServerProbeWorker.kind):
+            self.append("[probe] Probe already running. Please wait...")
+            return
+        text, ok = QInputDialog.getMultiLineText(
+            self, "Probe Servers", "Paste servers (ip:port, one per line):"
+        )
+        if not ok or not text.strip():
+            return
+        self.probe_worker = ServerProbeWorker(text)
+        self.probe_worker.finished.connect(self.on_probe_finished)
+        jobs.submit(self.probe_worker, log=self.append)
+
+    def on_probe_finished(self, suspicions):
+        if suspicions is None:
+            self.append("[probe] Failed.")
+            return
+        if not suspicions:
+            self.append("[probe] No suspicious servers found.")
+            return
+        for s in suspicions:
+            self.append(f"  ⚠️ {s.address[0]}:{s.address[1]} — {', '.join(s.reasons)}")
+        candidates = blocklist_candidates(suspicions)
+        self.append(f"[probe] {len(candidates)} blocklist candidate IPs:")
+        self.append("\n".join(candidates))
 
     def append(self, text):
-        self.textbox.append(text)
-        cursor = self.textbox.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        self.textbox.setTextCursor(cursor)
-        self.textbox.ensureCursorVisible()
+        self.textbox.append_line(text)
 
     def on_finished(self, success):
         self.progress.setValue(100 if success else 0)
@@ -3,13 +3,16 @@
 from __future__ import annotations
 from typing import Callable, Optional, Dict
 from pathlib import Path
-import shutil
 from resources.texts import DISABLER_TEXT
+from models.games import GAMES
+from services.disabler import be_exe_paths
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QTextCursor
+from ui.log_view import LogView
+from workers.disabler_worker import DisablerWorker
+from workers.jobs import get_job_manager
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QTextEdit, QProgressBar,
-    QHBoxLayout, QPushButton, QSizePolicy, QMessageBox
+    QHBoxLayout, QPushButton, QSizePolicy, QMessageBox, QCheckBox
 )
 
 class DisablerPage(QWidget):
@@ -17,11 +20,16 @@ class DisablerPage(QWidget):
     Merged: modern UI + legacy rename logic.
     Automatically loads scan results from Main Page and applies BattleEye disable step.
     """
-    def __init__(self, back_cb: Optional[Callable[[], None]] = None, get_scan_results: Optional[Callable[[], dict]] = None):
+    def __init__(self, back_cb: Optional[Callable[[], None]] = None, get_scan_results: Optional[Callable[[], dict]] = None, store=None):
         super().__init__()
         self.go_home = back_cb
         self.get_scan_results = get_scan_results or (lambda: {})
         self.found_games: Dict[str, Dict[str, Path]] = {}
+        self.jobs = get_job_manager()
+        self.worker: Optional[DisablerWorker] = None
+        self.store = store
+        if self.store is not None:
+            self.store.subscribe(self._on_store_change)
 
         # --- UI Setup ---
         layout = QVBoxLayout(self)
@@ -49,10 +57,8 @@ class DisablerPage(QWidget):
         subtitle.setStyleSheet("color: gray;")
         layout.addWidget(subtitle)
 
-        self.textbox = QTextEdit(self)
-        self.textbox.setReadOnly(True)
-        self.textbox.setAcceptRichText(False)
-        self.textbox.setLineWrapMode(QTextEdit.NoWrap)
+        self.textbox = LogView(self, name="disabler")
+        self.textbox.setLineWrapMode(LogView.NoWrap)
         self.textbox.setStyleSheet("background-color: #111; color: cyan; font-family: Consolas;")
         layout.addWidget(self.textbox)
 
@@ -61,6 +67,12 @@ class DisablerPage(QWidget):
         self.progress.setValue(0)
         layout.addWidget(self.progress)
 
+        self.chk_link = QCheckBox("Hardlink the _BE exe to the x64 exe instead of copying (same drive only)", self)
+        layout.addWidget(self.chk_link)
+
+        self.chk_force = QCheckBox("Recreate the _BE exe even if it is already up to date", self)
+        layout.addWidget(self.chk_force)
+
         # Buttons
         btn_layout = QHBoxLayout()
         self.disable_button = QPushButton("Disable BattleEye", self)
@@ -68,6 +80,10 @@ class DisablerPage(QWidget):
         self.disable_button.clicked.connect(self.on_disable_clicked)
         btn_layout.addWidget(self.disable_button)
 
+        self.save_log_button = QPushButton("💾 Save Log", self)
+        self.save_log_button.clicked.connect(self.textbox.save_dialog)
+        btn_layout.addWidget(self.save_log_button)
+
         self.back_button = QPushButton("Back", self)
         self.back_button.clicked.connect(self.go_home)
         btn_layout.addWidget(self.back_button)
@@ -79,10 +95,7 @@ class DisablerPage(QWidget):
 
     # ---------- Utility ----------
     def append(self, text: str):
-        self.textbox.append(text)
-        cursor = self.textbox.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
-        self.textbox.setTextCursor(cursor)
+        self.textbox.append_line(text)
 
     # ---------- Load scan results ----------
     def _refresh_from_scan(self):
@@ -103,15 +116,13 @@ class DisablerPage(QWidget):
             if not path.exists():
                 continue
 
-            # Detect expected exe names
-            if "dayofinfamy" in str(path).lower():
-                source_exe = path / "dayofinfamy_x64.exe"
-            elif "insurgency" in str(path).lower():
-                source_exe = path / "insurgency_x64.exe"
-            else:
+            # Expected exe names from the game registry
+            record = GAMES.resolve(game, path)
+            if record is None:
                 continue
+            source_exe, dest_exe, _ = be_exe_paths(record, path)
 
-            self.found_games[game] = {"path": path, "source_exe": source_exe}
+            self.found_games[game] = {"path": path, "source_exe": source_exe, "dest_exe": dest_exe, "record": record}
             self.append(f"• {game} detected at {path}")
 
         if not self.found_games:
@@ -119,43 +130,46 @@ class DisablerPage(QWidget):
         else:
             self.append("Paths loaded. Click 'Disable BattleEye' to apply.")
 
+    def _on_store_change(self, kind: str, game=None):
+        # Keep the visible list current while a scan is still running (not while disabling)
+        if self.isVisible() and self.worker is None:
+            self._refresh_from_scan()
+
     # ---------- Disable BattleEye ----------
     def on_disable_clicked(self):
         if not self.found_games:
             QMessageBox.information(self, "Info", "No valid game executables found. Run scan first.")
             return
 
-        total = len(self.found_games)
-        self.append("Starting disable process...")
-        self.progress.setValue(0)
+        if self.jobs.is_active(DisablerWorker.kind):
+            self.append("[disabler] Already running. Please wait...")
+            return
 
-        for i, (game_key, info) in enumerate(self.found_games.items(), start=1):
-            source_exe = info["source_exe"]
-            if not source_exe.exists():
-                self.append(f"⚠️ Missing executable for {game_key}: {source_exe}")
+        targets = []
+        for game_key, info in self.found_games.items():
+            if not info["source_exe"].exists():
+                self.append(f"⚠️ Missing executable for {game_key}: {info['source_exe']}")
                 continue
+            targets.append((info["record"], info["path"]))
+        if not targets:
+            return
 
-            dest_exe = Path(str(source_exe).replace("_x64", "_BE"))
-            disabled_exe = Path(str(source_exe).replace("_x64", "_BE_disabled"))
-
-            try:
-                # If BE version exists, back it up
-                if dest_exe.exists():
-                    if not disabled_exe.exists():
-                        dest_exe.rename(disabled_exe)
-                        self.append(f"Backed up {dest_exe.name} → {disabled_exe.name}")
-                    else:
-                        if dest_exe.is_file():
-                            dest_exe.unlink()
-                        self.append(f"Removed old {dest_exe.name}")
-
-                shutil.copy2(source_exe, dest_exe)
-                self.append(f"✅ {game_key}: created {dest_exe.name}")
-
-            except Exception as e:
-                self.append(f"❌ Error while disabling {game_key}: {e}")
-
-            self.progress.setValue(int(100 * i / total))
-
-        self.append("Disable process completed.")
+        self.progress.setValue(0)
+        self.disable_button.setEnabled(False)
+        self.worker = DisablerWorker(targets, link=self.chk_link.isChecked(), force=self.chk_force.isChecked())
+        self.worker.finished.connect(self._on_disable_finished)
+        self.jobs.submit(self.worker, log=self.append, progress=self.progress.setValue, done=self._on_disable_job_done)
+
+    def _on_disable_finished(self, results):
+        failed = [r for r in results if not r["ok"]]
+        skipped = [r for r in results if r.get("skipped")]
+        self.append(
+            "Disable process completed."
+            + (f" {len(skipped)} already up to date." if skipped else "")
+            + (f" {len(failed)} failed." if failed else "")
+        )
         QMessageBox.information(self, "Completed", "BattleEye disable completed.")
+
+    def _on_disable_job_done(self, job):
+        self.worker = None
+        self.disable_button.setEnabled(True)
@@ -3,26 +3,25 @@ import traceback
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QTextEdit, QPushButton, QHBoxLayout, QLabel, QProgressBar, QMessageBox
 )
-from PySide6.QtCore import Qt, QThread
-from PySide6.QtGui import QTextCursor
-from workers.scan_worker import ScanWorker
+from PySide6.QtCore import Qt
+from ui.log_view import LogView
+from core.logging_setup import shutdown_logging
 from resources.texts import MAIN_TEXT
-import webbrowser  # Add at the very top of the file (if missing)
+from models.games import GAMES_META
 
 
 class MainPage(QWidget):
-    def __init__(self, go_patcher, go_disabler, go_blocker, go_home, set_scan_results=None):
+    def __init__(self, go_patcher, go_disabler, go_blocker, go_home, set_scan_results=None, add_found_game=None):
         super().__init__()
         self.go_patcher = go_patcher
         self.go_disabler = go_disabler
         self.go_blocker = go_blocker
         self.go_home = go_home
         self.set_scan_results = set_scan_results
+        self.add_found_game = add_found_game
 
         self.scan_results = {}
-        self.thread = None
         self.worker = None
-        self._scanning = False
 
         self.init_ui()
 
@@ -55,8 +54,7 @@ class MainPage(QWidget):
         layout.addWidget(self.desc_box)
 
         # Log area
-        self.log = QTextEdit()
-        self.log.setReadOnly(True)
+        self.log = LogView(name="scan")
         self.log.setStyleSheet("background-color: #000; color: #00FFAA; font-family: Consolas; font-size: 12px;")
         layout.addWidget(self.log)
 
@@ -71,6 +69,15 @@ class MainPage(QWidget):
         self.btn_scan.clicked.connect(self.handle_scan)
         btn_layout.addWidget(self.btn_scan)
 
+        self.btn_rescan = QPushButton("Force Rescan")
+        self.btn_rescan.clicked.connect(lambda: self.handle_scan(force=True))
+        btn_layout.addWidget(self.btn_rescan)
+
+        self.btn_cancel_scan = QPushButton("Cancel Scan")
+        self.btn_cancel_scan.setEnabled(False)
+        self.btn_cancel_scan.clicked.connect(self.cancel_scan)
+        btn_layout.addWidget(self.btn_cancel_scan)
+
         self.btn_patcher = QPushButton("Open Patcher")
         self.btn_patcher.clicked.connect(self.go_patcher)
         btn_layout.addWidget(self.btn_patcher)
@@ -97,6 +104,10 @@ class MainPage(QWidget):
         self.btn_support = QPushButton("💖 Support Us")
         self.btn_support.clicked.connect(self.show_support)
         bottom_layout.addWidget(self.btn_support)
+
+        self.btn_save_log = QPushButton("💾 Save Log")
+        self.btn_save_log.clicked.connect(self.log.save_dialog)
+        bottom_layout.addWidget(self.btn_save_log)
         layout.addLayout(bottom_layout)
 
         self.setLayout(layout)
@@ -105,13 +116,10 @@ class MainPage(QWidget):
     # Utility
     # ---------------------------------------------------------
     def append_log(self, text: str):
-        cursor = self.log.textCursor()
-        cursor.movePosition(QTextCursor.End)
-        self.log.setTextCursor(cursor)
-        self.log.insertPlainText(text + "\n")
-        self.log.ensureCursorVisible()
+        self.log.append_line(text)
 
     def close_app(self):
+        shutdown_logging()  # os._exit skips atexit: drain the log queue first
         os._exit(0)
 
     def show_credits(self):
@@ -132,6 +140,7 @@ class MainPage(QWidget):
 
     def show_support(self):
         # Open website directly when button is pressed
+        import webbrowser
         webbrowser.open("https://mygamingedge.online/")
         self.append_log("\n💖 Redirecting to support page: https://mygamingedge.online/\n")
 
@@ -140,9 +149,14 @@ class MainPage(QWidget):
     # ---------------------------------------------------------
     # Scan logic
     # ---------------------------------------------------------
-    def handle_scan(self):
-        """Run the scan safely without reusing deleted threads."""
-        if self._scanning:
+    def handle_scan(self, force: bool = False):
+        """Start a scan through the job manager (one at a time). force=True bypasses the scan cache."""
+        # Deferred until the first scan: pulls in the scanner services
+        from workers.jobs import Priority, get_job_manager
+        from workers.scan_worker import ScanWorker
+
+        jobs = get_job_manager()
+        if jobs.is_active(ScanWorker.kind):
             self.append_log("[warn] Scan already running. Please wait...")
             return
 
@@ -151,38 +165,39 @@ class MainPage(QWidget):
             self.progress.setValue(0)
             self.append_log("🟢 Starting scan...")
 
-            # Build game definitions
-            games = {
-                "Insurgency 2": {"Folder": "insurgency2", "exe": "insurgency.exe"},
-                "Day of Infamy": {"Folder": "dayofinfamy", "exe": "dayofinfamy.exe"},
-            }
+            # Build game definitions (AppID enables the appmanifest lookup; Folder is the probe fallback)
+            games = {title: dict(meta) for title, meta in GAMES_META.items()}
 
-            # Thread setup
-            self.thread = QThread()
-            self.worker = ScanWorker(games)
-            self.worker.moveToThread(self.thread)
-
-            self.thread.started.connect(self.worker.run)
-            self.worker.log.connect(self.append_log)
-            self.worker.progress.connect(self.progress.setValue)
+            self.worker = ScanWorker(games, use_cache=not force)
+            self.worker.game_found.connect(self._on_game_found)
             self.worker.finished.connect(self._on_scan_finished)
-            self.worker.finished.connect(self.thread.quit)
-            self.worker.finished.connect(self.worker.deleteLater)
-            self.thread.finished.connect(self._on_thread_cleanup)
-            self.thread.finished.connect(self.thread.deleteLater)
-
-            self._scanning = True
-            self.thread.start()
+            jobs.submit(
+                self.worker,
+                priority=Priority.HIGH,
+                log=self.append_log,
+                progress=self.progress.setValue,
+                done=self._on_scan_job_done,
+            )
+            self.btn_cancel_scan.setEnabled(True)
 
         except Exception as e:
             traceback.print_exc()
             self.append_log(f"❌ Scan failed to start: {e}")
 
-    def _on_thread_cleanup(self):
-        self._scanning = False
-        self.thread = None
+    def cancel_scan(self):
+        if self.worker is not None:
+            self.append_log("[info] Cancelling scan...")
+            self.worker.cancel()
+
+    def _on_scan_job_done(self, job):
+        self.btn_cancel_scan.setEnabled(False)
         self.worker = None
-        self.append_log("[info] Scan thread cleaned up.\n")
+        self.append_log(f"[info] Scan job {job.state} ({job.seconds:.2f}s).\n")
+
+    def _on_game_found(self, game):
+        """Forward streamed scan hits so other pages can act before the scan ends."""
+        if callable(self.add_found_game):
+            self.add_found_game(game)
 
     def _on_scan_finished(self, results):
         """Handle scan completion."""
@@ -197,7 +212,15 @@ class MainPage(QWidget):
             self.append_log(f"✅ Found games: {found}")
         else:
             self.append_log("⚠️ No supported games detected.")
-        self.append_log("Scan complete.")
+        self.append_log("Scan cancelled." if results.get("cancelled") else "Scan complete.")
+
+    def show_cached_results(self, results: dict):
+        """Display scan results restored from the on-disk cache at startup."""
+        self.scan_results = results
+        found = results.get("found_games") or {}
+        if found:
+            self.append_log(f"⚡ Restored cached scan results: {', '.join(found.keys())}")
+            self.append_log("Press 'Force Rescan' to scan again.")
 
     def get_scan_results(self):
         return self.scan_results
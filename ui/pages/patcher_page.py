@@ -2,10 +2,11 @@
 # -*- coding: utf-8 -*-
 from typing import Optional, Callable, Dict
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QPushButton, QMessageBox, QTextEdit, QHBoxLayout
+    QWidget, QVBoxLayout, QLabel, QPushButton, QMessageBox, QTextEdit, QHBoxLayout, QCheckBox
 )
-from PySide6.QtCore import Qt, QThread
-from PySide6.QtGui import QTextCursor
+from PySide6.QtCore import Qt
+from ui.log_view import LogView
+from workers.jobs import get_job_manager
 from pathlib import Path
 from resources.texts import PATCHER_TEXT
 from PySide6.QtWidgets import QProgressBar
@@ -31,13 +32,17 @@ class PatcherPage(QWidget):
         go_home: Optional[Callable[[], None]] = None,
         back_cb: Optional[Callable[[], None]] = None,
         get_scan_results: Optional[Callable[[], dict]] = None,
+        store=None,
     ):
         super().__init__()
         self.go_home = go_home or back_cb
         self.get_scan_results_cb = get_scan_results
         self.scan_results: Dict = {}
-        self.thread: Optional[QThread] = None
+        self.jobs = get_job_manager()
         self.worker = None
+        self._auto_patched = set()        # games already queued by auto-patch this session
+        self._pending: Dict[str, str] = {}  # auto-patch jobs waiting for the running worker
+        self.store = store
 
         # ----- UI -----
         layout = QVBoxLayout(self)
@@ -86,19 +91,29 @@ class PatcherPage(QWidget):
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(title)
 
-        self.log = QTextEdit()
-        self.log.setReadOnly(True)
+        self.log = LogView(name="patcher")
         self.log.setFixedHeight(300)
         self.log.setStyleSheet("background:#0c0c0c; color:#00ff99; font-family: Consolas; font-size: 12px;")
         layout.addWidget(self.log)
 
         layout.addWidget(self.progress)
 
+        self.chk_auto = QCheckBox("Patch games as soon as they are found (while scanning)")
+        self.chk_auto.toggled.connect(self._on_auto_toggled)
+        layout.addWidget(self.chk_auto)
+
+        self.chk_dedup = QCheckBox("Share identical BattlEye files between games (hardlinks, saves disk space)")
+        layout.addWidget(self.chk_dedup)
+
         row = QHBoxLayout()
         self.btn_apply = QPushButton("Apply Patch (auto for detected)")
         self.btn_apply.clicked.connect(self.apply_patch)
         row.addWidget(self.btn_apply)
 
+        self.btn_save_log = QPushButton("💾 Save Log")
+        self.btn_save_log.clicked.connect(self.log.save_dialog)
+        row.addWidget(self.btn_save_log)
+
         self.btn_back = QPushButton("⬅ Back")
         self.btn_back.clicked.connect(self.handle_back)
         row.addWidget(self.btn_back)
@@ -107,15 +122,17 @@ class PatcherPage(QWidget):
 
         self.setLayout(layout)
 
+        # The page is built on first navigation: catch up on hits streamed before that
+        if self.store is not None:
+            self.store.subscribe(self._on_store_change)
+            self._replay_store()
+
     # ===== UTILITIES =====
     def append_log(self, text: str):
         """Append log text and scroll automatically."""
         if not text:
             return
-        self.log.moveCursor(QTextCursor.End)
-        self.log.insertPlainText(text.strip() + "\n")
-        self.log.moveCursor(QTextCursor.End)
-        self.log.ensureCursorVisible()
+        self.log.append_line(text.strip())
 
     # ===== SCAN RESULTS =====
     def set_scan_results(self, results: Dict = None):
@@ -173,28 +190,26 @@ class PatcherPage(QWidget):
             )
             return
 
+        if self.jobs.is_active("patch"):
+            self.append_log("[patcher] Patching already running. Please wait...")
+            return
+        self._start_worker(found)
+
+    def _start_worker(self, found: Dict):
         # Prevent multiple runs
         self.btn_apply.setEnabled(False)
         self.append_log("⚙️ Starting patcher worker...")
 
         try:
-            self.thread = QThread()
-            self.worker = PatcherWorker(found)
-            self.worker.moveToThread(self.thread)
-
-            # Connect worker signals
-            if hasattr(self.worker, "log"):
-                self.worker.log.connect(self.append_log)
-            if hasattr(self.worker, "progress"):
-                self.worker.progress.connect(self._on_patch_progress)
-            if hasattr(self.worker, "finished"):
-                self.worker.finished.connect(self._on_patcher_finished)
-                self.worker.finished.connect(self.thread.quit)
-                self.worker.finished.connect(self.worker.deleteLater)
-            self.thread.finished.connect(self.thread.deleteLater)
-
-            self.thread.started.connect(self.worker.run)
-            self.thread.start()
+            self.worker = PatcherWorker(found, dedup=self.chk_dedup.isChecked())
+            self.worker.finished.connect(self._on_patcher_finished)
+            self.jobs.submit(
+                self.worker,
+                key="patch",
+                log=self.append_log,
+                progress=self._on_patch_progress,
+                done=self._on_patch_job_done,
+            )
 
         except Exception as e:
             self.append_log(f"❌ Could not start patcher worker: {e}")
@@ -206,21 +221,52 @@ class PatcherPage(QWidget):
             self.append_log(f"[patcher] Finished: {summary}")
         else:
             self.append_log("[patcher] Finished.")
-        try:
-            if self.thread:
-                self.thread.quit()
-                self.thread.wait()
-        except Exception:
-            pass
-        self.thread = None
+        self.append_log("✅ All patching operations completed.")
+
+    def _on_patch_job_done(self, job):
+        """The patch job left the job manager: the next one may start now."""
         self.worker = None
         self.btn_apply.setEnabled(True)
-        self.append_log("✅ All patching operations completed.")
+
+        # Auto-patch hits that arrived while the worker was busy
+        if self._pending:
+            pending, self._pending = self._pending, {}
+            self._start_worker(pending)
+            return
 
         # Instead of clearing, append updated list to show new detection results
         self.append_log("\n[patcher] Auto-refreshing detected games...")
         self.show_detected_games()
 
+    # ===== LIVE SCAN RESULTS =====
+    def _on_store_change(self, kind: str, game=None):
+        """Called by the shared ScanResultStore; streamed hits arrive before the scan ends."""
+        if kind != "added" or game is None:
+            return
+        self.append_log(f"[patcher] Detected: {game.name} → {game.path}")
+        if self.chk_auto.isChecked():
+            self._auto_patch(game)
+
+    def _auto_patch(self, game):
+        if not HAS_REAL_PATCHER or game.name in self._auto_patched:
+            return
+        self._auto_patched.add(game.name)
+        if self.jobs.is_active("patch"):
+            self._pending[game.name] = game.path
+            self.append_log(f"[patcher] Queued {game.name} for patching.")
+        else:
+            self._start_worker({game.name: game.path})
+
+    def _replay_store(self):
+        for game in self.store.games().values():
+            self._on_store_change("added", game)
+
+    def _on_auto_toggled(self, on: bool):
+        # Games found before auto-patch was switched on are patched now
+        if on and self.store is not None:
+            for game in self.store.games().values():
+                self._auto_patch(game)
+
     # ===== NAVIGATION =====
     def handle_back(self):
         if callable(self.go_home):
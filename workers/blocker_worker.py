@@ -4,21 +4,26 @@ from __future__ import annotations
 import os
 import tempfile
 from pathlib import Path
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import Signal
+from core.metrics import recorded
+from core.worker_profile import profiled
 from services.firewall import remove_rules, add_block_rules_from_ip_file, verify_rules_exist
 from services.admin import is_admin
+from workers.jobs import Worker
 import urllib.request
 
 
-class BlockerWorker(QObject):
-    progress = Signal(int)        # emits progress percentage (0–100)
-    log = Signal(str)             # emits log text for GUI
+class BlockerWorker(Worker):
+    """Installs/updates the Fast Path Blocker firewall rules (GameSpamFilter_*)."""
+    kind = "blocker"
     done = Signal(bool, str)      # emits (success, message) when finished
 
     def __init__(self, url: str = "https://content.hl2dm.org/spamfilter/RogueIPs.txt"):
         super().__init__()
         self.url = url
 
+    @recorded("blocker")
+    @profiled()
     def run(self):
         """Main installation/update process for Fast Path Blocker."""
         if os.name != "nt":
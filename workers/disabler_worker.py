@@ -0,0 +1,41 @@
+# workers/disabler_worker.py
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+from pathlib import Path
+from typing import List, Tuple
+from PySide6.QtCore import Signal
+from core.metrics import recorded
+from core.worker_profile import profiled
+from models.games import GameRecord
+from services.disabler import disable_many
+from workers.jobs import Worker
+
+
+class DisablerWorker(Worker):
+    """Creates the _BE executables of several installs in parallel, off the GUI thread."""
+    kind = "disable"
+    finished = Signal(object)   # list of per-game result dicts (see services.disabler.disable_many)
+
+    def __init__(self, targets: List[Tuple[GameRecord, Path]], link: bool = False, max_workers: int = 4,
+                 force: bool = False):
+        super().__init__()
+        self.targets = list(targets)
+        self.link = link
+        self.force = force
+        self.max_workers = max_workers
+
+    @recorded("disable")
+    @profiled()
+    def run(self):
+        self.log.emit(f"Starting disable process for {len(self.targets)} game(s)...")
+        results = disable_many(
+            self.targets,
+            log_cb=self.log.emit,
+            progress_cb=self.progress.emit,
+            max_workers=self.max_workers,
+            link=self.link,
+            cancel_event=self.token,
+            force=self.force,
+        )
+        self.progress.emit(100)
+        self.finished.emit(results)
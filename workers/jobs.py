@@ -0,0 +1,239 @@
+# workers/jobs.py
+# -*- coding: utf-8 -*-
+"""
+Central job manager for background work.
+
+Pages never build threads themselves: they create a Worker (a QObject with
+log/progress signals, a cancel token and a blocking run()) and submit it:
+
+    job = get_job_manager().submit(
+        ScanWorker(games), key="scan", priority=Priority.HIGH,
+        log=self.append_log, progress=self.progress.setValue, done=self._on_done,
+    )
+    if job is None:   # single-flight: a job with this key is already queued/running
+        ...
+
+run() executes on a QThreadPool thread; the worker object itself stays on
+the GUI thread, so its signals are delivered to page slots as queued
+calls. `done(job)` runs on the GUI thread after the job has left the
+active set, i.e. a new job with the same key can be submitted from it.
+"""
+from __future__ import annotations
+import logging
+import threading
+import time
+import traceback
+from enum import IntEnum
+from typing import Callable, Dict, List, Optional
+from PySide6.QtCore import QObject, QRunnable, QThread, QThreadPool, Qt, Signal
+from core import metrics
+
+logger = logging.getLogger("workers.jobs")
+
+
+class Priority(IntEnum):
+    LOW = 0
+    NORMAL = 5
+    HIGH = 10
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class CancelToken(threading.Event):
+    """Cooperative cancellation flag; also usable wherever a threading.Event is expected."""
+
+    def cancel(self) -> None:
+        self.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self.is_set():
+            raise JobCancelled()
+
+
+class Worker(QObject):
+    """Base class of everything the JobManager runs."""
+    log = Signal(str)
+    progress = Signal(int)
+
+    kind = "job"
+
+    def __init__(self):
+        super().__init__()
+        self.token = CancelToken()
+
+    def cancel(self) -> None:
+        """Request cancellation; safe to call from the GUI thread."""
+        self.token.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    def run(self) -> None:
+        raise NotImplementedError
+
+
+class Job:
+    """Book-keeping for one submitted worker."""
+
+    def __init__(self, worker: Worker, key: str, priority: int, done: Optional[Callable[["Job"], None]]):
+        self.worker = worker
+        self.kind = worker.kind
+        self.key = key
+        self.priority = int(priority)
+        self.done_cb = done
+        self.state = "queued"          # queued -> running -> finished | failed | cancelled
+        self.error: Optional[str] = None
+        self.submitted = time.perf_counter()
+        self.seconds = 0.0
+        self.runnable: Optional[_JobRunnable] = None
+
+    def cancel(self) -> None:
+        self.worker.cancel()
+
+    def __repr__(self) -> str:
+        return f"<Job {self.key} ({self.kind}) {self.state}>"
+
+
+class _JobRunnable(QRunnable):
+    def __init__(self, job: Job, notify: Signal):
+        super().__init__()
+        self.setAutoDelete(False)   # the Job keeps the Python wrapper alive
+        self.job = job
+        self._notify = notify
+
+    def run(self):
+        job = self.job
+        metrics.observe("jobs.queue_wait", time.perf_counter() - job.submitted)
+        t0 = time.perf_counter()
+        try:
+            if job.worker.cancelled:
+                job.state = "cancelled"
+                return
+            job.state = "running"
+            job.worker.run()
+            job.state = "cancelled" if job.worker.cancelled else "finished"
+        except JobCancelled:
+            job.state = "cancelled"
+        except Exception as e:
+            job.state = "failed"
+            job.error = str(e)
+            logger.error("Job %s failed:\n%s", job.key, traceback.format_exc())
+            try:
+                job.worker.log.emit(f"❌ {job.kind} failed: {e}")
+            except RuntimeError:
+                pass
+        finally:
+            job.seconds = time.perf_counter() - t0
+            self._notify.emit(job)
+
+
+class JobManager(QObject):
+    """QThreadPool front end with priorities, single-flight keys and cancellation."""
+    job_started = Signal(object)    # Job (on submit)
+    job_finished = Signal(object)   # Job, after it left the active set
+    busy_changed = Signal(bool)
+    _job_done = Signal(object)
+
+    def __init__(self, max_threads: Optional[int] = None, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads or max(4, QThread.idealThreadCount()))
+        self._active: Dict[str, Job] = {}
+        self._job_done.connect(self._on_job_done, Qt.ConnectionType.QueuedConnection)
+
+    # ---------- submission ----------
+    def submit(
+        self,
+        worker: Worker,
+        key: Optional[str] = None,
+        priority: int = Priority.NORMAL,
+        log: Optional[Callable[[str], None]] = None,
+        progress: Optional[Callable[[int], None]] = None,
+        done: Optional[Callable[[Job], None]] = None,
+    ) -> Optional[Job]:
+        """
+        Queue `worker` under `key` (default: its kind). Returns None without
+        starting anything if a job with the same key is still active.
+        """
+        key = key or worker.kind
+        if key in self._active:
+            metrics.incr("jobs.deduplicated")
+            logger.debug("Single-flight: %s already active", key)
+            return None
+        if log is not None:
+            worker.log.connect(log)
+        if progress is not None:
+            worker.progress.connect(progress)
+
+        job = Job(worker, key, priority, done)
+        job.runnable = _JobRunnable(job, self._job_done)
+        was_idle = not self._active
+        self._active[key] = job
+        metrics.incr("jobs.submitted")
+        self.pool.start(job.runnable, job.priority)
+        logger.debug("Submitted %r (priority %d)", job, job.priority)
+        self.job_started.emit(job)
+        if was_idle:
+            self.busy_changed.emit(True)
+        return job
+
+    def _on_job_done(self, job: Job) -> None:
+        if self._active.get(job.key) is job:
+            del self._active[job.key]
+        job.runnable = None
+        metrics.incr(f"jobs.{job.state}")
+        logger.debug("%r after %.3fs", job, job.seconds)
+        if job.done_cb is not None:
+            try:
+                job.done_cb(job)
+            except Exception:
+                logger.exception("done callback of %s failed", job.key)
+        self.job_finished.emit(job)
+        if not self._active:
+            self.busy_changed.emit(False)
+
+    # ---------- queries / control ----------
+    def is_active(self, key: str) -> bool:
+        return key in self._active
+
+    def get(self, key: str) -> Optional[Job]:
+        return self._active.get(key)
+
+    def active(self) -> List[Job]:
+        return list(self._active.values())
+
+    def cancel(self, key: str) -> bool:
+        """Cancel the job with `key`; a job still waiting in the queue is dropped immediately."""
+        job = self._active.get(key)
+        if job is None:
+            return False
+        job.cancel()
+        if job.state == "queued" and job.runnable is not None and self.pool.tryTake(job.runnable):
+            job.state = "cancelled"
+            self._on_job_done(job)
+        return True
+
+    def cancel_all(self) -> None:
+        for key in list(self._active):
+            self.cancel(key)
+
+    def wait(self, msecs: int = -1) -> bool:
+        """Block until all running jobs have returned (e.g. before quitting)."""
+        return self.pool.waitForDone(msecs)
+
+
+_manager: Optional[JobManager] = None
+
+def get_job_manager() -> JobManager:
+    """Process-wide job manager (create it on the GUI thread)."""
+    global _manager
+    if _manager is None:
+        _manager = JobManager()
+    return _manager
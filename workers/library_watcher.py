@@ -0,0 +1,189 @@
+# workers/library_watcher.py
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from PySide6.QtCore import QObject, QFileSystemWatcher, QTimer, Signal
+from models.state import GameFound, ScanResultStore
+from services.steam import SteamDiscovery, get_discovery, find_game_dirs_by_appid
+from services.scan_cache import save_scan_cache
+from workers.jobs import Priority, Worker, get_job_manager
+
+logger = logging.getLogger("workers.library_watcher")
+
+
+class LibraryRefreshWorker(Worker):
+    """Library discovery and manifest lookup for the watcher, off the GUI thread."""
+    kind = "library_refresh"
+    finished = Signal(object)   # (rediscovered, steamapps_dirs, appids, {appid: game_dir})
+
+    def __init__(self, discovery: SteamDiscovery, appids: Set[str], rediscover: bool = False):
+        super().__init__()
+        self.discovery = discovery
+        self.appids = set(appids)
+        self.rediscover = rediscover
+
+    def run(self):
+        if self.rediscover:
+            self.discovery.invalidate()
+        try:
+            steamapps_dirs = self.discovery.steamapps_dirs()
+        except Exception:
+            logger.exception("Library discovery for watcher failed")
+            steamapps_dirs = []
+        located: Dict[str, Path] = {}
+        if self.appids and not self.cancelled:
+            try:
+                located = find_game_dirs_by_appid(self.appids, steamapps_dirs)
+            except Exception:
+                logger.exception("Watcher manifest lookup failed")
+        if not self.cancelled:
+            self.finished.emit((self.rediscover, steamapps_dirs, self.appids, located))
+
+
+class LibraryWatcher(QObject):
+    """
+    Keeps the ScanResultStore current while the app is open.
+    Watches libraryfolders.vdf, every library's steamapps directory and the
+    appmanifest_<appid>.acf files of the tracked games. Changes are collected
+    and handled once per debounce interval, so a Steam update touching many
+    files triggers a single incremental refresh of the affected games only.
+    Discovery and manifest reads run as a LibraryRefreshWorker on the job
+    manager; requests arriving while one is running are merged into the next.
+    """
+    JOB_KEY = "library_refresh"
+
+    log = Signal(str)
+    changed = Signal(list)   # names of games whose entry was added/moved/removed
+
+    def __init__(self, store: ScanResultStore, games: Dict[str, Dict[str, str]], debounce_ms: int = 1500, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.games = games
+        self.appids: Dict[str, str] = {info["AppID"]: name for name, info in games.items() if info.get("AppID")}
+        self.discovery = get_discovery()
+        self.jobs = get_job_manager()
+        self.steamapps_dirs: List[Path] = []
+        self._dirty: Set[str] = set()
+        self._queued: Optional[tuple] = None   # (rediscover, appids) waiting for the running refresh
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(self._on_path_changed)
+        self.watcher.directoryChanged.connect(self._on_path_changed)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(debounce_ms)
+        self.timer.timeout.connect(self._flush)
+
+        self.store.subscribe(self._on_store_change)
+
+    # ---------- watch set ----------
+    def start(self) -> None:
+        """Discover libraries (shared memoized discovery) and (re)build the watch set."""
+        self._request_refresh(False, set())
+
+    def stop(self) -> None:
+        self.timer.stop()
+        self._queued = None
+        self.jobs.cancel(self.JOB_KEY)
+        paths = self.watcher.files() + self.watcher.directories()
+        if paths:
+            self.watcher.removePaths(paths)
+
+    def _watch_paths(self) -> List[str]:
+        paths: List[str] = []
+        for sa in self.steamapps_dirs:
+            paths.append(str(sa))
+            candidates = [sa / "libraryfolders.vdf"] + [sa / f"appmanifest_{a}.acf" for a in self.appids]
+            paths.extend(str(p) for p in candidates if p.exists())
+        return paths
+
+    def _rewatch(self) -> None:
+        wanted = set(self._watch_paths())
+        current = set(self.watcher.files() + self.watcher.directories())
+        stale = list(current - wanted)
+        new = list(wanted - current)
+        if stale:
+            self.watcher.removePaths(stale)
+        if new:
+            self.watcher.addPaths(new)
+        logger.debug("Watching %d paths", len(wanted))
+
+    # ---------- change handling ----------
+    def _on_store_change(self, kind: str, game: Optional[GameFound] = None) -> None:
+        # A full scan finished: libraries may have changed
+        if kind == "reset":
+            self.start()
+
+    def _on_path_changed(self, path: str) -> None:
+        self._dirty.add(path)
+        self.timer.start()  # restart debounce window
+
+    def _affected_appids(self, dirty: Set[str]) -> Set[str]:
+        affected: Set[str] = set()
+        for p in dirty:
+            name = Path(p).name.lower()
+            if name.startswith("appmanifest_") and name.endswith(".acf"):
+                appid = name[len("appmanifest_"):-len(".acf")]
+                if appid in self.appids:
+                    affected.add(appid)
+            else:
+                # steamapps dir: a manifest was added/removed -> recheck tracked apps
+                affected.update(self.appids)
+        return affected
+
+    def _flush(self) -> None:
+        dirty, self._dirty = self._dirty, set()
+        if not dirty:
+            return
+        if any(Path(p).name.lower() == "libraryfolders.vdf" for p in dirty):
+            self.log.emit("[watcher] Steam library list changed — refreshing libraries.")
+            self._request_refresh(True, set(self.appids))
+        else:
+            self._request_refresh(False, self._affected_appids(dirty))
+
+    # ---------- background refresh ----------
+    def _request_refresh(self, rediscover: bool, appids: Set[str]) -> None:
+        if self._queued is not None:
+            rediscover = rediscover or self._queued[0]
+            appids = appids | self._queued[1]
+        if self.jobs.is_active(self.JOB_KEY):
+            self._queued = (rediscover, appids)   # picked up by _on_refresh_done
+            return
+        self._queued = None
+        worker = LibraryRefreshWorker(self.discovery, appids, rediscover)
+        worker.finished.connect(self._apply_refresh)
+        self.jobs.submit(worker, key=self.JOB_KEY, priority=Priority.LOW, done=self._on_refresh_done)
+
+    def _on_refresh_done(self, job) -> None:
+        if self._queued is not None:
+            self._request_refresh(*self._queued)
+
+    def _apply_refresh(self, outcome) -> None:
+        rediscovered, steamapps_dirs, appids, located = outcome
+        self.steamapps_dirs = steamapps_dirs
+        if rediscovered:
+            self.store.libraries = [str(sa / "common") for sa in self.steamapps_dirs]
+
+        changed: List[str] = []
+        current = self.store.games()
+        for appid in sorted(appids):
+            name = self.appids[appid]
+            game_dir = located.get(appid)
+            old = current.get(name)
+            if game_dir is not None and (old is None or old.path != str(game_dir)):
+                self.store.add_game(GameFound(name, str(game_dir), "watcher", appid))
+                self.log.emit(f"[watcher] {name} → {game_dir}")
+                changed.append(name)
+            elif game_dir is None and old is not None and not Path(old.path).exists():
+                self.store.remove_game(name)
+                self.log.emit(f"[watcher] {name} was uninstalled or moved.")
+                changed.append(name)
+
+        # Watched files replaced by Steam drop out of the watch set -> re-add
+        self._rewatch()
+        if changed:
+            save_scan_cache(self.games, self.store.snapshot(), self.steamapps_dirs)
+            self.changed.emit(changed)
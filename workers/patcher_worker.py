@@ -1,32 +1,36 @@
 # workers/patcher_worker.py
 # -*- coding: utf-8 -*-
-from PySide6.QtCore import QObject, Signal
-from installer.utils import decode_embedded_zip, extract_zip
-from installer import embedded_ins_patch, embedded_doi_patch
-import os
+from PySide6.QtCore import Signal
+from core.metrics import recorded
+from core.worker_profile import profiled
+from models.games import GAMES
+from services.dedup import estimate_seconds_saved
+from services.patching import apply_patch
+from workers.jobs import Worker
 
 
-class PatcherWorker(QObject):
+class PatcherWorker(Worker):
     """Wrapper for MultiPatcherWorker to integrate with modern GUI."""
-    log = Signal(str)
-    progress = Signal(int)
+    kind = "patch"
     finished = Signal(str)
 
-    def __init__(self, found_games: dict):
+    def __init__(self, found_games: dict, dedup: bool = False):
         super().__init__()
         self.found_games = found_games or {}
+        self.dedup = dedup
 
+    @recorded("patch")
+    @profiled()
     def run(self):
         """Build tasks and run patching immediately."""
         try:
             tasks = []
             for name, path in self.found_games.items():
-                if "insurgency" in name.lower():
-                    tasks.append({"game_key": "insurgency2", "target_dir": str(path)})
-                elif "infamy" in name.lower():
-                    tasks.append({"game_key": "dayofinfamy", "target_dir": str(path)})
-                else:
+                record = GAMES.resolve(name, path)
+                if record is None:
                     self.log.emit(f"Skipping unknown game: {name}")
+                    continue
+                tasks.append({"record": record, "target_dir": str(path)})
 
             if not tasks:
                 self.log.emit("⚠️ No valid games detected for patching.")
@@ -34,32 +38,31 @@ class PatcherWorker(QObject):
                 return
 
             total = len(tasks)
+            saved = written = 0
+            write_seconds = 0.0
             for i, task in enumerate(tasks, 1):
-                key = task["game_key"]
-                target = task["target_dir"]
-
-                if key == "insurgency2":
-                    data = embedded_ins_patch.BASE64_DATA
-                    sha = embedded_ins_patch.SHA256
-                    label = "Insurgency 2 Patch"
-                elif key == "dayofinfamy":
-                    data = embedded_doi_patch.BASE64_DATA
-                    sha = embedded_doi_patch.SHA256
-                    label = "Day of Infamy Patch"
-                else:
-                    self.log.emit(f"Unknown task key: {key}")
-                    continue
-
-                self.log.emit(f"🔧 Applying {label} to {target} ...")
-                zip_path = decode_embedded_zip(data, sha, label)
-                extract_zip(zip_path, os.path.join(target, "BattlEye"))
-                os.unlink(zip_path)
+                if self.cancelled:
+                    self.log.emit("⏹ Patching cancelled.")
+                    self.finished.emit("Cancelled")
+                    return
+                record = task["record"]
+                label = record.patch_label
+                stats = apply_patch(record, task["target_dir"], log_cb=self.log.emit, dedup=self.dedup)
+                saved += stats.get("bytes_saved", 0)
+                written += stats["bytes_written"]
+                write_seconds += stats.get("write_seconds", 0.0)
 
                 # --- Emit progress update to UI ---
                 percent = int((i / total) * 100)
                 self.progress.emit(percent)  # <--- Added line
                 self.log.emit(f"✅ {label} applied successfully. ({percent}%)")
 
+            if self.dedup:
+                secs = estimate_seconds_saved(saved, written, write_seconds)
+                self.log.emit(
+                    f"🔗 Shared files: {saved / 1048576:.1f} MiB not written"
+                    + (f" (≈{secs:.2f}s saved)" if secs is not None else "")
+                )
             self.progress.emit(100)  # <--- Ensure bar reaches 100% at end
             self.log.emit("🎯 All patches applied successfully.")
             self.finished.emit("Done")